@@ -1,24 +1,98 @@
 """FastAPI application for the Expense Tracker."""
 
-from typing import Any, Dict, List
+import asyncio
+import hmac
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Literal, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.exc import SQLAlchemyError
 
-from core.services.transaction_service import TransactionService
+from core.export import EXPORT_FORMATS, iter_csv, iter_ndjson
+from core.gmail_push import PubSubPush, PushDebouncer, decode_notification
+from core.logging_config import setup_logging
+from core.metrics import REGISTRY, MetricsMiddleware
+from core.response_cache import ResponseCache
+from core.sync_jobs import SyncJob, SyncJobManager, SyncProgress
+from core.sync_lock import SyncLock
+from core.sync_scheduler import SyncScheduler
+from core.services.stats_service import StatsService
+from core.services.sync_run_service import SyncRunService
+from core.services.transaction_service import TRANSACTION_FIELDS, TransactionService
 from database.database import Database
-from main import run_sync
+from models.sync_run import SyncRun
+from models.transaction import TransactionFilters, TransactionRow
+
+logger = setup_logging(level=logging.DEBUG, use_queue=True)
 
 
 class PaginatedTransactions(BaseModel):
     """Paginated response containing transactions and total count."""
 
     total: int
-    transactions: List[Dict[str, Any]]
+    total_exact: bool
+    transactions: List[TransactionRow]
+
+
+# Serializers for the cached read responses. They write JSON bytes straight from
+# the typed objects using pydantic-core, without an intermediate dict pass.
+PAGE_JSON = TypeAdapter(PaginatedTransactions)
+TRANSACTION_JSON = TypeAdapter(TransactionRow)
+STATS_JSON = TypeAdapter(List[Dict[str, Any]])
+SYNC_JOB_JSON = TypeAdapter(SyncJob)
+
+# Seconds between progress checks on a sync job's event stream.
+SYNC_EVENT_INTERVAL = 0.5
+
+MONTH_PATTERN = r"^(\d{4}-\d{2}|unknown)$"
+
+# Rendered read responses, tagged with the data version they were built from.
+response_cache = ResponseCache()
+
+
+def run_sync(progress: SyncProgress, incremental: bool = False):
+    """Run a Gmail sync.
+
+    The Google API client, OAuth flow and parsers are imported with ``main`` on
+    the first sync, so workers that only serve reads never load them.
+    """
+    from main import run_sync as sync  # pylint: disable=import-outside-toplevel
+
+    sync(progress, incremental=incremental)
+
 
+# Gmail syncs run here, one at a time, outside the request that started them,
+# and join a sync already running in another process (e.g. a cron run).
+sync_jobs = SyncJobManager(run_sync, lock_factory=lambda: SyncLock(Database()))
+
+# Bursts of Gmail push notifications become a single incremental sync; a burst
+# arriving during a sync gets a follow-up, as that sync may be past the new mail.
+gmail_push_debouncer = PushDebouncer(
+    lambda: sync_jobs.submit(incremental=True, rerun_if_running=True)
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Run the optional periodic sync scheduler for the lifetime of the app."""
+    scheduler = SyncScheduler.from_env(sync_jobs)
+    if scheduler is not None:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        gmail_push_debouncer.cancel()
+        if scheduler is not None:
+            scheduler.stop()
 
-app = FastAPI(title="Expense Tracker API", version="1.0.0")
+
+app = FastAPI(title="Expense Tracker API", version="1.0.0", lifespan=lifespan)
 
 # CORS configuration for frontend development
 app.add_middleware(
@@ -28,6 +102,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(SQLAlchemyError)
+def database_error(_request: Request, _exc: SQLAlchemyError):
+    """Answer 503 when a read fails, instead of serving (and caching) an empty result."""
+    return JSONResponse(status_code=503, content={"detail": "Database unavailable"})
 
 
 def get_transaction_service():
@@ -39,38 +120,294 @@ def get_transaction_service():
         db.close()
 
 
+def get_stats_service():
+    """Dependency that provides a StatsService with a managed DB lifecycle."""
+    db = Database()
+    try:
+        yield StatsService(db)
+    finally:
+        db.close()
+
+
+def get_sync_run_service():
+    """Dependency that provides a SyncRunService with a managed DB lifecycle."""
+    db = Database()
+    try:
+        yield SyncRunService(db)
+    finally:
+        db.close()
+
+
+def get_transaction_filters(
+    date_from: Optional[datetime] = Query(None, description="Inclusive lower date bound"),
+    date_to: Optional[datetime] = Query(None, description="Exclusive upper date bound"),
+    bank_id: Optional[int] = Query(None),
+    type: Optional[Literal["expense", "income"]] = Query(None),  # pylint: disable=redefined-builtin
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    merchant: Optional[str] = Query(None, min_length=1, description="Merchant name prefix"),
+) -> TransactionFilters:
+    """Dependency that collects the transaction filter query parameters."""
+    return TransactionFilters(
+        date_from=date_from,
+        date_to=date_to,
+        bank_id=bank_id,
+        type=type,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        merchant=merchant,
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional_json(
+    request: Request, db: Database, render: Callable[[], Any], serializer: TypeAdapter
+) -> Response:
+    """Serve a JSON read response with ETag revalidation and version-keyed caching.
+
+    The ETag is derived from the transaction data version, so a client holding
+    a current copy gets a 304 without any listing or count query being run.
+    Otherwise the rendered body is shared by every identical request made
+    against the same version.
+
+    Args:
+        request: The incoming request; its path and query form the cache key.
+        db: Database used to read the data version.
+        render: Builds the response content on a cache miss.
+        serializer: Encodes the rendered content to JSON bytes.
+
+    Returns:
+        A 304 response, or a JSON response carrying the ETag.
+    """
+    version = TransactionService(db).data_version()
+    if version is None:
+        return Response(content=serializer.dump_json(render()), media_type="application/json")
+
+    etag = f'W/"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    body = response_cache.get_or_render(key, version, lambda: serializer.dump_json(render()))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
 
-@app.post("/sync")
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Sync, parser, database, Gmail and request metrics in the Prometheus text format."""
+    return Response(
+        content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def get_sync_job(job_id: str) -> SyncJob:
+    """Dependency that resolves a sync job id, or answers 404."""
+    job = sync_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+
+@app.post("/sync", status_code=202, response_model=SyncJob)
 def sync_emails():
-    """Trigger the Gmail sync process."""
-    run_sync()
-    return {"status": "ok"}
+    """Queue a Gmail sync and return its job without waiting for it to run."""
+    return sync_jobs.submit()
+
+
+@app.get("/sync/runs", response_model=List[SyncRun])
+def list_sync_runs(
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    service: SyncRunService = Depends(get_sync_run_service),
+):
+    """Recent sync runs, newest first, with their message counts and stage timings."""
+    return service.recent(limit=limit, offset=offset)
+
+
+@app.get("/sync/{job_id}", response_model=SyncJob)
+def sync_status(job: SyncJob = Depends(get_sync_job)):
+    """Status and progress counters of a sync job."""
+    return job
+
+
+@app.get("/sync/{job_id}/events")
+async def sync_events(job: SyncJob = Depends(get_sync_job)):
+    """Stream a sync job's state as Server-Sent Events until it finishes.
+
+    An event is sent whenever the state changes; the last one carries the
+    final status.
+    """
+
+    async def generate():
+        last = None
+        while True:
+            finished = job.finished
+            body = SYNC_JOB_JSON.dump_json(job)
+            if body != last:
+                yield b"data: " + body + b"\n\n"
+                last = body
+            if finished:
+                break
+            await asyncio.sleep(SYNC_EVENT_INTERVAL)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/gmail/push", status_code=204)
+def gmail_push(push: PubSubPush, token: Optional[str] = Query(None)):
+    """Receive a Gmail watch notification from a Pub/Sub push subscription.
+
+    If GMAIL_PUSH_TOKEN is set, the subscription's endpoint URL must carry it as
+    the ``token`` query parameter. Malformed notifications are acknowledged
+    (and logged) so Pub/Sub does not redeliver them forever.
+    """
+    expected = os.environ.get("GMAIL_PUSH_TOKEN")
+    if expected and not hmac.compare_digest(token or "", expected):
+        raise HTTPException(status_code=403, detail="Invalid push token")
+
+    try:
+        notification = decode_notification(push)
+    except ValueError as e:
+        logger.warning("Ignoring Gmail push: %s", e)
+        return Response(status_code=204)
+
+    gmail_push_debouncer.notify(notification)
+    return Response(status_code=204)
 
 
 @app.get("/transactions", response_model=PaginatedTransactions)
 def list_transactions(
+    request: Request,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    filters: TransactionFilters = Depends(get_transaction_filters),
     service: TransactionService = Depends(get_transaction_service),
 ):
-    """List transactions with pagination metadata."""
-    total = service.count_transactions()
-    transactions = service.list_transactions(limit=limit, offset=offset)
-    return PaginatedTransactions(total=total, transactions=transactions)
+    """List transactions matching the filters, with pagination metadata."""
 
+    def render():
+        count = service.count_transactions(filters)
+        transactions = service.list_transactions(limit=limit, offset=offset, filters=filters)
+        # Rows come straight from the service, so skip re-validating them.
+        return PaginatedTransactions.model_construct(
+            total=count.total, total_exact=count.exact, transactions=transactions
+        )
 
-@app.get("/transactions/{transaction_id}")
+    return conditional_json(request, service.db, render, PAGE_JSON)
+
+
+@app.get("/transactions/search", response_model=PaginatedTransactions)
+def search_transactions(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    service: TransactionService = Depends(get_transaction_service),
+):
+    """Full-text search over description, merchant and reference, best matches first."""
+
+    def render():
+        count, transactions = service.search_transactions(q, limit=limit, offset=offset)
+        # Rows come straight from the service, so skip re-validating them.
+        return PaginatedTransactions.model_construct(
+            total=count.total, total_exact=count.exact, transactions=transactions
+        )
+
+    return conditional_json(request, service.db, render, PAGE_JSON)
+
+
+@app.get("/transactions/export")
+def export_transactions(
+    format: Literal["csv", "ndjson"] = Query("csv"),  # pylint: disable=redefined-builtin
+    filters: TransactionFilters = Depends(get_transaction_filters),
+):
+    """Stream every transaction matching the filters as CSV or NDJSON."""
+
+    def generate():
+        # The stream outlives the request's dependencies, so it owns its Database.
+        db = Database()
+        try:
+            rows = TransactionService(db).iter_transactions(filters)
+            encode = iter_csv if format == "csv" else iter_ndjson
+            yield from encode(rows, TRANSACTION_FIELDS)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+
+@app.get("/transactions/{transaction_id}", response_model=TransactionRow)
 def get_transaction(
+    request: Request,
     transaction_id: int,
     service: TransactionService = Depends(get_transaction_service),
 ):
     """Get a single transaction by id."""
+    # Looked up before revalidation, so If-None-Match: * cannot turn a 404 into a 304.
     tx = service.get_transaction(transaction_id)
     if tx is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return tx
+    return conditional_json(request, service.db, lambda: tx, TRANSACTION_JSON)
+
+
+@app.get("/stats/monthly")
+def monthly_stats(
+    request: Request,
+    month_from: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    month_to: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    bank_id: Optional[int] = Query(None),
+    type: Optional[str] = Query(None),  # pylint: disable=redefined-builtin
+    service: StatsService = Depends(get_stats_service),
+):
+    """Spend and income per month, bank, type and category from the rollup table."""
+    return conditional_json(
+        request,
+        service.db,
+        lambda: service.monthly_rollups(
+            month_from=month_from, month_to=month_to, bank_id=bank_id, tx_type=type
+        ),
+        STATS_JSON,
+    )
+
+
+@app.get("/stats/monthly/totals")
+def monthly_totals(
+    request: Request,
+    month_from: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    month_to: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    bank_id: Optional[int] = Query(None),
+    service: StatsService = Depends(get_stats_service),
+):
+    """Expense and income totals per month across all banks (or a single bank)."""
+    return conditional_json(
+        request,
+        service.db,
+        lambda: service.monthly_totals(month_from=month_from, month_to=month_to, bank_id=bank_id),
+        STATS_JSON,
+    )
@@ -0,0 +1,344 @@
+"""Load-test the API with concurrent mixed reads while a sync writes.
+
+Starts the app in-process, either behind an ASGI transport (no sockets) or on
+a local uvicorn server, against a synthetic database in a scratch working
+directory. The app runs unmodified: every request opens and closes its own
+Database() through the regular dependencies, exactly as in production.
+
+``--concurrency`` clients then issue a weighted mix of listing pages (random
+depths and filters), detail lookups, searches and monthly stats for
+``--duration`` seconds. Unless ``--sync-messages 0`` is given, a sync of that
+many messages from FakeGmail (benchmarks/fake_gmail.py) is started through
+POST /sync at the same time, so reads contend with its inserts. The report
+gives throughput and p50/p95/p99 latency per endpoint, and how far the sync got.
+
+Usage:
+    python benchmarks/bench_api_load.py --rows 100000 --concurrency 16 --duration 30
+    python benchmarks/bench_api_load.py --transport uvicorn --sync-messages 0 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+# Ensure project root is importable when run as a script
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+import httpx
+
+from benchmarks.bench_filters import percentile
+from benchmarks.fake_gmail import FakeGmail, Mailbox
+from benchmarks.synthetic import MERCHANTS, build_database
+
+PAGE_SIZE = 50
+# Listings pick a page among the first MAX_PAGE pages.
+MAX_PAGE = 20
+LIST_FILTERS = ("", "bank_id=2", "type=income", "merchant=ub", "min_amount=1000")
+
+# Relative share of each request kind in the workload.
+DEFAULT_MIX = {"list": 5, "detail": 3, "search": 1, "stats": 1}
+
+# Seconds between sync status polls.
+SYNC_POLL_INTERVAL = 0.5
+
+
+def list_path(rng: random.Random, max_id: int) -> str:  # pylint: disable=unused-argument
+    """A listing page at a random depth, with a random filter."""
+    offset = rng.randrange(MAX_PAGE) * PAGE_SIZE
+    return f"/transactions?limit={PAGE_SIZE}&offset={offset}&{rng.choice(LIST_FILTERS)}"
+
+
+def detail_path(rng: random.Random, max_id: int) -> str:
+    """A random existing transaction."""
+    return f"/transactions/{rng.randint(1, max_id)}"
+
+
+def search_path(rng: random.Random, max_id: int) -> str:  # pylint: disable=unused-argument
+    """A search for a random merchant prefix."""
+    return f"/transactions/search?q={rng.choice(MERCHANTS)[:4].lower()}&limit={PAGE_SIZE}"
+
+
+def stats_path(rng: random.Random, max_id: int) -> str:  # pylint: disable=unused-argument
+    """Monthly totals for a random year."""
+    year = rng.randint(2021, 2025)
+    return f"/stats/monthly?month_from={year}-01&month_to={year}-12"
+
+
+REQUESTS: dict[str, Callable[[random.Random, int], str]] = {
+    "list": list_path,
+    "detail": detail_path,
+    "search": search_path,
+    "stats": stats_path,
+}
+
+
+def prepare(rows: int, sync_messages: int, seed: int) -> int:
+    """Build the database in the current directory and point syncs at a fake mailbox.
+
+    Returns:
+        The highest transaction id.
+    """
+    db = build_database(Path("expenses.db"), rows, seed)
+    try:
+        with db.engine.connect() as connection:
+            max_id = connection.exec_driver_sql("SELECT max(transaction_id) FROM transactions")
+            max_id = max_id.scalar_one()
+    finally:
+        db.close()
+
+    if sync_messages:
+        import main  # pylint: disable=import-outside-toplevel
+
+        gmail = FakeGmail(Mailbox(sync_messages, seed=seed))
+        main.get_credentials = lambda: None
+        main.get_gmail_service = lambda creds: gmail
+    return max_id
+
+
+@asynccontextmanager
+async def open_client(transport: str, concurrency: int):
+    """Yield an HTTP client for the app, served in-process or by a local uvicorn."""
+    import api  # pylint: disable=import-outside-toplevel
+
+    logging.getLogger("expense_tracker").setLevel(logging.WARNING)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if transport == "asgi":
+        asgi = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=asgi, base_url="http://bench") as client:
+            yield client
+        return
+
+    import uvicorn  # pylint: disable=import-outside-toplevel
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+        ) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    mix: dict[str, int],
+    max_id: int,
+    deadline: float,
+    latencies: dict[str, list[float]],
+    errors: dict[str, int],
+):
+    """Issue requests from the mix until the deadline, recording latency per kind."""
+    kinds, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        path = REQUESTS[kind](rng, max_id)
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        latencies[kind].append((time.perf_counter() - start) * 1000)
+        if failed:
+            errors[kind] += 1
+
+
+async def drive_sync(client: httpx.AsyncClient, load_done: asyncio.Event) -> dict:
+    """Start a sync through the API and poll it until it finishes."""
+    start = time.perf_counter()
+    job = (await client.post("/sync")).json()
+    during_load = None
+    while True:
+        job = (await client.get(f"/sync/{job['job_id']}")).json()
+        if load_done.is_set() and during_load is None:
+            during_load = dict(job["progress"])
+        if job["status"] in ("succeeded", "failed"):
+            break
+        await asyncio.sleep(SYNC_POLL_INTERVAL)
+    return {
+        "status": job["status"],
+        "error": job["error"],
+        "seconds": round(time.perf_counter() - start, 2),
+        "progress": job["progress"],
+        "progress_during_load": during_load or job["progress"],
+    }
+
+
+async def run_load(
+    transport: str,
+    concurrency: int,
+    duration: float,
+    mix: dict[str, int],
+    max_id: int,
+    sync: bool,
+    seed: int,
+) -> dict:
+    """Run the workload and return per-endpoint statistics."""
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    async with open_client(transport, concurrency) as client:
+        load_done = asyncio.Event()
+        sync_task = asyncio.create_task(drive_sync(client, load_done)) if sync else None
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                client_loop(
+                    client,
+                    random.Random(seed + i),
+                    mix,
+                    max_id,
+                    start + duration,
+                    latencies,
+                    errors,
+                )
+                for i in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        load_done.set()
+        sync_result = await sync_task if sync_task is not None else None
+
+    endpoints = {
+        kind: summarize(samples, errors[kind], elapsed) for kind, samples in latencies.items()
+    }
+    every = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "seconds": round(elapsed, 2),
+        "total": summarize(every, sum(errors.values()), elapsed),
+        "endpoints": endpoints,
+        "sync": sync_result,
+    }
+
+
+def summarize(samples: list[float], errors: int, elapsed: float) -> dict:
+    """Throughput and latency percentiles of one request kind."""
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def parse_mix(values: Optional[list[str]]) -> dict[str, int]:
+    """Turn ``kind=weight`` arguments into a workload mix."""
+    if not values:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for value in values:
+        kind, _, weight = value.partition("=")
+        if kind not in REQUESTS:
+            raise argparse.ArgumentTypeError(f"Unknown request kind: {kind}")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def print_results(results: dict):
+    """Print the per-endpoint table and the sync outcome."""
+    print(
+        f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for kind, r in [*results["endpoints"].items(), ("total", results["total"])]:
+        print(
+            f"{kind:<10} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}"
+        )
+    sync = results["sync"]
+    if sync is not None:
+        print(
+            f"sync: {sync['status']} in {sync['seconds']} s, "
+            f"{sync['progress_during_load']['inserted']} inserted during the load, "
+            f"{sync['progress']['inserted']} in total"
+            + (f" ({sync['error']})" if sync["error"] else "")
+        )
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument(
+        "--mix", action="append", help="kind=weight, kinds: " + ", ".join(REQUESTS)
+    )
+    parser.add_argument(
+        "--sync-messages", type=int, default=2_000, help="Messages the concurrent sync imports"
+    )
+    parser.add_argument("--workdir", type=Path, default=None, help="Keep the database here")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix="bench_api_") as tmp:
+        workdir = args.workdir or Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        cwd = Path.cwd()
+        # Database(), the body archive and the log file all use paths relative to it.
+        os.chdir(workdir)
+        try:
+            max_id = prepare(args.rows, args.sync_messages, args.seed)
+            results = asyncio.run(
+                run_load(
+                    args.transport,
+                    args.concurrency,
+                    args.duration,
+                    mix,
+                    max_id,
+                    args.sync_messages > 0,
+                    args.seed,
+                )
+            )
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        config = {
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "transport": args.transport,
+            "mix": mix,
+            "sync_messages": args.sync_messages,
+        }
+        print(json.dumps({"config": config, **results}, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Benchmark TransactionService and the read API as the database grows.
+
+For each database size (default 10k, 100k and 1M transactions), builds or
+reuses a synthetic database and measures p50/p99/max latency of:
+
+* service: list_transactions at several page depths and filter combinations,
+  count_transactions (filtered-count cache cleared and warm), get_transaction
+  on random ids, and save_transaction for new and duplicate emails;
+* api: GET /transactions at the same depths and filters, /transactions/{id},
+  /transactions/search and /stats/monthly, each both with the response cache
+  cleared ("cold") and served from it ("warm").
+
+Rows written by the save cases are deleted again, so a database file keeps its
+size across runs. Results are printed as a table or, with ``--json``, as one
+JSON document keyed by size, for comparing index, pragma and pagination
+changes.
+
+Usage:
+    python benchmarks/bench_db_scaling.py
+    python benchmarks/bench_db_scaling.py --rows 10000 100000 --iterations 30 --json > before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+# Ensure project root is importable when run as a script
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import api
+from benchmarks.bench_filters import FILTER_CASES, measure
+from benchmarks.synthetic import build_database
+from core.services import transaction_service
+from core.services.stats_service import StatsService
+from core.services.transaction_service import TransactionService
+from models.transaction import TransactionCreate
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+PAGE_DEPTHS = (0, 1_000, 10_000, 100_000)
+# Filters whose listing is also measured at every page depth.
+DEPTH_FILTERS = ("none", "bank", "type", "merchant")
+
+SAVE_PREFIX = "bench-save-"
+
+# Query strings for the API equivalents of FILTER_CASES.
+API_FILTERS = {
+    "none": "",
+    "month": "date_from=2024-03-01T00:00:00&date_to=2024-04-01T00:00:00",
+    "bank": "bank_id=2",
+    "type": "type=income",
+    "amount_range": "min_amount=1000&max_amount=2000",
+    "merchant": "merchant=oxx",
+    "bank+month": "bank_id=3&date_from=2024-03-01T00:00:00&date_to=2024-04-01T00:00:00",
+}
+
+
+def depths(rows: int, page_size: int) -> dict[str, int]:
+    """Return the page offsets to measure: fixed depths within the table, plus the last page."""
+    offsets = {f"offset_{depth}": depth for depth in PAGE_DEPTHS if depth < rows}
+    offsets["last_page"] = max(0, rows - page_size)
+    return offsets
+
+
+def clear_caches():
+    """Drop the filtered-count and API response caches."""
+    transaction_service._filtered_counts.clear()  # pylint: disable=protected-access
+    api.response_cache.clear()
+
+
+def service_cases(
+    service: TransactionService, rows: int, page_size: int, rng: random.Random
+) -> dict[str, tuple[Callable, Optional[Callable]]]:
+    """Return ``name -> (call, setup run before each call)`` for the service methods."""
+    cases: dict[str, tuple[Callable, Optional[Callable]]] = {}
+    for name, filters in FILTER_CASES.items():
+        cases[f"list[{name}]"] = (
+            lambda f=filters: service.list_transactions(limit=page_size, filters=f),
+            None,
+        )
+        cases[f"count_cold[{name}]"] = (
+            lambda f=filters: service.count_transactions(f),
+            clear_caches,
+        )
+        cases[f"count_warm[{name}]"] = (lambda f=filters: service.count_transactions(f), None)
+    for name in DEPTH_FILTERS:
+        filters = FILTER_CASES[name]
+        for depth, offset in depths(rows, page_size).items():
+            cases[f"list[{name}]@{depth}"] = (
+                lambda f=filters, o=offset: service.list_transactions(
+                    limit=page_size, offset=o, filters=f
+                ),
+                None,
+            )
+
+    max_id = service.list_transactions(limit=1)[0].transaction_id
+    cases["get[random]"] = (lambda: service.get_transaction(rng.randint(1, max_id)), None)
+
+    counter = itertools.count()
+    cases["save[new]"] = (
+        lambda: service.save_transaction(new_transaction(f"{SAVE_PREFIX}{next(counter)}")),
+        None,
+    )
+    cases["save[duplicate]"] = (
+        lambda: service.save_transaction(new_transaction("synthetic-000000001")),
+        None,
+    )
+    return cases
+
+
+def new_transaction(email_id: str) -> TransactionCreate:
+    """Build a transaction to save."""
+    return TransactionCreate(
+        email_id=email_id,
+        date=datetime(2025, 6, 1, 12, 0),
+        amount=123.45,
+        description="Compra OXXO",
+        type="expense",
+        bank_name="hey_banco",
+        merchant="OXXO",
+    )
+
+
+def api_cases(rows: int, page_size: int, max_id: int) -> dict[str, str]:
+    """Return ``name -> request path`` for the read endpoints."""
+    cases = {}
+    for name, query in API_FILTERS.items():
+        cases[f"/transactions[{name}]"] = f"/transactions?limit={page_size}&{query}"
+    for depth, offset in depths(rows, page_size).items():
+        cases[f"/transactions@{depth}"] = f"/transactions?limit={page_size}&offset={offset}"
+    cases["/transactions/{id}"] = f"/transactions/{max_id // 2}"
+    cases["/transactions/search"] = f"/transactions/search?q=oxxo&limit={page_size}"
+    cases["/stats/monthly"] = "/stats/monthly?month_from=2024-01&month_to=2024-12"
+    return cases
+
+
+def run_size(rows: int, iterations: int, page_size: int, db_dir: Path, seed: int) -> dict:
+    """Measure every case against a database of ``rows`` transactions."""
+    db_path = db_dir / f"bench_transactions_{rows}.db"
+    start = time.perf_counter()
+    db = build_database(db_path, rows)
+    build_s = round(time.perf_counter() - start, 2)
+
+    service = TransactionService(db)
+    rng = random.Random(seed)
+    result: dict = {"build_s": build_s, "service": {}, "api": {}}
+    try:
+        for name, (call, setup) in service_cases(service, rows, page_size, rng).items():
+            result["service"][name] = measure(call, iterations, before=setup)
+        with db.engine.begin() as connection:
+            connection.execute(
+                text("DELETE FROM transactions WHERE email_id LIKE :prefix"),
+                {"prefix": f"{SAVE_PREFIX}%"},
+            )
+
+        api.app.dependency_overrides[api.get_transaction_service] = lambda: TransactionService(db)
+        api.app.dependency_overrides[api.get_stats_service] = lambda: StatsService(db)
+        max_id = service.list_transactions(limit=1)[0].transaction_id
+        with TestClient(api.app) as client:
+            for name, path in api_cases(rows, page_size, max_id).items():
+                result["api"][f"{name} cold"] = measure(
+                    lambda p=path: client.get(p).raise_for_status(), iterations, before=clear_caches
+                )
+                result["api"][f"{name} warm"] = measure(
+                    lambda p=path: client.get(p).raise_for_status(), iterations
+                )
+    finally:
+        api.app.dependency_overrides.clear()
+        db.close()
+    result["db_mb"] = round(db_path.stat().st_size / 2**20, 1)
+    return result
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--db-dir", type=Path, default=Path("."), help="Where databases are kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("expense_tracker").setLevel(logging.WARNING)
+    results = {
+        rows: run_size(rows, args.iterations, args.page_size, args.db_dir, args.seed)
+        for rows in args.rows
+    }
+
+    if args.json:
+        config = {"iterations": args.iterations, "page_size": args.page_size}
+        print(json.dumps({"config": config, "results": results}, indent=2))
+        return
+    for rows, result in results.items():
+        print(f"\n{rows:,} rows ({result['db_mb']} MiB, built in {result['build_s']} s)")
+        print(f"{'case':<44} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for group in ("service", "api"):
+            for name, stats in result[group].items():
+                print(
+                    f"{group + ' ' + name:<44} {stats['p50_ms']:>9.3f} "
+                    f"{stats['p99_ms']:>9.3f} {stats['max_ms']:>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark filtered transaction listings on a large synthetic database.
+
+Measures TransactionService.list_transactions and count_transactions for a set
+of single and combined filters and reports p50/p99 latencies. The count is
+measured both cold (filtered-count cache cleared) and warm.
+
+Usage:
+    python benchmarks/bench_filters.py --rows 1000000 --max-p99-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Ensure project root is importable when run as a script
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from benchmarks.synthetic import build_database
+from core.services import transaction_service
+from core.services.transaction_service import TransactionService
+from models.transaction import TransactionFilters
+
+FILTER_CASES = {
+    "none": TransactionFilters(),
+    "month": TransactionFilters(date_from=datetime(2024, 3, 1), date_to=datetime(2024, 4, 1)),
+    "bank": TransactionFilters(bank_id=2),
+    "type": TransactionFilters(type="income"),
+    "amount_range": TransactionFilters(min_amount=1000, max_amount=2000),
+    "amount_rare": TransactionFilters(min_amount=200_000),
+    "merchant": TransactionFilters(merchant="oxx"),
+    "bank+month": TransactionFilters(
+        bank_id=3, date_from=datetime(2024, 3, 1), date_to=datetime(2024, 4, 1)
+    ),
+    "bank+type+quarter+amount": TransactionFilters(
+        bank_id=1,
+        type="expense",
+        date_from=datetime(2023, 1, 1),
+        date_to=datetime(2023, 4, 1),
+        min_amount=500,
+    ),
+    "merchant+year": TransactionFilters(
+        merchant="uber", date_from=datetime(2025, 1, 1), date_to=datetime(2026, 1, 1)
+    ),
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of samples using nearest rank."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func, iterations: int, before=None) -> dict:
+    """Call func repeatedly and return latency statistics in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def run(rows: int, iterations: int, page_size: int, db_path: Path) -> dict:
+    """Run every filter case and return the results keyed by case name."""
+    db = build_database(db_path, rows)
+    service = TransactionService(db)
+    results = {}
+    try:
+        for name, filters in FILTER_CASES.items():
+            results[name] = {
+                "list": measure(
+                    lambda f=filters: service.list_transactions(limit=page_size, filters=f),
+                    iterations,
+                ),
+                "count_cold": measure(
+                    lambda f=filters: service.count_transactions(f),
+                    iterations,
+                    before=transaction_service._filtered_counts.clear,  # pylint: disable=protected-access
+                ),
+                "count_warm": measure(
+                    lambda f=filters: service.count_transactions(f), iterations
+                ),
+                "matches": service.count_transactions(filters)._asdict(),
+            }
+    finally:
+        db.close()
+    return results
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--db", type=Path, default=None, help="Database file to (re)use")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail above this p99")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("expense_tracker").setLevel(logging.WARNING)
+    db_path = args.db or Path(f"bench_transactions_{args.rows}.db")
+    results = run(args.rows, args.iterations, args.page_size, db_path)
+
+    if args.json:
+        print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+    else:
+        print(f"{'filter':<26} {'list p50':>9} {'list p99':>9} {'count p99':>10} "
+              f"{'warm p99':>9} {'matches':>9}")
+        for name, result in results.items():
+            matches = result["matches"]
+            print(
+                f"{name:<26} {result['list']['p50_ms']:>9.2f} {result['list']['p99_ms']:>9.2f} "
+                f"{result['count_cold']['p99_ms']:>10.2f} {result['count_warm']['p99_ms']:>9.2f} "
+                f"{matches['total']:>8}{'' if matches['exact'] else '+'}"
+            )
+
+    if args.max_p99_ms is not None:
+        slow = [
+            name for name, result in results.items()
+            if max(result["list"]["p99_ms"], result["count_cold"]["p99_ms"]) > args.max_p99_ms
+        ]
+        if slow:
+            print(f"p99 above {args.max_p99_ms} ms: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Benchmark the bank email parsers on a synthetic corpus of every template.
+
+Parses ``--count`` emails of each template in benchmarks/parser_corpus.py, in
+its plain and noisy (marketing-heavy) variants, and reports emails per second
+and p50/p99 latency per parser and parsing method. Every parse is also checked
+against the amount and type the template was rendered with, so a regex change
+that breaks a template fails the run as well as one that slows it down.
+
+Regression check: ``--baseline`` compares each case's p50 with a stored
+baseline, scaled by how fast this machine runs a fixed calibration workload
+relative to the machine that recorded it, and exits 1 when a case is more than
+``--max-ratio`` times slower. ``--update-baseline`` records a new baseline.
+
+Usage:
+    python benchmarks/bench_parsers.py --count 200
+    python benchmarks/bench_parsers.py --baseline
+    python benchmarks/bench_parsers.py --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Ensure project root is importable when run as a script
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from benchmarks.bench_filters import percentile
+from benchmarks.parser_corpus import Sample, Template, generate
+from core.parsers.parser_helper import PARSERS
+
+BASELINE_FILE = _ROOT / "benchmarks" / "baselines" / "parsers.json"
+
+# A case fails when its p50 exceeds the scaled baseline by this factor...
+MAX_RATIO = 3.0
+# ...and by at least this much, so microsecond cases don't fail on timer noise.
+MIN_SLOWDOWN_MS = 0.05
+
+CALIBRATION_TEXT = "<td>Monto: <span>$1,234.56</span></td>" * 2000
+CALIBRATION_ROUNDS = 15
+
+
+def calibrate() -> float:
+    """Time a fixed regex and string workload, in milliseconds (median of rounds).
+
+    Stands in for "how fast is this machine" when comparing against a baseline
+    recorded elsewhere.
+    """
+    pattern = re.compile(r"Monto:.*?\$([\d,]+\.\d{2})", re.DOTALL)
+    samples = []
+    for _ in range(CALIBRATION_ROUNDS):
+        start = time.perf_counter()
+        total = 0.0
+        for match in pattern.finditer(CALIBRATION_TEXT):
+            total += float(match.group(1).replace(",", ""))
+        CALIBRATION_TEXT.lower().split("<td>")
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def is_correct(template: Template, sample: Sample, transaction) -> bool:
+    """Whether a parse result matches what the template was rendered with."""
+    if template.expected_type is None:
+        return transaction is None
+    return (
+        transaction is not None
+        and abs(transaction.amount - sample.amount) < 0.005
+        and transaction.type == template.expected_type
+        and transaction.date is not None
+    )
+
+
+def run(count: int, seed: int = 42) -> dict:
+    """Parse the corpus and return statistics keyed by ``bank/template[variant]``."""
+    # Load every parser before timing anything.
+    for bank in PARSERS:
+        PARSERS.get(bank)
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    sizes: dict[str, int] = defaultdict(int)
+    wrong: dict[str, int] = defaultdict(int)
+    cases: dict[str, Template] = {}
+    for template, variant, email_message, sample in generate(count, seed):
+        case = f"{template.key}[{variant}]"
+        cases[case] = template
+        parser = PARSERS[template.bank]
+        start = time.perf_counter()
+        transaction = parser.parse(email_message, email_message["id"])
+        samples[case].append((time.perf_counter() - start) * 1000)
+        sizes[case] += len(email_message["body_html"] or email_message["body_plain"])
+        if not is_correct(template, sample, transaction):
+            wrong[case] += 1
+
+    results = {}
+    for case, timings in samples.items():
+        template = cases[case]
+        results[case] = {
+            "parser": PARSERS.class_name(template.bank),
+            "method": template.method,
+            "emails": len(timings),
+            "avg_kb": round(sizes[case] / len(timings) / 1024, 1),
+            "emails_per_s": round(len(timings) / (sum(timings) / 1000), 1),
+            "p50_ms": round(statistics.median(timings), 4),
+            "p99_ms": round(percentile(timings, 99), 4),
+            "wrong": wrong[case],
+        }
+    return results
+
+
+def regressions(results: dict, baseline: dict, calibration_ms: float, max_ratio: float) -> list:
+    """Return ``(case, p50, allowed p50)`` for every case slower than the baseline allows."""
+    scale = calibration_ms / baseline["calibration_ms"]
+    slow = []
+    for case, result in results.items():
+        base = baseline["results"].get(case)
+        if base is None:
+            continue
+        expected = base["p50_ms"] * scale
+        allowed = max(expected * max_ratio, expected + MIN_SLOWDOWN_MS)
+        if result["p50_ms"] > allowed:
+            slow.append((case, result["p50_ms"], round(allowed, 4)))
+    return slow
+
+
+def print_results(results: dict):
+    """Print one line per case."""
+    print(
+        f"{'case':<50} {'parser':<18} {'method':<28} {'KB':>6} "
+        f"{'emails/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'wrong':>6}"
+    )
+    for case, r in results.items():
+        print(
+            f"{case:<50} {r['parser']:<18} {r['method']:<28} {r['avg_kb']:>6.1f} "
+            f"{r['emails_per_s']:>10.0f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['wrong']:>6}"
+        )
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="Emails per template and variant")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--baseline", type=Path, nargs="?", const=BASELINE_FILE, help="Fail on regressions vs this"
+    )
+    parser.add_argument(
+        "--update-baseline", type=Path, nargs="?", const=BASELINE_FILE, help="Write a new baseline"
+    )
+    parser.add_argument("--max-ratio", type=float, default=MAX_RATIO)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("expense_tracker").setLevel(logging.CRITICAL)
+    calibration_ms = calibrate()
+    results = run(args.count, args.seed)
+
+    if args.json:
+        print(json.dumps({"calibration_ms": calibration_ms, "results": results}, indent=2))
+    else:
+        print_results(results)
+        print(f"calibration: {calibration_ms:.3f} ms")
+
+    if args.update_baseline is not None:
+        args.update_baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline = {
+            "calibration_ms": calibration_ms,
+            "count": args.count,
+            "results": {case: {"p50_ms": r["p50_ms"]} for case, r in results.items()},
+        }
+        args.update_baseline.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+    failed = False
+    wrong = [case for case, r in results.items() if r["wrong"]]
+    if wrong:
+        print(f"Wrong parse results: {', '.join(wrong)}", file=sys.stderr)
+        failed = True
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        for case, p50, allowed in regressions(results, baseline, calibration_ms, args.max_ratio):
+            print(f"{case}: p50 {p50:.3f} ms above {allowed:.3f} ms", file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Benchmark the read endpoints' query-to-JSON path, before and after going ORM-free.
+
+For the listing, search and single-transaction endpoints, measures how many rows
+per second are turned into response bytes by:
+
+* legacy: hydrating Transaction and Bank ORM objects, copying them into dicts,
+  re-validating the page against a ``List[Dict[str, Any]]`` response model and
+  serializing it (the previous read path, reproduced here for comparison);
+* current: the service's Core-row read path producing TransactionRow objects,
+  serialized by the typed TypeAdapters the API uses.
+
+Usage:
+    python benchmarks/bench_serialization.py --rows 100000 --page-size 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Ensure project root is importable when run as a script
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import literal_column, text
+from sqlmodel import col, desc, func, select
+
+from api import PAGE_JSON, TRANSACTION_JSON, PaginatedTransactions
+from benchmarks.bench_filters import measure
+from benchmarks.synthetic import build_database
+from core.services.transaction_service import SEARCH_RANK, TransactionService
+from models.bank import Bank
+from models.transaction import Transaction
+
+SEARCH_QUERY = "oxxo"
+
+
+class LegacyPage(BaseModel):
+    """The previous, untyped listing response model."""
+
+    total: int
+    total_exact: bool
+    transactions: List[Dict[str, Any]]
+
+
+LEGACY_PAGE_JSON = TypeAdapter(LegacyPage)
+LEGACY_ROW_JSON = TypeAdapter(Dict[str, Any])
+
+
+def legacy_map(tx: Transaction, bank: Bank) -> Dict[str, Any]:
+    """Copy ORM objects into a response dict, as the previous read path did."""
+    return {
+        "transaction_id": tx.transaction_id,
+        "email_id": tx.email_id,
+        "date": tx.date,
+        "amount": tx.amount,
+        "description": tx.description,
+        "type": tx.type,
+        "bank_id": tx.bank_id,
+        "bank_name": bank.name,
+        "category_id": tx.category_id,
+        "subcategory_id": tx.subcategory_id,
+        "merchant": tx.merchant,
+        "reference": tx.reference,
+    }
+
+
+def legacy_rows(
+    service: TransactionService, limit: int, transaction_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Load a page of transactions through the ORM and map them to dicts."""
+    with service.db.session() as session:
+        stmt = (
+            select(Transaction, Bank)
+            .join(Bank, col(Bank.id) == col(Transaction.bank_id))
+            .order_by(desc(col(Transaction.date)), desc(col(Transaction.transaction_id)))
+            .limit(limit)
+        )
+        if transaction_id is not None:
+            stmt = stmt.where(col(Transaction.transaction_id) == transaction_id)
+        return [legacy_map(tx, bank) for tx, bank in session.exec(stmt).all()]
+
+
+def legacy_search(service: TransactionService, limit: int) -> List[Dict[str, Any]]:
+    """Load a page of search results through the ORM and map them to dicts."""
+    matches = (
+        select(
+            literal_column("rowid").label("transaction_id"),
+            literal_column(SEARCH_RANK).label("score"),
+        )
+        .select_from(text("transactions_fts"))
+        .where(text("transactions_fts MATCH :match"))
+        .subquery()
+    )
+    params = {"match": service._fts_query(SEARCH_QUERY)}  # pylint: disable=protected-access
+    with service.db.session() as session:
+        session.exec(select(func.count()).select_from(matches), params=params).one()  # pylint: disable=not-callable
+        stmt = (
+            select(Transaction, Bank)
+            .join(matches, matches.c.transaction_id == col(Transaction.transaction_id))
+            .join(Bank, col(Bank.id) == col(Transaction.bank_id))
+            .order_by(
+                matches.c.score,
+                desc(col(Transaction.date)),
+                desc(col(Transaction.transaction_id)),
+            )
+            .limit(limit)
+        )
+        return [legacy_map(tx, bank) for tx, bank in session.exec(stmt, params=params).all()]
+
+
+def legacy_page_bytes(rows: List[Dict[str, Any]]) -> bytes:
+    """Validate and serialize a page the way the untyped response model did."""
+    page = LEGACY_PAGE_JSON.validate_python(
+        {"total": len(rows), "total_exact": True, "transactions": rows}
+    )
+    return LEGACY_PAGE_JSON.dump_json(page)
+
+
+def current_page_bytes(rows) -> bytes:
+    """Serialize a page of TransactionRow objects the way the API does."""
+    page = PaginatedTransactions.model_construct(
+        total=len(rows), total_exact=True, transactions=rows
+    )
+    return PAGE_JSON.dump_json(page)
+
+
+def run(rows: int, iterations: int, page_size: int, db_path: Path) -> dict:
+    """Measure every endpoint's legacy and current paths and return rows/sec."""
+    db = build_database(db_path, rows)
+    service = TransactionService(db)
+    newest_id = service.list_transactions(limit=1)[0].transaction_id
+    search_rows = len(service.search_transactions(SEARCH_QUERY, limit=page_size)[1])
+
+    cases = {
+        "/transactions": (
+            page_size,
+            lambda: legacy_page_bytes(legacy_rows(service, page_size)),
+            lambda: current_page_bytes(service.list_transactions(limit=page_size)),
+        ),
+        "/transactions/search": (
+            search_rows,
+            lambda: legacy_page_bytes(legacy_search(service, page_size)),
+            lambda: current_page_bytes(service.search_transactions(SEARCH_QUERY, page_size)[1]),
+        ),
+        "/transactions/{id}": (
+            1,
+            lambda: LEGACY_ROW_JSON.dump_json(
+                LEGACY_ROW_JSON.validate_python(
+                    legacy_rows(service, 1, transaction_id=newest_id)[0]
+                )
+            ),
+            lambda: TRANSACTION_JSON.dump_json(service.get_transaction(newest_id)),
+        ),
+    }
+
+    results = {}
+    try:
+        for endpoint, (rows_per_call, legacy, current) in cases.items():
+            result = {"rows_per_call": rows_per_call}
+            for name, func in (("legacy", legacy), ("current", current)):
+                stats = measure(func, iterations)
+                stats["rows_per_sec"] = round(rows_per_call / stats["p50_ms"] * 1000)
+                result[name] = stats
+            result["speedup"] = round(
+                result["current"]["rows_per_sec"] / result["legacy"]["rows_per_sec"], 2
+            )
+            results[endpoint] = result
+    finally:
+        db.close()
+    return results
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--db", type=Path, default=None, help="Database file to (re)use")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("expense_tracker").setLevel(logging.WARNING)
+    db_path = args.db or Path(f"bench_transactions_{args.rows}.db")
+    results = run(args.rows, args.iterations, args.page_size, db_path)
+
+    if args.json:
+        print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+        return
+    print(f"{'endpoint':<22} {'legacy rows/s':>14} {'current rows/s':>15} {'speedup':>8}")
+    for endpoint, result in results.items():
+        print(
+            f"{endpoint:<22} {result['legacy']['rows_per_sec']:>14,} "
+            f"{result['current']['rows_per_sec']:>15,} {result['speedup']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
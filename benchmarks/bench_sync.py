@@ -0,0 +1,161 @@
+"""Benchmark a full offline sync against a fake Gmail mailbox.
+
+For each mailbox size, runs main.run_sync end to end against FakeGmail
+(benchmarks/fake_gmail.py) in a fresh working directory, so the database, body
+archive and labels all start empty, and reports messages per second, database
+inserts per second and the process's peak RSS. Each size runs in its own
+subprocess so peak RSS is that size's alone.
+
+Usage:
+    python benchmarks/bench_sync.py --sizes 1000 10000 100000
+    python benchmarks/bench_sync.py --sizes 10000 --duplicate-ratio 0.05 --bank hey_banco=3 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+# Ensure project root is importable when run as a script
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from benchmarks.fake_gmail import FakeGmail, Mailbox
+from constants.banks import SupportedBanks
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Prefix of the line a worker prints its result on.
+RESULT_PREFIX = "RESULT "
+
+
+def peak_rss_mb() -> float:
+    """Return this process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_once(mailbox: Mailbox) -> dict:
+    """Sync ``mailbox`` into the current directory and return the measurements."""
+    import main  # pylint: disable=import-outside-toplevel
+    from core.sync_jobs import SyncProgress  # pylint: disable=import-outside-toplevel
+
+    logging.getLogger("expense_tracker").setLevel(logging.ERROR)
+    gmail = FakeGmail(mailbox)
+    main.get_credentials = lambda: None
+    main.get_gmail_service = lambda creds: gmail
+
+    progress = SyncProgress()
+    start = time.perf_counter()
+    main.run_sync(progress)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": mailbox.size,
+        "listed": progress.listed,
+        "seconds": round(elapsed, 2),
+        "messages_per_s": round(progress.listed / elapsed, 1),
+        "inserts_per_s": round(progress.inserted / elapsed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "progress": asdict(progress),
+        "api_calls": gmail.calls,
+        "db_mb": round(Path("expenses.db").stat().st_size / 2**20, 1),
+        "archive_mb": round(
+            sum(f.stat().st_size for f in Path("data", "archive").glob("*")) / 2**20, 1
+        ),
+    }
+
+
+def run_size(size: int, args: argparse.Namespace, workdir: Optional[Path] = None) -> dict:
+    """Run one size in a subprocess inside ``workdir`` (default: a temporary directory)."""
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        str(size),
+        "--noisy-ratio",
+        str(args.noisy_ratio),
+        "--duplicate-ratio",
+        str(args.duplicate_ratio),
+        "--seed",
+        str(args.seed),
+        *(f"--bank={bank}={weight}" for bank, weight in (args.bank or {}).items()),
+    ]
+    with tempfile.TemporaryDirectory(prefix="bench_sync_") as tmp:
+        cwd = workdir / str(size) if workdir else Path(tmp)
+        cwd.mkdir(parents=True, exist_ok=True)
+        completed = subprocess.run(
+            command, cwd=cwd, capture_output=True, text=True, check=False
+        )
+    result_lines = [
+        line for line in completed.stdout.splitlines() if line.startswith(RESULT_PREFIX)
+    ]
+    if completed.returncode != 0 or not result_lines:
+        raise RuntimeError(f"Sync of {size} messages failed:\n{completed.stderr[-2000:]}")
+    return json.loads(result_lines[-1][len(RESULT_PREFIX) :])
+
+
+def parse_bank_weights(values: Optional[list[str]]) -> Optional[dict[SupportedBanks, float]]:
+    """Turn ``bank=weight`` arguments into Mailbox bank weights."""
+    if not values:
+        return None
+    weights = {}
+    for value in values:
+        bank, _, weight = value.partition("=")
+        weights[SupportedBanks(bank)] = float(weight or 1)
+    return weights
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument(
+        "--bank", action="append", help="bank=weight, e.g. paypal=2 (default: all banks equally)"
+    )
+    parser.add_argument("--noisy-ratio", type=float, default=0.1)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, default=None, help="Keep each run's files here")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.bank = parse_bank_weights(args.bank)
+
+    if args.worker is not None:
+        mailbox = Mailbox(
+            args.worker, args.bank, args.noisy_ratio, args.duplicate_ratio, args.seed
+        )
+        print(RESULT_PREFIX + json.dumps(run_once(mailbox)))
+        return
+
+    results = {}
+    for size in args.sizes:
+        results[size] = run_size(size, args, args.workdir)
+        if not args.json:
+            r = results[size]
+            print(
+                f"{size:>8} messages: {r['messages_per_s']:>8.0f} msg/s "
+                f"{r['inserts_per_s']:>8.0f} inserts/s  peak RSS {r['peak_rss_mb']:.0f} MiB  "
+                f"({r['seconds']:.1f} s, {r['progress']['inserted']} inserted, "
+                f"{r['progress']['skipped']} skipped, {r['progress']['errors']} errors)"
+            )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""An offline stand-in for the Gmail API client, backed by a generated mailbox.
+
+FakeGmail answers the calls run_sync makes on the object returned by
+get_gmail_service(): paged ``users().messages().list``, ``messages().get`` in
+``raw`` and ``metadata`` formats, ``messages().batchModify``, label listing and
+creation, ``history().list`` and ``getProfile``. Messages are rendered
+from benchmarks/parser_corpus.py templates and encoded exactly like Gmail's
+raw format, so everything after the API call (MIME parsing, parser
+routing, archiving, labelling, inserts) runs as it does against a real account.
+
+The mailbox has a configurable mix of banks, share of marketing-heavy bodies
+and share of duplicate listings (a message id listed again later, as happens
+when mail arrives while a sync pages through results).
+
+Like Gmail, ``messages.list`` applies the ``label:`` and ``-label:`` terms of
+its query to each page request, and page tokens are offsets into the result,
+so labelling messages while paging shifts later pages.
+"""
+
+# Method and argument names mirror the Gmail API client.
+# pylint: disable=invalid-name,unused-argument,redefined-builtin,too-many-arguments
+
+from __future__ import annotations
+
+import base64
+import random
+import re
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Iterable, Optional
+
+from benchmarks.parser_corpus import TEMPLATES, Template, render
+from constants.banks import SupportedBanks, bank_emails
+from core.gmail_labels import search_name
+
+# Gmail's maximum page size for messages.list.
+MAX_PAGE_SIZE = 500
+
+# Label terms of a search query: ``label:name`` and ``-label:name``.
+_LABEL_TERM = re.compile(r"(-?)label:(\S+)")
+
+
+@dataclass
+class Mailbox:
+    """A deterministic generated mailbox.
+
+    Rendering a MIME message costs about as much as syncing it, so each
+    template and variant is rendered ``distinct`` times up front and messages
+    share those bodies. The distinct renders are what the mailbox holds in
+    memory (a few tens of MiB), whatever its size.
+
+    Attributes:
+        size: Distinct messages
+        banks: Relative weight of each bank's templates (default: equal)
+        noisy_ratio: Share of messages with marketing-heavy bodies
+        duplicate_ratio: Chance of each listed message being followed by a repeat
+            of an earlier id
+        seed: Random seed; the same arguments always produce the same mailbox
+        distinct: Bodies rendered per template and variant
+    """
+
+    size: int
+    banks: Optional[dict[SupportedBanks, float]] = None
+    noisy_ratio: float = 0.1
+    duplicate_ratio: float = 0.0
+    seed: int = 0
+    distinct: int = 16
+    listing: list[str] = field(init=False, repr=False)
+    _specs: dict[str, tuple[Template, str, int]] = field(init=False, repr=False)
+    _raw: dict[tuple[Template, str, int], str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        rng = random.Random(self.seed)
+        weights = self.banks or {template.bank: 1.0 for template in TEMPLATES}
+        templates = [t for t in TEMPLATES if weights.get(t.bank)]
+        per_template = [
+            weights[t.bank] / sum(1 for u in templates if u.bank == t.bank) for t in templates
+        ]
+        self._specs = {}
+        self._raw = {}
+        for i in range(self.size):
+            template = rng.choices(templates, per_template)[0]
+            variant = "noisy" if rng.random() < self.noisy_ratio else "plain"
+            spec = (template, variant, rng.randrange(self.distinct))
+            if spec not in self._raw:
+                self._raw[spec] = self._render(spec, len(self._raw))
+            self._specs[f"{i:016x}"] = spec
+
+        self.listing = []
+        for msg_id in self._specs:
+            self.listing.append(msg_id)
+            if rng.random() < self.duplicate_ratio:
+                self.listing.append(self.listing[rng.randrange(len(self.listing))])
+
+    def _render(self, spec: tuple[Template, str, int], index: int) -> str:
+        """Render a message as Gmail's ``raw`` field: base64url RFC 822 bytes."""
+        template, variant, _ = spec
+        rng = random.Random(f"{self.seed}:{index}")
+        email_message, _ = render(template, variant, rng, index)
+
+        message = EmailMessage()
+        message["From"] = bank_emails[template.bank][0]
+        message["To"] = email_message["to"]
+        message["Subject"] = email_message["subject"]
+        message["Date"] = email_message["date"]
+        if template.html:
+            message.set_content(email_message["body_html"], subtype="html")
+            message.make_alternative()
+        else:
+            message.set_content(email_message["body_plain"])
+        return base64.urlsafe_b64encode(message.as_bytes()).decode("ascii")
+
+    def message_ids(self) -> list[str]:
+        """Return the distinct message ids."""
+        return list(self._specs)
+
+    def template(self, msg_id: str) -> Template:
+        """Return the template a message was rendered from."""
+        return self._specs[msg_id][0]
+
+    def sender(self, msg_id: str) -> str:
+        """Return a message's From address."""
+        return bank_emails[self.template(msg_id).bank][0]
+
+    def raw(self, msg_id: str) -> str:
+        """Return a message in Gmail's ``raw`` format."""
+        return self._raw[self._specs[msg_id]]
+
+
+class FakeGmail:
+    """Gmail API client stand-in serving a Mailbox.
+
+    Call counts are kept in ``calls`` (e.g. ``calls["messages.get"]``) so a
+    benchmark can report API round trips per message. ``page_size`` caps
+    ``messages.list`` pages below Gmail's maximum, e.g. to make a test page.
+    """
+
+    def __init__(self, mailbox: Mailbox, page_size: int = MAX_PAGE_SIZE):
+        """Serve ``mailbox`` with no labels applied yet."""
+        self.mailbox = mailbox
+        self.page_size = page_size
+        self.label_names: dict[str, str] = {}
+        self.message_labels: dict[str, set[str]] = {}
+        self.calls: dict[str, int] = {}
+
+    def request(self, name: str, body: dict) -> "_Request":
+        """Count a call to API method ``name`` and return a request yielding ``body``."""
+        self.calls[name] = self.calls.get(name, 0) + 1
+        return _Request(body)
+
+    def users(self) -> "FakeGmail":
+        """Return the users resource (the client itself)."""
+        return self
+
+    def messages(self) -> "_Messages":
+        """Return the users.messages resource."""
+        return _Messages(self)
+
+    def labels(self) -> "_Labels":
+        """Return the users.labels resource."""
+        return _Labels(self)
+
+    def history(self) -> "_History":
+        """Return the users.history resource."""
+        return _History(self)
+
+    def getProfile(self, userId: str) -> "_Request":
+        """Return the mailbox address and current history id."""
+        return self.request("getProfile", {"emailAddress": "me@example.com", "historyId": "1"})
+
+    def matching(self, query: Optional[str]) -> list[str]:
+        """Return the listing restricted by the ``label:`` and ``-label:`` terms of a query."""
+        listing = self.mailbox.listing
+        terms = _LABEL_TERM.findall(query or "")
+        if not terms:
+            return listing
+        ids = {search_name(name): label_id for name, label_id in self.label_names.items()}
+        # A label that does not exist yet is carried by no message.
+        required = {ids.get(label, label) for negated, label in terms if not negated}
+        excluded = {ids[label] for negated, label in terms if negated and label in ids}
+        empty: set[str] = set()
+        return [
+            msg_id
+            for msg_id in listing
+            if required <= (labels := self.message_labels.get(msg_id, empty))
+            and not excluded & labels
+        ]
+
+
+class _Messages:
+    """users.messages: paged search, downloads and label changes."""
+
+    def __init__(self, gmail: FakeGmail):
+        self.gmail = gmail
+
+    def list(self, userId, q=None, maxResults=100, pageToken=None, **kwargs):
+        """List a page of the messages matching the query's label terms."""
+        listing = self.gmail.matching(q)
+        start = int(pageToken or 0)
+        end = start + min(maxResults or 100, self.gmail.page_size)
+        messages = [{"id": msg_id, "threadId": msg_id} for msg_id in listing[start:end]]
+        body: dict = {"messages": messages, "resultSizeEstimate": len(listing)}
+        if end < len(listing):
+            body["nextPageToken"] = str(end)
+        return self.gmail.request("messages.list", body)
+
+    def get(self, userId, id, format="full", metadataHeaders=None, **kwargs):
+        """Return a message in ``raw`` format, or its From header as metadata."""
+        mailbox = self.gmail.mailbox
+        body: dict = {"id": id, "threadId": id}
+        if format == "raw":
+            body["raw"] = mailbox.raw(id)
+        else:
+            body["payload"] = {"headers": [{"name": "From", "value": mailbox.sender(id)}]}
+        return self.gmail.request("messages.get", body)
+
+    def batchModify(self, userId, body):
+        """Add and remove labels on a batch of messages."""
+        for msg_id in body["ids"]:
+            labels = self.gmail.message_labels.setdefault(msg_id, set())
+            labels.update(body.get("addLabelIds", []))
+            labels.difference_update(body.get("removeLabelIds", []))
+        return self.gmail.request("messages.batchModify", {})
+
+
+class _Labels:
+    """users.labels: listing and creating user labels."""
+
+    def __init__(self, gmail: FakeGmail):
+        self.gmail = gmail
+
+    def list(self, userId):
+        """List the labels created so far."""
+        names = self.gmail.label_names
+        labels = [{"id": label_id, "name": name} for name, label_id in names.items()]
+        return self.gmail.request("labels.list", {"labels": labels})
+
+    def create(self, userId, body):
+        """Create a label and return it with its new id."""
+        label_id = f"Label_{len(self.gmail.label_names) + 1}"
+        self.gmail.label_names[body["name"]] = label_id
+        return self.gmail.request("labels.create", {"id": label_id, **body})
+
+
+class _History:
+    """users.history: the mailbox never changes, so there is no history."""
+
+    def __init__(self, gmail: FakeGmail):
+        self.gmail = gmail
+
+    def list(self, userId, startHistoryId, historyTypes: Iterable[str] = (), pageToken=None):
+        """Return an empty history page."""
+        return self.gmail.request("history.list", {"historyId": "1"})
+
+
+class _Request:
+    """A prepared API call answering with a fixed body."""
+
+    def __init__(self, body: dict):
+        self.body = body
+
+    def execute(self) -> dict:
+        """Return the response body."""
+        return self.body
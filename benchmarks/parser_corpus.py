@@ -0,0 +1,404 @@
+"""Synthetic bank notification emails for every supported parser template.
+
+Each Template renders emails shaped like the ones its bank sends: the subject
+the parser routes on, and an HTML or plain-text body containing the fields its
+regular expressions look for, with randomized amounts, dates and names. Every
+template is rendered in two variants:
+
+* plain: just the notification;
+* noisy: the notification buried in tens of kilobytes of marketing markup
+  (banners, promo tables, legal footers), which is what makes lazy ``.*?``
+  scans and backtracking expensive.
+
+Templates also record the amount and type a correct parse returns, so the same
+corpus checks parser correctness as well as speed.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from constants.banks import SupportedBanks
+
+VARIANTS = ("plain", "noisy")
+
+# Marketing markup added around the notification in the noisy variant.
+NOISY_KB = 64
+
+MONTHS_ES = ("ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic")
+MONTHS_EN = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+MONTHS_LONG_ES = (
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+)
+MERCHANTS = ("OXXO CENTRO", "UBER TRIP", "AMAZON MX", "SPOTIFY", "WALMART SUPERCENTER", "Vultr")
+CONCEPTS = ("Renta", "Pago servicios", "Comida", "Reembolso", "Colegiatura")
+WORDS = (
+    "descubre", "beneficios", "exclusivos", "para", "ti", "aprovecha", "promociones",
+    "tarjeta", "meses", "sin", "intereses", "cashback", "recompensas", "invita", "amigos",
+    "consulta", "terminos", "condiciones", "privacidad", "aviso", "seguridad", "nunca",
+    "solicitaremos", "datos", "personales", "descarga", "app", "disponible", "tienda",
+)
+
+
+@dataclass
+class Sample:
+    """Randomized values shared by a template's fields."""
+
+    amount: float
+    day: int
+    month: int
+    year: int
+    hour: int
+    minute: int
+    second: int
+    merchant: str
+    concept: str
+    reference: str
+
+    @property
+    def money(self) -> str:
+        """The amount with thousands separators, e.g. ``1,234.50``."""
+        return f"{self.amount:,.2f}"
+
+    @property
+    def date_header(self) -> str:
+        """An RFC 2822 Date header."""
+        return (
+            f"Wed, {self.day:02d} {MONTHS_EN[self.month - 1]} {self.year} "
+            f"{self.hour:02d}:{self.minute:02d}:{self.second:02d} -0600"
+        )
+
+
+def new_sample(rng: random.Random) -> Sample:
+    """Draw random field values."""
+    return Sample(
+        amount=round(rng.uniform(10, 25_000), 2),
+        day=rng.randint(1, 28),
+        month=rng.randint(1, 12),
+        year=rng.randint(2022, 2026),
+        hour=rng.randint(0, 23),
+        minute=rng.randint(0, 59),
+        second=rng.randint(0, 59),
+        merchant=rng.choice(MERCHANTS),
+        concept=rng.choice(CONCEPTS),
+        reference="".join(rng.choice("0123456789ABCDEFGHJKLMNPQRSTUVWXYZ") for _ in range(17)),
+    )
+
+
+@dataclass(frozen=True)
+class Template:
+    """One kind of notification a parser handles.
+
+    Attributes:
+        bank: Bank whose parser handles it
+        name: Template name, unique within the bank
+        method: Parser method that handles it
+        subject: Subject line
+        html: Whether the body is HTML (else plain text)
+        render: Builds the body from a Sample
+        expected_type: Transaction type a correct parse returns, or None if the
+            parser must ignore the email
+        uses_date_header: Whether the parser reads the date from the Date header
+    """
+
+    bank: SupportedBanks
+    name: str
+    method: str
+    subject: str
+    html: bool
+    render: Callable[[Sample], str]
+    expected_type: Optional[str]
+    uses_date_header: bool = False
+
+    @property
+    def key(self) -> str:
+        """Unique label, e.g. ``hey_banco/spei_reception``."""
+        return f"{self.bank}/{self.name}"
+
+
+def _hey_spei_reception(s: Sample) -> str:
+    return (
+        '<table><tr><td class="label">Cantidad<br/>'
+        f'<span style="font-weight:bold">{s.amount:.2f}</span></td></tr>'
+        '<tr><td class="label">Concepto pago:<br/>'
+        f'<span style="font-weight:bold">{s.concept}</span></td></tr>'
+        '<tr><td class="label">Fecha de aplicaci&oacute;n:<br/>'
+        f'<span style="font-weight:bold">{s.day:02d} {MONTHS_EN[s.month - 1]} {s.year} '
+        f'{s.hour % 12 or 12:02d}:{s.minute:02d}:{s.second:02d} {"PM" if s.hour >= 12 else "AM"}'
+        "</span></td></tr></table>"
+    )
+
+
+def _hey_long_date(s: Sample) -> str:
+    suffix = "p. m." if s.hour >= 12 else "a. m."
+    month = MONTHS_LONG_ES[s.month - 1]
+    return f"{s.day} {month} {s.year}, {s.hour % 12 or 12}:{s.minute:02d} {suffix}"
+
+
+def _hey_spei_outgoing(s: Sample) -> str:
+    return (
+        '<table><tr><td class="amount">$ ' + s.money + "</td></tr>"
+        '<tr><td class="label">Concepto de Pago</td>'
+        f'<td><span class="value">{s.concept}</span></td></tr>'
+        '<tr><td class="label">Fecha de solicitaci&oacute;n</td>'
+        f'<td><span class="value">{_hey_long_date(s)}</span></td></tr></table>'
+    )
+
+
+def _hey_card_payment(s: Sample) -> str:
+    return (
+        '<table><tr><td class="label">Monto:</td>'
+        f"<td>$ <span>{s.money}</span></td></tr>"
+        '<tr><td class="label">Descripci&oacute;n:</td><td><span>Pago Tarjeta Hey</span></td></tr>'
+        '<tr><td class="label">Fecha de solicitaci&oacute;n:</td>'
+        f"<td><span>{_hey_long_date(s)}</span></td></tr></table>"
+    )
+
+
+def _hey_card_purchase(s: Sample) -> str:
+    return (
+        "<p>Realizaste una compra con tu <b>Cr&eacute;dito</b> terminaci&oacute;n 1234</p>"
+        f'<p class="label">Cantidad:</p><h4 style="margin:0">${s.money}</h4>'
+        f'<p class="label">Comercio:</p><h4 style="margin:0">{s.merchant}</h4>'
+        '<p class="label">Fecha y hora de la transacci&oacute;n:</p>'
+        f'<h4 style="margin:0">{s.day:02d}/{s.month:02d}/{s.year} - '
+        f"{s.hour:02d}:{s.minute:02d} hrs</h4>"
+    )
+
+
+def _hey_card_rejected(s: Sample) -> str:
+    return (
+        "<p>La compra que realizaste fue rechazada por Fondos Insuficientes.</p>"
+        f'<p class="label">Comercio:</p><h4>{s.merchant}</h4>'
+    )
+
+
+def _nubank_card_payment(s: Sample) -> str:
+    return f"Hola,\n\nRecibimos tu pago por ${s.money} a tu tarjeta de credito Nu.\nGracias."
+
+
+def _nubank_spei_outgoing(s: Sample) -> str:
+    return (
+        "Tu transferencia fue exitosa\n\n"
+        f"Monto: ${s.money}\n"
+        f"Fecha: {s.day:02d}/{MONTHS_ES[s.month - 1].upper()}/{s.year}\n"
+        f"Hora: {s.hour:02d}:{s.minute:02d}\n"
+        f"Concepto: {s.concept}\n"
+    )
+
+
+def _nubank_spei_reception(s: Sample) -> str:
+    return f"Recibiste una transferencia de ${s.money} de JUAN PEREZ.\nConcepto: {s.concept}"
+
+
+def _rappi_payment(s: Sample) -> str:
+    return (
+        f"Recibimos tu pago por ${s.money} el {s.day} {MONTHS_ES[s.month - 1]} {s.year}.\n"
+        "Tu linea de credito se actualizara en breve."
+    )
+
+
+def _banorte_spei(s: Sample) -> str:
+    return (
+        "<table>"
+        '<tr><td class="l">Importe: </td>\n<td nowrap="nowrap">\n'
+        f"${s.money} MN\n</td></tr>"
+        '<tr><td class="l">Operación: </td>\n<td align="left" nowrap="nowrap">\n'
+        f"{s.concept.upper()}\n</td></tr>"
+        '<tr><td class="l">Hora de Operación: </td>\n<td nowrap="nowrap">\n'
+        f"{s.hour:02d}:{s.minute:02d}:{s.second:02d} horas\n</td></tr>"
+        '<tr><td class="l">Fecha de Operación: </td>\n<td nowrap="nowrap">\n'
+        f"{s.day:02d}/{MONTHS_ES[s.month - 1].capitalize()}/{s.year}\n</td></tr>"
+        "</table>"
+    )
+
+
+def _mercado_pago_spei(s: Sample) -> str:
+    return f"Hiciste una transferencia de ${s.money}.\nLa recibira JUAN PEREZ en su cuenta."
+
+
+def _paypal_new(s: Sample) -> str:
+    return (
+        f'<p><span class="headline">Ha pagado ${s.money} &nbsp;USD a {s.merchant}</span></p>'
+        "<table><tr><td><span><strong>Comercio</strong></span><br />"
+        f"<span>{s.merchant}</span></td>"
+        "<td><span><strong>Fecha de la transacción</strong></span><br />"
+        f"<span>{s.day} {MONTHS_ES[s.month - 1]} {s.year}</span></td></tr>"
+        "<tr><td><span><strong>Id. de transacción</strong></span><br />"
+        f'<a href="https://www.paypal.com/activity"><span>{s.reference}</span></a></td></tr>'
+        f"<tr><td><strong>Total</strong></td><td>${s.money} USD</td></tr></table>"
+    )
+
+
+def _paypal_old(s: Sample) -> str:
+    return (
+        f'<div style="display:inline;">{s.day:02d}/{s.month:02d}/{s.year} '
+        f"{s.hour:02d}:{s.minute:02d}:{s.second:02d} GMT</div>"
+        f"<p>Ha enviado un pago por importe de ${s.money} MXN a {s.merchant}.</p>"
+        '<table><tr><td><span class="l">Comercio</span><br/>'
+        f'<span class="v">{s.merchant}</span></td></tr>'
+        f'<tr><td>Id. de transacción: <a href="#">{s.reference}</a></td></tr></table>'
+    )
+
+
+def _paypal_received(s: Sample) -> str:
+    return (
+        f'<div style="display:inline;">{s.day:02d}/{s.month:02d}/{s.year} '
+        f"{s.hour:02d}:{s.minute:02d}:{s.second:02d} GMT</div>"
+        f"<p>Recibiste un pago de ${s.money} MXN de Juan Perez.</p>"
+        f"<p>Id. de transacción: <b>{s.reference}</b></p>"
+    )
+
+
+def _paypal_security(s: Sample) -> str:  # pylint: disable=unused-argument
+    return "<p>Su contraseña se cambió correctamente.</p>"
+
+
+TEMPLATES: tuple[Template, ...] = (
+    Template(
+        SupportedBanks.HEY_BANCO, "spei_reception", "_parse_spei_reception",
+        "Recepción de transferencia nacional SPEI", True, _hey_spei_reception, "income",
+    ),
+    Template(
+        SupportedBanks.HEY_BANCO, "spei_outgoing", "_parse_outgoing_transfer",
+        "Banca Electrónica Hey, Solicitud de Transferencia Nacional SPEI.", True,
+        _hey_spei_outgoing, "expense",
+    ),
+    Template(
+        SupportedBanks.HEY_BANCO, "card_payment", "_parse_credit_card_payment",
+        "Banca Electrónica Hey, Solicitud de pago de Tarjeta Hey", True,
+        _hey_card_payment, "expense",
+    ),
+    Template(
+        SupportedBanks.HEY_BANCO, "card_purchase", "_parse_credit_card_purchase",
+        "Servicio de Alertas HeyBanco", True, _hey_card_purchase, "expense",
+    ),
+    Template(
+        SupportedBanks.HEY_BANCO, "card_purchase_rejected", "_parse_credit_card_purchase",
+        "Servicio de Alertas HeyBanco", True, _hey_card_rejected, None,
+    ),
+    Template(
+        SupportedBanks.NUBANK, "card_payment", "_parse_credit_card_payment",
+        "¡Recibimos tu pago!", False, _nubank_card_payment, "expense", uses_date_header=True,
+    ),
+    Template(
+        SupportedBanks.NUBANK, "spei_outgoing", "_parse_outgoing_transfer",
+        "Tu transferencia fue exitosa", False, _nubank_spei_outgoing, "expense",
+    ),
+    Template(
+        SupportedBanks.NUBANK, "spei_reception", "_parse_spei_reception",
+        "¡Recibiste una transferencia!", False, _nubank_spei_reception, "income",
+        uses_date_header=True,
+    ),
+    Template(
+        SupportedBanks.RAPPI, "card_payment", "_parse_credit_card_payment",
+        "Recibimos el pago de tu Rappicard", False, _rappi_payment, "expense",
+    ),
+    Template(
+        SupportedBanks.RAPPI, "card_payment_cashback", "_parse_credit_card_payment",
+        "Recibimos el abono de tu Rappicard", False, _rappi_payment, "expense",
+    ),
+    Template(
+        SupportedBanks.BANORTE, "spei_outgoing", "_parse_outgoing_transfer",
+        "Transferencia a Otros Bancos Nacionales - SPEI", True, _banorte_spei, "expense",
+    ),
+    Template(
+        SupportedBanks.MERCADO_PAGO, "spei_outgoing", "_parse_outgoing_transfer",
+        "Tu transferencia fue enviada", False, _mercado_pago_spei, "expense",
+        uses_date_header=True,
+    ),
+    Template(
+        SupportedBanks.PAYPAL, "payment_new_template", "parse",
+        "Recibo de su pago a un comercio", True, _paypal_new, "expense",
+    ),
+    Template(
+        SupportedBanks.PAYPAL, "payment_old_template", "parse",
+        "Ha autorizado un pago a un comercio", True, _paypal_old, "expense",
+    ),
+    Template(
+        SupportedBanks.PAYPAL, "payment_received", "parse",
+        "Te ha enviado dinero", True, _paypal_received, "income",
+    ),
+    Template(
+        SupportedBanks.PAYPAL, "security_notice", "parse",
+        "Su contraseña de PayPal ha cambiado", True, _paypal_security, None,
+    ),
+)
+
+
+def marketing_html(rng: random.Random, kb: int) -> str:
+    """Render roughly ``kb`` kilobytes of promotional email markup.
+
+    The text uses no digits or currency signs, so it cannot be mistaken for a
+    transaction field.
+    """
+    blocks = []
+    size = 0
+    while size < kb * 1024:
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+        color = rng.choice(("333333", "ff6600", "0a2540", "eeeeee"))
+        block = (
+            f'<table role="presentation" width="100%" cellpadding="0" cellspacing="0" '
+            f'style="background-color:#{color};border-collapse:collapse">'
+            f'<tr><td style="padding:16px;font-family:Helvetica,Arial,sans-serif;'
+            f'font-size:14px;line-height:20px;color:#{color}">'
+            f'<img src="https://cdn.example.com/promo/banner.png" alt="{rng.choice(WORDS)}" '
+            f'width="600" style="display:block;border:0"/>'
+            f"<p>{words}</p>"
+            f'<a href="https://click.example.com/track?campaign=promo&amp;u=abc" '
+            f'style="color:#ff6600">{rng.choice(WORDS).capitalize()}</a>'
+            "</td></tr></table>\n"
+        )
+        blocks.append(block)
+        size += len(block)
+    return "".join(blocks)
+
+
+def marketing_text(rng: random.Random, kb: int) -> str:
+    """Render roughly ``kb`` kilobytes of plain-text promotions and legal footer."""
+    lines = []
+    size = 0
+    while size < kb * 1024:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def render(template: Template, variant: str, rng: random.Random, index: int) -> tuple[dict, Sample]:
+    """Render one email of a template in the shape parse_email() returns."""
+    sample = new_sample(rng)
+    body = template.render(sample)
+    if variant == "noisy":
+        if template.html:
+            body = (
+                f"<html><body>{marketing_html(rng, NOISY_KB // 2)}{body}"
+                f"{marketing_html(rng, NOISY_KB // 2)}</body></html>"
+            )
+        else:
+            body = f"{body}\n\n{marketing_text(rng, NOISY_KB)}"
+    email_message = {
+        "id": f"{template.bank}-{index:06d}",
+        "subject": template.subject,
+        "from": "",
+        "to": "me@example.com",
+        "date": sample.date_header,
+        "body_html": body if template.html else "",
+        "body_plain": body,
+    }
+    return email_message, sample
+
+
+def generate(count: int, seed: int = 42) -> Iterator[tuple[Template, str, dict, Sample]]:
+    """Yield ``count`` emails of every template and variant, deterministically."""
+    rng = random.Random(seed)
+    index = 0
+    for template in TEMPLATES:
+        for variant in VARIANTS:
+            for _ in range(count):
+                email_message, sample = render(template, variant, rng, index)
+                index += 1
+                yield template, variant, email_message, sample
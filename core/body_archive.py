@@ -0,0 +1,436 @@
+"""Append-only, compressed archive of downloaded email bodies.
+
+Bodies used to be written one file per message into a flat ``data/`` folder.
+The archive instead appends them to a few large segment files
+(``segment-00000.pack``, ...) and keeps a small SQLite index mapping each
+message id to its segment, offset and length, so any body can be read back
+with a single seek and read.
+
+Each record is a JSON object with the message's subject, sender, date and bodies,
+compressed with zlib. Bank notifications are rendered from a handful of HTML
+templates, so the archive trains a preset dictionary from the common markup of
+stored bodies; records compressed with it only pay for the parts that differ.
+
+During a sync, records are handed to an ArchiveWriter, which stores them on a
+background thread so archiving stays off the download/parse loop.
+
+Several processes may write to the same archive (a sync and
+tools/migrate_bodies.py, say): each batch of appends holds an exclusive lock
+on ``archive.lock`` and takes its offsets from the current end of the newest
+segment, not from its own file position. On platforms without ``fcntl`` the
+lock is not available and only one process may write at a time.
+
+Record layout inside a segment::
+
+    magic (4) | id length (2) | data length (4) | crc32 (4) | id | data
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import struct
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import RLock, Thread
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger("expense_tracker")
+
+ARCHIVE_DIR = Path("data") / "archive"
+INDEX_NAME = "index.sqlite"
+LOCK_NAME = "archive.lock"
+
+# A segment is closed and a new one started once it reaches this size.
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# zlib uses at most the last 32 KiB of a preset dictionary.
+ZDICT_SIZE = 32 * 1024
+# Records stored before the first dictionary is trained from them.
+TRAIN_AFTER = 200
+# Markup pieces shorter than this are not worth a dictionary slot.
+MIN_PIECE = 8
+
+# Records waiting for the background writer, and how many it stores per fsync.
+WRITER_QUEUE_SIZE = 1000
+WRITER_BATCH_SIZE = 100
+# Seconds put() waits for room in a full queue before dropping the record.
+WRITER_PUT_TIMEOUT = 5.0
+
+RECORD_HEADER = struct.Struct(">4sHII")
+RECORD_MAGIC = b"EBA1"
+
+# Splits HTML into "text<tag>" pieces; template markup repeats across emails.
+_PIECE = re.compile(r"[^<]*<[^>]*>|[^<]+")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS bodies (
+        msg_id TEXT PRIMARY KEY,
+        segment INTEGER NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        dict_id INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dictionaries (
+        dict_id INTEGER PRIMARY KEY,
+        data BLOB NOT NULL
+    )
+    """,
+)
+
+
+def train_dictionary(samples: Iterable[str], size: int = ZDICT_SIZE) -> bytes:
+    """Build a zlib preset dictionary from the markup shared by sample bodies.
+
+    Pieces that appear in more than one sample are ranked by how many bytes
+    they would save (occurrences times length). The best ones are kept up to
+    ``size`` bytes and placed last, where zlib references them most cheaply.
+    Pieces are stored JSON-escaped, as they appear inside compressed records.
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update({piece for piece in _PIECE.findall(sample) if len(piece) >= MIN_PIECE})
+
+    ranked = sorted(
+        ((n * len(piece), piece) for piece, n in counts.items() if n > 1), reverse=True
+    )
+    chosen: List[bytes] = []
+    total = 0
+    for _, piece in ranked:
+        data = json.dumps(piece, ensure_ascii=False)[1:-1].encode("utf-8")
+        if total + len(data) <= size:
+            chosen.append(data)
+            total += len(data)
+    return b"".join(reversed(chosen))
+
+
+class BodyArchive:
+    """Pack-file store of email records with random access by message id."""
+
+    def __init__(self, root: Path = ARCHIVE_DIR, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        """Open (or create) the archive in ``root``."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = RLock()
+        self._index = sqlite3.connect(self.root / INDEX_NAME, check_same_thread=False)
+        for statement in SCHEMA:
+            self._index.execute(statement)
+        self._dicts: Dict[int, bytes] = {0: b""}
+        self._dicts.update(self._index.execute("SELECT dict_id, data FROM dictionaries"))
+        self._dict_id = max(self._dicts)
+        self._readers: Dict[int, BinaryIO] = {}
+
+        self._segment = self._newest_segment()
+        self._writer = open(self._segment_path(self._segment), "ab")  # pylint: disable=consider-using-with
+
+    def _newest_segment(self) -> int:
+        """Return the number of the newest segment file (0 if there is none)."""
+        segments = [int(p.stem.split("-")[1]) for p in self.root.glob("segment-*.pack")]
+        return max(segments, default=0)
+
+    @contextmanager
+    def _write_lock(self):
+        """Hold the archive's cross-process write lock and append at the newest segment.
+
+        Another process may have appended to the segment or started a new one
+        since this archive last wrote, so both are re-read under the lock.
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / LOCK_NAME, "a", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                newest = self._newest_segment()
+                if newest != self._segment:
+                    self._writer.close()
+                    self._segment = newest
+                    self._writer = open(self._segment_path(newest), "ab")  # pylint: disable=consider-using-with
+                self._writer.seek(0, os.SEEK_END)
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _segment_path(self, segment: int) -> Path:
+        """Return the path of a segment file."""
+        return self.root / f"segment-{segment:05d}.pack"
+
+    @property
+    def dictionary_id(self) -> int:
+        """Id of the preset dictionary new records are compressed with (0 for none)."""
+        return self._dict_id
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the segment files."""
+        return sum(p.stat().st_size for p in self.root.glob("segment-*.pack"))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._index.execute("SELECT COUNT(*) FROM bodies").fetchone()[0]
+
+    def __contains__(self, msg_id: str) -> bool:
+        with self._lock:
+            row = self._index.execute("SELECT 1 FROM bodies WHERE msg_id = ?", (msg_id,))
+            return row.fetchone() is not None
+
+    def put(self, msg_id: str, record: dict):
+        """Store one record; a later record for the same id replaces it."""
+        self.put_many([(msg_id, record)])
+
+    def put_many(self, items: Iterable[Tuple[str, dict]], fsync: bool = False):
+        """Append records and index them in one transaction.
+
+        Every segment written to is flushed (and fsynced if asked) before the
+        index is committed, so the index never points at data that is not on
+        disk, even when the batch starts a new segment.
+        """
+        with self._lock:
+            items = list(items)
+            if not items:
+                return
+            with self._write_lock():
+                entries = [
+                    (msg_id, *self._append(msg_id, record, fsync)) for msg_id, record in items
+                ]
+                self._sync_writer(fsync)
+                with self._index:
+                    self._index.executemany(
+                        "INSERT OR REPLACE INTO bodies VALUES (?, ?, ?, ?, ?)", entries
+                    )
+            if self._dict_id == 0:
+                self._maybe_train()
+
+    def _sync_writer(self, fsync: bool):
+        """Flush the current segment to the OS, and to disk if ``fsync``."""
+        self._writer.flush()
+        if fsync:
+            os.fsync(self._writer.fileno())
+
+    def _append(self, msg_id: str, record: dict, fsync: bool = False) -> Tuple[int, int, int, int]:
+        """Write one record to the current segment and return its index entry.
+
+        A full segment is synced like the batch (see put_many) before it is closed.
+        """
+        compressor = (
+            zlib.compressobj(6, zdict=self._dicts[self._dict_id])
+            if self._dict_id
+            else zlib.compressobj(6)
+        )
+        data = compressor.compress(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        data += compressor.flush()
+        key = msg_id.encode("utf-8")
+        header = RECORD_HEADER.pack(RECORD_MAGIC, len(key), len(data), zlib.crc32(data))
+        length = len(header) + len(key) + len(data)
+
+        offset = self._writer.tell()
+        if offset and offset + length > self.segment_max_bytes:
+            self._sync_writer(fsync)
+            self._writer.close()
+            self._segment += 1
+            self._writer = open(self._segment_path(self._segment), "ab")  # pylint: disable=consider-using-with
+            offset = 0
+        self._writer.write(header + key + data)
+        return self._segment, offset, length, self._dict_id
+
+    def get(self, msg_id: str) -> Optional[dict]:
+        """Return the record stored for ``msg_id``, or None if it is missing or corrupt."""
+        with self._lock:
+            row = self._index.execute(
+                "SELECT segment, offset, length, dict_id FROM bodies WHERE msg_id = ?",
+                (msg_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            segment, offset, length, dict_id = row
+            if segment == self._segment:
+                self._writer.flush()
+            reader = self._readers.get(segment)
+            if reader is None:
+                reader = self._readers[segment] = open(self._segment_path(segment), "rb")  # pylint: disable=consider-using-with
+            reader.seek(offset)
+            raw = reader.read(length)
+            if dict_id not in self._dicts:
+                # Trained by another process writing to the archive.
+                self._dicts.update(
+                    self._index.execute("SELECT dict_id, data FROM dictionaries")
+                )
+
+        if len(raw) != length or length < RECORD_HEADER.size or dict_id not in self._dicts:
+            # The index was committed but the segment data never reached the disk.
+            logger.error("Corrupt archive record for email %s", msg_id)
+            return None
+        magic, key_len, data_len, crc = RECORD_HEADER.unpack_from(raw)
+        key = raw[RECORD_HEADER.size : RECORD_HEADER.size + key_len]
+        data = raw[RECORD_HEADER.size + key_len :]
+        intact = magic == RECORD_MAGIC and len(data) == data_len and zlib.crc32(data) == crc
+        if not intact or key != msg_id.encode("utf-8"):
+            logger.error("Corrupt archive record for email %s", msg_id)
+            return None
+        decompressor = (
+            zlib.decompressobj(zdict=self._dicts[dict_id]) if dict_id else zlib.decompressobj()
+        )
+        return json.loads(decompressor.decompress(data) + decompressor.flush())
+
+    def train(self, samples: Iterable[str]) -> int:
+        """Train a preset dictionary from sample bodies and use it for new records.
+
+        Returns:
+            The new dictionary's id, or 0 if the samples share no markup.
+        """
+        zdict = train_dictionary(samples)
+        if not zdict:
+            return 0
+        with self._lock, self._index:
+            cursor = self._index.execute("INSERT INTO dictionaries (data) VALUES (?)", (zdict,))
+            self._dict_id = cursor.lastrowid
+            self._dicts[self._dict_id] = zdict
+        logger.info("Trained archive dictionary %d (%d bytes)", self._dict_id, len(zdict))
+        return self._dict_id
+
+    def _maybe_train(self):
+        """Train the first dictionary once enough records were stored without one."""
+        ids = [
+            msg_id
+            for (msg_id,) in self._index.execute(
+                "SELECT msg_id FROM bodies WHERE dict_id = 0 LIMIT ?", (TRAIN_AFTER,)
+            )
+        ]
+        if len(ids) < TRAIN_AFTER:
+            return
+        records = (self.get(msg_id) for msg_id in ids)
+        self.train(
+            record["body_html"] or record["body_plain"] for record in records if record
+        )
+
+    def close(self):
+        """Close the segment and index files."""
+        with self._lock:
+            self._writer.close()
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._index.close()
+
+    def __enter__(self) -> "BodyArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveWriter:
+    """Archives records on a background thread, in batches fsynced once each.
+
+    ``put`` only queues the record, so downloading and parsing never wait on
+    compression or disk. If the bounded queue stays full for ``put_timeout``
+    seconds the record is dropped; drops and failed batches are counted and
+    logged rather than raised, since the transaction itself is already stored.
+    """
+
+    def __init__(
+        self,
+        archive: BodyArchive,
+        max_queue: int = WRITER_QUEUE_SIZE,
+        batch_size: int = WRITER_BATCH_SIZE,
+        put_timeout: float = WRITER_PUT_TIMEOUT,
+    ):
+        """Start the writer thread for ``archive``."""
+        self.archive = archive
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue: "Queue[Optional[Tuple[str, dict]]]" = Queue(maxsize=max_queue)
+        self._thread = Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, msg_id: str, record: dict):
+        """Queue a record for archiving; dropped at once if the writer thread has died."""
+        if not self._thread.is_alive():
+            self.dropped += 1
+            return
+        try:
+            self._queue.put((msg_id, record), timeout=self.put_timeout)
+        except Full:
+            self.dropped += 1
+            logger.warning("Archive queue full, dropped body of email %s", msg_id)
+
+    def close(self):
+        """Archive everything still queued and stop the thread.
+
+        If the thread has died, the records it left queued are counted as
+        dropped instead of waiting for it.
+        """
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=self.put_timeout)
+                break
+            except Full:
+                continue
+        self._thread.join()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                self.dropped += 1
+        if self.failed or self.dropped:
+            logger.warning(
+                "Archived %d email bodies; %d failed, %d dropped",
+                self.written,
+                self.failed,
+                self.dropped,
+            )
+
+    def _run(self):
+        """Write queued records in batches until close() is called."""
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except Empty:
+                    break
+            stopping = item is None
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Tuple[str, dict]]):
+        """Store one batch, counting it as failed if the archive rejects it.
+
+        Any error is caught: if it ended the thread, put() would block on the
+        full queue for every later message.
+        """
+        try:
+            self.archive.put_many(batch, fsync=True)
+            self.written += len(batch)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.failed += len(batch)
+            logger.error("Failed to archive %d email bodies: %s", len(batch), e)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
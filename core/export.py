@@ -0,0 +1,57 @@
+"""Incremental encoders for transaction exports.
+
+Each encoder consumes an iterator of row tuples and yields encoded byte chunks
+of roughly ``rows_per_chunk`` rows, so a response can start streaming after the
+first rows are read and memory use does not grow with the export size.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator, Sequence
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _encode_value(value: Any) -> Any:
+    """Convert values that JSON cannot represent directly."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_csv(
+    rows: Iterable[Sequence[Any]], fields: Sequence[str], rows_per_chunk: int = 500
+) -> Iterator[bytes]:
+    """Yield a CSV document (header first) in UTF-8 encoded chunks.
+
+    Values are written as-is, so dates appear as "YYYY-MM-DD HH:MM:SS".
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue().encode("utf-8")
+
+    rows = iter(rows)
+    while batch := list(islice(rows, rows_per_chunk)):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(
+    rows: Iterable[Sequence[Any]], fields: Sequence[str], rows_per_chunk: int = 500
+) -> Iterator[bytes]:
+    """Yield one JSON object per line in UTF-8 encoded chunks."""
+    encoder = json.JSONEncoder(default=_encode_value, ensure_ascii=False)
+    rows = iter(rows)
+    while batch := list(islice(rows, rows_per_chunk)):
+        lines = [encoder.encode(dict(zip(fields, row))) for row in batch]
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
@@ -1,40 +1,115 @@
 """Module for fetching and parsing emails from Gmail API.
 
 This module provides functions to list messages, retrieve individual messages,
-parse email content, decode payloads, and save email bodies to disk.
+parse email content, decode payloads, and archive email bodies.
 """
 
 import base64
 import email
 import logging
-from pathlib import Path
+import sqlite3
+import time
+
+from core.body_archive import ArchiveWriter, BodyArchive
+from core.metrics import GMAIL_ERRORS, GMAIL_REQUEST_SECONDS
 
 logger = logging.getLogger("expense_tracker")
-DATA_FOLDER = Path("data")
-DATA_FOLDER.mkdir(exist_ok=True)
+
+
+def execute(request, method: str) -> dict:
+    """Execute a Gmail API request, recording its latency and any failure under ``method``."""
+    start = time.perf_counter()
+    try:
+        return request.execute()
+    except Exception:
+        GMAIL_ERRORS.inc(method)
+        raise
+    finally:
+        GMAIL_REQUEST_SECONDS.observe(time.perf_counter() - start, method)
 
 
 def list_messages(service, query: str = " ", page_token: str | None = None):
     """Yield all message metadata matching the query, handling pagination automatically."""
+    for _, messages, _ in list_message_pages(service, query=query, page_token=page_token):
+        yield from messages
+
+
+def list_message_pages(service, query: str = " ", page_token: str | None = None):
+    """Yield the result pages of a message search one at a time.
+
+    Each item is ``(page_token, messages, next_page_token)``: the token the page
+    was requested with, its message metadata, and the token of the following
+    page (None on the last page). Passing a stored token resumes the listing
+    from that page.
+    """
     while True:
-        response = (
+        response = execute(
             service.users()
             .messages()
-            .list(userId="me", q=query, maxResults=500, pageToken=page_token)
-            .execute()
+            .list(userId="me", q=query, maxResults=500, pageToken=page_token),
+            "messages.list",
         )
 
-        messages = response.get("messages", [])
-        yield from messages
+        next_page_token = response.get("nextPageToken")
+        yield page_token, response.get("messages", []), next_page_token
+
+        if not next_page_token:
+            break
+        page_token = next_page_token
+
+
+def list_history(service, start_history_id: int, page_token: str | None = None):
+    """Yield the messages added to the mailbox since a history id, one page at a time.
+
+    Each item is ``(history_id, message_ids)``: the mailbox's current history id
+    as reported with the page, and the ids of messages added, without duplicates.
+
+    Raises:
+        googleapiclient.errors.HttpError: With status 404 if ``start_history_id``
+            is too old for Gmail to serve.
+    """
+    while True:
+        response = execute(
+            service.users()
+            .history()
+            .list(
+                userId="me",
+                startHistoryId=start_history_id,
+                historyTypes=["messageAdded"],
+                pageToken=page_token,
+            ),
+            "history.list",
+        )
+
+        message_ids = dict.fromkeys(
+            added["message"]["id"]
+            for record in response.get("history", [])
+            for added in record.get("messagesAdded", [])
+        )
+        yield int(response["historyId"]), list(message_ids)
 
         page_token = response.get("nextPageToken")
         if not page_token:
             break
 
 
+def get_message_sender(service, msg_id) -> str:
+    """Return a message's From header without downloading its body."""
+    msg = execute(
+        service.users()
+        .messages()
+        .get(userId="me", id=msg_id, format="metadata", metadataHeaders=["From"]),
+        "messages.get_metadata",
+    )
+    headers = msg.get("payload", {}).get("headers", [])
+    return next((h["value"] for h in headers if h["name"].lower() == "from"), "")
+
+
 def get_message(service, msg_id):
     """Retrieve a full email mesage in raw format and parse it into an email.message object."""
-    msg = service.users().messages().get(userId="me", id=msg_id, format="raw").execute()
+    msg = execute(
+        service.users().messages().get(userId="me", id=msg_id, format="raw"), "messages.get"
+    )
     msg_raw = base64.urlsafe_b64decode(msg["raw"])
     email_msg = email.message_from_bytes(msg_raw)
     return email_msg
@@ -112,38 +187,60 @@ def _decode_payload(part):
 
 
 def save_email_body(
-    email_message: dict, msg_id: str, *, prefer_html: bool = True
-) -> Path | None:
+    email_message: dict, msg_id: str, archive: BodyArchive | ArchiveWriter
+) -> bool:
     """
-    Saves the email body (HTML preferred, fallback to plain) to disk.
+    Saves the email's headers and bodies to the body archive.
+
+    A plain-text body that parse_email() copied from the HTML one is not
+    stored twice; load_email() restores it.
 
     Args:
         email_message: Dict from parse_email() containing 'body_html' and/or 'body_plain'
-        msg_id: Gmail message ID (used as filename)
-        prefer_html: If True, save HTML if available; else save plain text
+        msg_id: Gmail message ID (the archive key)
+        archive: Archive to store the record in, or a writer to queue it on
 
     Returns:
-        Path to saved file, or None if nothing was saved
+        True if the record was stored or queued, False if there was nothing to
+        save or it failed
     """
-    body = None
-    extension = ".html"
-
-    if prefer_html and email_message.get("body_html"):
-        body = email_message["body_html"]
-    elif email_message.get("body_plain"):
-        body = email_message["body_plain"]
-        extension = ".txt"
-
-    if not body:
+    body_html = email_message.get("body_html", "")
+    body_plain = email_message.get("body_plain", "")
+    if not body_html and not body_plain:
         logger.debug("No body content to save for email %s", msg_id)
-        return None
-
-    filename = DATA_FOLDER / f"{msg_id}{extension}"
+        return False
+
+    record = {
+        "subject": email_message.get("subject", ""),
+        "from": email_message.get("from", ""),
+        "date": email_message.get("date", ""),
+        "body_html": body_html,
+        "body_plain": "" if body_plain == body_html else body_plain,
+    }
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(body)
+        archive.put(msg_id, record)
+        return True
+    except (OSError, sqlite3.Error) as e:
+        logger.error("Failed to archive email %s: %s", msg_id, e)
+        return False
+
+
+def load_email(archive: BodyArchive, msg_id: str) -> dict | None:
+    """
+    Load an archived email in the shape parse_email() returns, ready for a parser.
 
-        return filename
-    except OSError as e:
-        logger.error("Failed to save email %s to %s: %s", msg_id, filename, e)
+    Returns:
+        The email dict, or None if the message is not archived
+    """
+    record = archive.get(msg_id)
+    if record is None:
         return None
+    return {
+        "id": msg_id,
+        "subject": record["subject"],
+        "from": record["from"],
+        "to": "",
+        "date": record["date"],
+        "body_plain": record["body_plain"] or record["body_html"],
+        "body_html": record["body_html"],
+    }
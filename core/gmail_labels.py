@@ -0,0 +1,121 @@
+"""Gmail labels that record which bank emails the sync already handled.
+
+Messages whose transaction was stored (or was already stored) get the
+"expense-tracker/processed" label; messages no parser could turn into a
+transaction get "expense-tracker/parse-failed". The sync query excludes both,
+so listings only return mail that still needs work, and parse failures can be
+retried on their own by searching for their label.
+
+Labelling a message changes which results the sync query returns, which
+would shift the pages of a listing in progress and skip messages. Outcomes
+are therefore only buffered while a sync lists and are applied once it has
+finished (see main.run_sync).
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from core.fetch_emails import execute
+
+logger = logging.getLogger("expense_tracker")
+
+PROCESSED_LABEL = "expense-tracker/processed"
+PARSE_FAILED_LABEL = "expense-tracker/parse-failed"
+SYNC_LABELS = (PROCESSED_LABEL, PARSE_FAILED_LABEL)
+
+# Most message ids users.messages.batchModify accepts per call.
+BATCH_MODIFY_LIMIT = 1000
+
+# Outcomes of processing a message, as recorded by MessageLabeler.
+PROCESSED = "processed"
+PARSE_FAILED = "parse_failed"
+
+
+def search_name(label: str) -> str:
+    """Return how a label is written in a Gmail search (``/`` and spaces become ``-``)."""
+    return label.replace("/", "-").replace(" ", "-").lower()
+
+
+def exclude_labels(query: str, labels=SYNC_LABELS) -> str:
+    """Restrict a Gmail query to messages carrying none of ``labels``."""
+    exclusions = " ".join(f"-label:{search_name(label)}" for label in labels)
+    return f"({query}) {exclusions}"
+
+
+def ensure_labels(service, names=SYNC_LABELS) -> Dict[str, str]:
+    """Return the ids of the given user labels, creating the missing ones."""
+    existing = execute(service.users().labels().list(userId="me"), "labels.list").get(
+        "labels", []
+    )
+    ids = {label["name"]: label["id"] for label in existing if label["name"] in names}
+    for name in names:
+        if name not in ids:
+            body = {
+                "name": name,
+                "labelListVisibility": "labelShow",
+                "messageListVisibility": "show",
+            }
+            created = execute(
+                service.users().labels().create(userId="me", body=body), "labels.create"
+            )
+            ids[name] = created["id"]
+            logger.info("Created Gmail label %s", name)
+    return ids
+
+
+class MessageLabeler:
+    """Buffers processing outcomes and applies them with batchModify on flush()."""
+
+    def __init__(self, service, label_ids: Dict[str, str]):
+        """Initialize with a Gmail service and the ids of SYNC_LABELS."""
+        self.service = service
+        self.processed_id = label_ids[PROCESSED_LABEL]
+        self.failed_id = label_ids[PARSE_FAILED_LABEL]
+        self._pending: Dict[str, List[str]] = {PROCESSED: [], PARSE_FAILED: []}
+        self.labelled = 0
+
+    @classmethod
+    def create(cls, service) -> Optional["MessageLabeler"]:
+        """Set up the sync labels, or return None if the account does not allow it."""
+        try:
+            return cls(service, ensure_labels(service))
+        except HttpError as e:
+            logger.warning("Gmail labels unavailable, messages will not be marked: %s", e)
+            return None
+
+    def record(self, msg_id: str, outcome: Optional[str]):
+        """Queue a message's label; outcomes other than PROCESSED/PARSE_FAILED are ignored."""
+        pending = self._pending.get(outcome) if outcome is not None else None
+        if pending is not None:
+            pending.append(msg_id)
+
+    @property
+    def pending(self) -> int:
+        """Number of messages whose label is queued."""
+        return sum(len(ids) for ids in self._pending.values())
+
+    def flush(self):
+        """Apply every queued label."""
+        for outcome in self._pending:
+            self._apply(outcome)
+
+    def _apply(self, outcome: str):
+        """Label the queued messages of one outcome, BATCH_MODIFY_LIMIT at a time."""
+        pending = self._pending[outcome]
+        if outcome == PROCESSED:
+            # A retried parse failure that now succeeded loses its failure label.
+            labels = {"addLabelIds": [self.processed_id], "removeLabelIds": [self.failed_id]}
+        else:
+            labels = {"addLabelIds": [self.failed_id]}
+        while pending:
+            chunk = pending[:BATCH_MODIFY_LIMIT]
+            execute(
+                self.service.users()
+                .messages()
+                .batchModify(userId="me", body={"ids": chunk, **labels}),
+                "messages.batchModify",
+            )
+            del pending[: len(chunk)]
+            self.labelled += len(chunk)
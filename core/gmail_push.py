@@ -0,0 +1,109 @@
+"""Handling of Gmail push notifications delivered through Cloud Pub/Sub.
+
+Once a watch is registered (see tools/gmail_watch.py), Gmail publishes a
+notification to a Pub/Sub topic whenever the mailbox changes, and a push
+subscription POSTs it to the API. A notification only says that the mailbox
+reached a new history id, and a single incoming email can produce several, so
+they are debounced into one incremental sync that fetches just the added
+messages through the history API.
+"""
+
+import base64
+import binascii
+import json
+import logging
+from threading import Lock, Timer
+from typing import Any, Callable, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("expense_tracker")
+
+# Seconds to collect notifications before triggering a sync.
+PUSH_DEBOUNCE_SECONDS = 10.0
+
+
+class PubSubMessage(BaseModel):
+    """The message of a Pub/Sub push request; ``data`` is base64-encoded JSON."""
+
+    data: str
+
+
+class PubSubPush(BaseModel):
+    """Body of a Pub/Sub push request."""
+
+    message: PubSubMessage
+    subscription: Optional[str] = None
+
+
+class GmailNotification(NamedTuple):
+    """Mailbox change announced by Gmail."""
+
+    email_address: str
+    history_id: int
+
+
+def decode_notification(push: PubSubPush) -> GmailNotification:
+    """Decode the Gmail notification carried by a Pub/Sub push request.
+
+    Raises:
+        ValueError: If the message data is not a Gmail notification.
+    """
+    try:
+        payload = json.loads(base64.b64decode(push.message.data, altchars=b"-_"))
+        return GmailNotification(
+            email_address=str(payload["emailAddress"]),
+            history_id=int(payload["historyId"]),
+        )
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid Gmail notification: {e}") from e
+
+
+class PushDebouncer:
+    """Coalesces bursts of notifications into a single delayed trigger."""
+
+    def __init__(self, trigger: Callable[[], Any], delay_seconds: float = PUSH_DEBOUNCE_SECONDS):
+        """Initialize the debouncer.
+
+        Args:
+            trigger: Called once per burst, ``delay_seconds`` after its first notification.
+            delay_seconds: How long to collect notifications before triggering.
+        """
+        self.trigger = trigger
+        self.delay = delay_seconds
+        self.latest_history_id = 0
+        self._timer: Optional[Timer] = None
+        self._lock = Lock()
+
+    def notify(self, notification: GmailNotification) -> bool:
+        """Record a notification, scheduling the trigger if none is pending.
+
+        Returns:
+            True if this notification started a new burst.
+        """
+        with self._lock:
+            self.latest_history_id = max(self.latest_history_id, notification.history_id)
+            if self._timer is not None:
+                return False
+            self._timer = Timer(self.delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+            return True
+
+    def cancel(self):
+        """Drop a pending trigger."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _fire(self):
+        """Run the trigger for the burst that just ended."""
+        with self._lock:
+            self._timer = None
+            history_id = self.latest_history_id
+        logger.info("Gmail push: syncing up to history id %s", history_id)
+        try:
+            self.trigger()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Gmail push trigger failed: %s", e, exc_info=True)
@@ -2,15 +2,27 @@
 
 This module provides helper functions to create and configure the Gmail API service
 client using authenticated credentials.
+
+The service is built from the discovery document bundled with
+google-api-python-client, so no request to Google's discovery endpoint is made,
+and it is reused for later calls with the same credentials. The underlying
+httplib2 connection is not thread-safe, so each thread gets its own client.
 """
 
+import threading
+
 from googleapiclient.discovery import build
 
+_local = threading.local()
+
 
 def get_gmail_service(creds):
     """
     Build and return a Gmail API service client.
 
+    Later calls from the same thread with the same credentials object return
+    the cached client.
+
     Args:
         creds (google.oauth2.credentials.Credentials):
             Authenticated OAuth 2.0 credentials obtained from google_auth.get_credentials().
@@ -23,4 +35,11 @@ def get_gmail_service(creds):
         >>> service = get_gmail_service(creds)
         >>> messages = service.users().messages().list(userId='me').execute()
     """
-    return build("gmail", "v1", credentials=creds)
+    cached = getattr(_local, "service", None)
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+    service = build(
+        "gmail", "v1", credentials=creds, static_discovery=True, cache_discovery=False
+    )
+    _local.service = (creds, service)
+    return service
@@ -10,10 +10,18 @@ The module uses:
 
 Main function:
     get_credentials() - Returns valid Credentials object ready for use with google-api-python-client
+
+Credentials are cached in memory for the life of the process and refreshed a
+few minutes before the access token expires, so repeated syncs neither re-read
+token.json nor wait on a refresh mid-run.
 """
 
 import logging
+import os
 import os.path
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -29,40 +37,83 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CREDENTIALS_FILE = os.path.join(BASE_DIR, "credentials.json")
 TOKEN_FILE = os.path.join(BASE_DIR, "token.json")
 
+# Refresh the access token when it expires within this margin.
+REFRESH_MARGIN = timedelta(minutes=5)
+
 logger = logging.getLogger("expense_tracker")
 
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _expires_soon(creds) -> bool:
+    """Return True if the access token is invalid or expires within REFRESH_MARGIN."""
+    if not creds.valid:
+        return True
+    if creds.expiry is None:
+        return False
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now < REFRESH_MARGIN
+
+
+def save_token(creds, path=None):
+    """Write credentials to token.json atomically.
+
+    The token is written to a temporary file in the same directory and moved
+    over the old one, so a crash mid-write never leaves a truncated token.
+    """
+    path = path or TOKEN_FILE
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=".token-", suffix=".json"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as token:
+            token.write(creds.to_json())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logger.info("Token saved to %s", path)
+
 
 def get_credentials(scopes=None):
     """
     Performs Google OAuth 2.0 authentication and confirms success.
     Prints a clear message if connected successfully.
     Returns credentials if successful (for future use).
+
+    The same Credentials object is returned for the same scopes until the
+    process exits; it is refreshed in place when close to expiry.
     """
     if scopes is None:
         scopes = SCOPES
+    key = tuple(scopes)
 
-    logger.info("Starting Google authentication")
+    with _cache_lock:
+        creds = _cache.get(key)
+        if creds is not None and not _expires_soon(creds):
+            return creds
 
-    creds = None
+        logger.info("Starting Google authentication")
 
-    # Try to load existing token
-    if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, scopes)
+        # Try to load existing token
+        if creds is None and os.path.exists(TOKEN_FILE):
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, scopes)
 
-    # If no valid credentials, start OAuth flow
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            logger.info("Refreshing expired access token")
-            creds.refresh(Request())
-        else:
-            logger.info("No valid credentials found. Opening browser for login")
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, scopes)
-            creds = flow.run_local_server(port=0)
+        # If the token is missing or about to expire, refresh it or start OAuth flow
+        if not creds or _expires_soon(creds):
+            if creds and creds.refresh_token:
+                logger.info("Refreshing access token")
+                creds.refresh(Request())
+            else:
+                logger.info("No valid credentials found. Opening browser for login")
+                flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, scopes)
+                creds = flow.run_local_server(port=0)
 
-        # Save new/updated token
-        with open(TOKEN_FILE, "w", encoding="utf-8") as token:
-            token.write(creds.to_json())
-        logger.info("Token saved to %s", TOKEN_FILE)
+            # Save new/updated token
+            save_token(creds)
+
+        _cache[key] = creds
 
     logger.info("Google authentication successful")
     logger.info("You are now connected to your Google account.")
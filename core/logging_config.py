@@ -8,12 +8,18 @@ The setup ensures:
 - Consistent log formatting
 - Prevention of duplicate handlers on multiple calls
 - Safe rotating file handling with UTF-8 encoding
+- Optionally, handlers that run on a background thread (queue mode)
+- Sampling of chatty per-message logs, with per-run summary counts
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from threading import Lock
+from typing import Dict, List, Tuple
 
 
 def setup_logging(
@@ -22,6 +28,8 @@ def setup_logging(
     log_file: str = "expense_tracker.log",
     max_bytes: int = 5 * 1024 * 1024,
     backup_count: int = 3,
+    use_queue: bool = False,
+    name: str = "expense_tracker",
 ) -> logging.Logger:
     """
     Configure the root logger for the expense_tracker application.
@@ -30,6 +38,12 @@ def setup_logging(
     The function is safe to call multiple times — it detects existing handlers
     and returns the already-configured logger without adding duplicates.
 
+    In queue mode the logger only gets a QueueHandler: records are put on an
+    in-memory queue and a QueueListener thread formats and writes them, so the
+    code that logs never waits on stdout or the log file. The listener is
+    stopped at interpreter exit, after writing out the queued records; it is
+    also available as the handler's ``listener`` attribute.
+
     Args:
         level: Logging level (e.g., logging.INFO, logging.DEBUG). Default: INFO
         log_to_file: Whether to enable rotating file logging. Default: True
@@ -37,11 +51,13 @@ def setup_logging(
         max_bytes: Maximum size of a log file before rotation (in bytes).
                    Default: 5 MB
         backup_count: Number of backup log files to keep. Default: 3
+        use_queue: Write records from a background thread. Default: False
+        name: Name of the logger to configure. Default: "expense_tracker"
 
     Returns:
-        The configured logging.Logger instance named "expense_tracker"
+        The configured logging.Logger instance
     """
-    logger = logging.getLogger("expense_tracker")
+    logger = logging.getLogger(name)
 
     if logger.handlers:
         return logger
@@ -57,7 +73,7 @@ def setup_logging(
 
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(level)
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
     if log_to_file:
         os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
@@ -69,6 +85,103 @@ def setup_logging(
         )
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(level)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if use_queue:
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = QueueHandler(records)
+        listener = QueueListener(records, *handlers, respect_handler_level=True)
+        queue_handler.listener = listener  # type: ignore[attr-defined]
+        listener.start()
+        atexit.register(_stop_listener, listener)
+        handlers = [queue_handler]
+
+    for handler in handlers:
+        logger.addHandler(handler)
 
     return logger
+
+
+def _stop_listener(listener: QueueListener):
+    """Stop a listener unless already stopped; stop() is not idempotent before Python 3.12."""
+    if getattr(listener, "_thread", None) is not None:
+        listener.stop()
+
+
+class SampledLog:
+    """A message logged once per item (transaction, email...) that gets sampled.
+
+    The first ``first`` occurrences in a run are logged, then one in every
+    ``every``. All of them are counted, so the run can report the totals with
+    log_sampled_summary() instead.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        label: str,
+        level: int = logging.INFO,
+        first: int = 10,
+        every: int = 1000,
+    ):
+        """Initialize the sampled message.
+
+        Args:
+            logger: Logger the sampled occurrences are written to.
+            label: Short description used in the run summary.
+            level: Level of the sampled occurrences.
+            first: Occurrences logged before sampling starts.
+            every: Once sampling, log one occurrence in this many.
+        """
+        self.logger = logger
+        self.label = label
+        self.level = level
+        self.first = first
+        self.every = every
+        self._count = 0
+        self._logged = 0
+        self._lock = Lock()
+        with _sampled_lock:
+            _sampled.append(self)
+
+    def log(self, msg: str, *args):
+        """Count one occurrence and log it if it is sampled."""
+        with self._lock:
+            self._count += 1
+            n = self._count
+            sampled = n <= self.first or n % self.every == 0
+            if sampled:
+                self._logged += 1
+        if sampled and self.logger.isEnabledFor(self.level):
+            if n > self.first:
+                msg += " (occurrence %d)"
+                args = (*args, n)
+            self.logger.log(self.level, msg, *args, stacklevel=2)
+
+    def take(self) -> Tuple[int, int]:
+        """Return the occurrences counted and logged since the last call, and reset them."""
+        with self._lock:
+            counts = (self._count, self._logged)
+            self._count = self._logged = 0
+        return counts
+
+
+_sampled: List[SampledLog] = []
+_sampled_lock = Lock()
+
+
+def log_sampled_summary(logger: logging.Logger) -> Dict[str, int]:
+    """Log how often each sampled message occurred since the last summary, and reset the counts.
+
+    Returns:
+        The occurrences of each message that occurred, by label.
+    """
+    with _sampled_lock:
+        sampled = list(_sampled)
+    totals = {}
+    for log in sampled:
+        count, logged = log.take()
+        if count:
+            totals[log.label] = count
+            logger.info("%s: %d (%d logged)", log.label, count, logged)
+    return totals
@@ -0,0 +1,267 @@
+"""In-process counters and histograms, exposed in the Prometheus text format.
+
+Collectors are sharded per thread: each thread updates its own dict, so the
+hot paths (parsing, saving, Gmail calls, request handling) never take a lock.
+Reading the metrics sums the shards, which is only done when /metrics is
+scraped. Threads that exit keep their shard, so totals never go backwards.
+
+Metrics live for the lifetime of the process: the API exposes everything its
+own requests and background syncs recorded; a sync run from ``main.py`` in a
+separate process is not visible.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+class _Metric:
+    """Common naming and per-thread shard bookkeeping."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        # Appending to a list is atomic, so registering a new thread's shard needs no lock.
+        self._shards: List[dict] = []
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            self._local.shard = shard
+            self._shards.append(shard)
+            return shard
+
+    def _snapshots(self) -> Iterator[dict]:
+        # dict.copy() runs without releasing the GIL, so each copy is consistent.
+        for shard in list(self._shards):
+            yield shard.copy()
+
+    def _label_text(self, values: Labels, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        """Return the metric's lines in the Prometheus text format."""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add ``amount`` to the series with the given label values."""
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        """Return the current total of every series."""
+        totals: Dict[Labels, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def value(self, *labels: str) -> float:
+        """Return the current total of one series."""
+        return self.values().get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{self._label_text(labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        """Record one observation in the series with the given label values."""
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # Bucket counts (the last one is +Inf), then the sum.
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the ``with`` block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def series(self) -> Dict[Labels, Tuple[List[int], float]]:
+        """Return the per-bucket (non-cumulative) counts and sum of every series."""
+        totals: Dict[Labels, Tuple[List[int], float]] = {}
+        for shard in self._snapshots():
+            for labels, series in shard.items():
+                series = list(series)
+                counts, total = totals.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+                totals[labels] = (
+                    [a + b for a, b in zip(counts, series[:-1])],
+                    total + series[-1],
+                )
+        return totals
+
+    def count(self, *labels: str) -> int:
+        """Return the number of observations in one series."""
+        counts, _ = self.series().get(labels, ([], 0.0))
+        return sum(counts)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, (counts, total) in sorted(self.series().items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The set of metrics a /metrics scrape renders."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; its name must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a Counter."""
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Histogram:
+        """Create and register a latency Histogram."""
+        metric = Histogram(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording each HTTP request's latency in HTTP_REQUEST_SECONDS.
+
+    Requests are labelled with their route template (e.g.
+    ``/transactions/{transaction_id}``), so ids in paths do not create new series;
+    requests matching no route share the "unmatched" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, scope["method"], route, str(status)
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+SYNC_MESSAGES = REGISTRY.counter(
+    "expense_tracker_sync_messages_total",
+    "Messages handled by Gmail syncs, by outcome "
+    "(listed, fetched, parsed, inserted, skipped, errors).",
+    ("outcome",),
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "expense_tracker_parse_seconds", "Time to parse one email, by parser.", ("parser",)
+)
+PARSE_FAILURES = REGISTRY.counter(
+    "expense_tracker_parse_failures_total",
+    "Emails no transaction could be parsed from, by bank and email template.",
+    ("bank", "template"),
+)
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    "expense_tracker_db_write_seconds",
+    "Time to save one parsed transaction, by outcome (inserted, duplicate, error).",
+    ("outcome",),
+)
+GMAIL_REQUEST_SECONDS = REGISTRY.histogram(
+    "expense_tracker_gmail_request_seconds", "Gmail API call latency, by method.", ("method",)
+)
+GMAIL_ERRORS = REGISTRY.counter(
+    "expense_tracker_gmail_errors_total", "Failed Gmail API calls, by method.", ("method",)
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "expense_tracker_http_request_seconds",
+    "API request latency, by method, route and status code.",
+    ("method", "route", "status"),
+)
@@ -60,6 +60,7 @@ class BanorteParser(BaseBankParser):
     bank_name = SupportedBanks.BANORTE
 
     SPEI_OUTGOING = "Transferencia a Otros Bancos Nacionales - SPEI"
+    SUBJECT_TEMPLATES = {SPEI_OUTGOING: "spei_outgoing"}
 
     def parse(self, email_message, email_id: str) -> TransactionCreate | None:
         """
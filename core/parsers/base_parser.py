@@ -7,6 +7,7 @@ emails and a helper method for decoding email subjects.
 
 from abc import ABC, abstractmethod
 from email.header import decode_header
+from typing import Dict
 
 from models.transaction import TransactionCreate
 
@@ -20,9 +21,12 @@ class BaseBankParser(ABC):
 
     Attributes:
         bank_name (str): The name of the bank (default: "generic").
+        SUBJECT_TEMPLATES (dict): Maps a subject fragment to the name of the
+            email template it identifies, checked in order.
     """
 
     bank_name = "generic"
+    SUBJECT_TEMPLATES: Dict[str, str] = {}
 
     @abstractmethod
     def parse(self, email_message, email_id: str) -> TransactionCreate | None:
@@ -41,6 +45,22 @@ class BaseBankParser(ABC):
             is found in the email, otherwise None.
         """
 
+    def template_name(self, email_message) -> str:
+        """Name the email template a message belongs to, for metrics and reports.
+
+        Args:
+            email_message (dict): The parsed email message.
+
+        Returns:
+            str: The name of the first SUBJECT_TEMPLATES entry whose fragment
+            appears in the decoded subject, or "unknown".
+        """
+        subject = self._decode_subject(email_message.get("subject", ""))
+        for fragment, name in self.SUBJECT_TEMPLATES.items():
+            if fragment in subject:
+                return name
+        return "unknown"
+
     def _decode_subject(self, subject: str) -> str:
         """Decode an email subject header, handling multiple encodings.
 
@@ -39,6 +39,12 @@ class HeyBancoParser(BaseBankParser):
     SPEI_OUTGOING = "Banca Electrónica Hey, Solicitud de Transferencia Nacional SPEI."
     CREDIT_CARD_PAYMENT = "Banca Electrónica Hey, Solicitud de pago de Tarjeta Hey"
     CREDIT_CARD_PURCHASE = "Servicio de Alertas HeyBanco"
+    SUBJECT_TEMPLATES = {
+        SPEI_RECEPTION: "spei_reception",
+        SPEI_OUTGOING: "spei_outgoing",
+        CREDIT_CARD_PAYMENT: "credit_card_payment",
+        CREDIT_CARD_PURCHASE: "credit_card_purchase",
+    }
 
     def parse(self, email_message, email_id: str) -> TransactionCreate | None:
         """Parse an incoming SPEI transfer notification."""
@@ -18,6 +18,7 @@ class MercadoPagoParser(BaseBankParser):
     bank_name = SupportedBanks.MERCADO_PAGO
 
     SPEI_OUTGOING = "Tu transferencia fue enviada"
+    SUBJECT_TEMPLATES = {SPEI_OUTGOING: "spei_outgoing"}
 
     def parse(self, email_message, email_id: str) -> TransactionCreate | None:
         """Parse a Mercado Pago email and return a Transaction if a supported type is found."""
@@ -48,6 +48,11 @@ class NubankParser(BaseBankParser):
     CREDIT_CARD_PAYMENT_SUBJECT = "¡Recibimos tu pago!"
     SPEI_OUTGOING_SUBJECT = "Tu transferencia fue exitosa"
     SPEI_RECEPTION_SUBJECT = "¡Recibiste una transferencia!"
+    SUBJECT_TEMPLATES = {
+        CREDIT_CARD_PAYMENT_SUBJECT: "credit_card_payment",
+        SPEI_OUTGOING_SUBJECT: "spei_outgoing",
+        SPEI_RECEPTION_SUBJECT: "spei_reception",
+    }
 
     def parse(self, email_message, email_id: str) -> TransactionCreate | None:
         """Parse a NuBank email and return a Transaction if a supported type is found.
@@ -5,28 +5,68 @@ bank-specific parser based on the sender email address.
 
 It maintains a mapping of supported banks to their parser instances and uses
 the configured sender email lists to determine the correct parser.
+
+Parser modules (and their dependencies, such as dateutil and unidecode) are
+only imported the first time a bank's parser is requested, so importing this
+module stays cheap for code that never parses an email.
 """
 
+import importlib
 import logging
+from collections.abc import Mapping
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterator
 
 from constants.banks import SupportedBanks, bank_emails
-from core.parsers.hey_banco import HeyBancoParser
-from core.parsers.nubank import NubankParser
-from core.parsers.rappi import RappiParser
-from core.parsers.banorte import BanorteParser
-from core.parsers.mercado_pago import MercadoPagoParser
-from core.parsers.paypal import PayPalParser
+
+if TYPE_CHECKING:
+    from core.parsers.base_parser import BaseBankParser
 
 logger = logging.getLogger("expense_tracker")
 
-PARSERS = {
-    SupportedBanks.HEY_BANCO: HeyBancoParser(),
-    SupportedBanks.NUBANK: NubankParser(),
-    SupportedBanks.RAPPI: RappiParser(),
-    SupportedBanks.BANORTE: BanorteParser(),
-    SupportedBanks.MERCADO_PAGO: MercadoPagoParser(),
-    SupportedBanks.PAYPAL: PayPalParser(),
-}
+
+class ParserRegistry(Mapping):
+    """Bank-to-parser mapping that imports and instantiates each parser on first use."""
+
+    def __init__(self, paths: Dict[SupportedBanks, str]):
+        """Initialize with ``"module:ClassName"`` paths keyed by bank."""
+        self._paths = dict(paths)
+        self._parsers: Dict[SupportedBanks, "BaseBankParser"] = {}
+        self._lock = Lock()
+
+    def __getitem__(self, bank: SupportedBanks) -> "BaseBankParser":
+        parser = self._parsers.get(bank)
+        if parser is None:
+            module_name, class_name = self._paths[bank].split(":")
+            with self._lock:
+                parser = self._parsers.get(bank)
+                if parser is None:
+                    parser = getattr(importlib.import_module(module_name), class_name)()
+                    self._parsers[bank] = parser
+                    logger.debug("Loaded parser %s", class_name)
+        return parser
+
+    def class_name(self, bank: SupportedBanks) -> str:
+        """Return the name of a bank's parser class without loading it."""
+        return self._paths[bank].split(":")[1]
+
+    def __iter__(self) -> Iterator[SupportedBanks]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+PARSERS = ParserRegistry(
+    {
+        SupportedBanks.HEY_BANCO: "core.parsers.hey_banco:HeyBancoParser",
+        SupportedBanks.NUBANK: "core.parsers.nubank:NubankParser",
+        SupportedBanks.RAPPI: "core.parsers.rappi:RappiParser",
+        SupportedBanks.BANORTE: "core.parsers.banorte:BanorteParser",
+        SupportedBanks.MERCADO_PAGO: "core.parsers.mercado_pago:MercadoPagoParser",
+        SupportedBanks.PAYPAL: "core.parsers.paypal:PayPalParser",
+    }
+)
 
 
 class ParserHelper:
@@ -35,15 +75,7 @@ class ParserHelper:
     @staticmethod
     def get_parser_for_email(
         from_header: str,
-    ) -> (
-        HeyBancoParser
-        | NubankParser
-        | RappiParser
-        | BanorteParser
-        | MercadoPagoParser
-        | PayPalParser
-        | None
-    ):
+    ) -> "BaseBankParser | None":
         """
         Determine the appropriate parser instance based on the email's From header.
 
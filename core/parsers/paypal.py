@@ -36,6 +36,26 @@ class PayPalParser(BaseBankParser):
 
     bank_name = SupportedBanks.PAYPAL
 
+    # Lowercase subject fragments of account notices that carry no transaction.
+    SKIP_SUBJECTS = (
+        "contrase", "bienvenida", "bienvenido", "one touch", "pago peri",
+        "confirm", "configur", "eliminado", "asociado", "asoci",
+        "cancelado", "active su cuenta", "active tu cuenta",
+        "introducci", "acceso", "restaurado", "verificaci",
+        "nueva forma de pago", "ha configurado", "le damos",
+        "su pago peri", "gracias por abrir", "abrir una cuenta",
+        "cambios en la forma", "hemos hecho", "mejorando",
+        "hablamos de recompensa", "nueva app", "sorpresa",
+        "hablemos de recompensa", "actualice la informaci",
+    )
+
+    def template_name(self, email_message) -> str:
+        """Return "account_notice" for skipped subjects, else "payment"."""
+        subject = self._decode_subject(email_message.get("subject", "")).lower()
+        if any(p in subject for p in self.SKIP_SUBJECTS):
+            return "account_notice"
+        return "payment"
+
     def parse(self, email_message, email_id: str) -> Optional[TransactionCreate]:
         """Parse a PayPal email notification."""
         subject = self._decode_subject(email_message.get("subject", ""))
@@ -48,18 +68,7 @@ class PayPalParser(BaseBankParser):
 
         subject_lower = subject.lower()
 
-        skip_patterns = [
-            "contrase", "bienvenida", "bienvenido", "one touch", "pago peri",
-            "confirm", "configur", "eliminado", "asociado", "asoci",
-            "cancelado", "active su cuenta", "active tu cuenta",
-            "introducci", "acceso", "restaurado", "verificaci",
-            "nueva forma de pago", "ha configurado", "le damos",
-            "su pago peri", "gracias por abrir", "abrir una cuenta",
-            "cambios en la forma", "hemos hecho", "mejorando",
-            "hablamos de recompensa", "nueva app", "sorpresa",
-            "hablemos de recompensa", "actualice la informaci",
-        ]
-        if any(p in subject_lower for p in skip_patterns):
+        if any(p in subject_lower for p in self.SKIP_SUBJECTS):
             return None
 
         txn_type = self._determine_type(subject_lower, body)
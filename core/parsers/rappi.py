@@ -46,6 +46,10 @@ class RappiParser(BaseBankParser):
 
     CREDIT_CARD_PAYMENT_SUBJECT = "Recibimos el pago de tu Rappicard"
     CREDIT_CARD_PAYMENT_WITH_CASHBACK_SUBJECT = "Recibimos el abono de tu Rappicard"
+    SUBJECT_TEMPLATES = {
+        CREDIT_CARD_PAYMENT_SUBJECT: "credit_card_payment",
+        CREDIT_CARD_PAYMENT_WITH_CASHBACK_SUBJECT: "credit_card_payment_cashback",
+    }
 
     def parse(self, email_message, email_id: str) -> TransactionCreate | None:
         subject = self._decode_subject(email_message.get("subject", ""))
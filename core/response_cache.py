@@ -0,0 +1,71 @@
+"""In-process cache for rendered API responses.
+
+Entries are keyed by request (path and query string) and tagged with the data
+version they were rendered from, so a cached body is served only while the
+database has not changed. Identical requests that miss the cache at the same
+time are coalesced: one thread renders the body and the others wait for it.
+"""
+
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from typing import Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger("expense_tracker")
+
+
+class ResponseCache:
+    """Version-tagged LRU cache of response bodies with single-flight rendering."""
+
+    def __init__(self, max_entries: int = 512):
+        """Initialize an empty cache holding at most ``max_entries`` bodies."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[str, bytes]] = OrderedDict()
+        self._in_flight: Dict[Tuple[Hashable, str], Future] = {}
+        self._lock = Lock()
+
+    def get_or_render(self, key: Hashable, version: str, render: Callable[[], bytes]) -> bytes:
+        """Return the body cached for ``key`` at ``version``, rendering it on a miss.
+
+        If another thread is already rendering the same key and version, wait
+        for its result instead of rendering again. Exceptions raised by
+        ``render`` propagate to every waiting caller and nothing is cached.
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+            flight_key = (key, version)
+            future = self._in_flight.get(flight_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[flight_key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            body = render()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(body)
+            with self._lock:
+                self._entries[key] = (version, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return body
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+
+    def clear(self):
+        """Drop every cached body."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,110 @@
+"""Gmail watch service for storing push subscriptions and history positions."""
+
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+from sqlmodel import col, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.database import Database
+from models.gmail_watch import GmailWatch
+
+
+logger = logging.getLogger("expense_tracker")
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class GmailWatchService:
+    """Service for the Gmail watch subscription and the synced history id."""
+
+    def __init__(self, db: Database):
+        """Initialize with a Database instance."""
+        self.db = db
+
+    def get(self) -> Optional[GmailWatch]:
+        """Return the most recently updated watch, or None if none was registered."""
+        with self.db.session() as session:
+            try:
+                watch = session.exec(
+                    select(GmailWatch).order_by(col(GmailWatch.updated_at).desc())
+                ).first()
+                if watch is not None:
+                    session.expunge(watch)
+                return watch
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error reading Gmail watch: %s", e)
+                return None
+
+    def save_watch(
+        self,
+        email_address: str,
+        topic_name: str,
+        history_id: int,
+        expiration: Optional[datetime],
+    ) -> GmailWatch:
+        """Record a registered or renewed watch.
+
+        The stored history id is only set when the account has none yet, so
+        renewing a watch never skips changes that have not been synced.
+        """
+        with self.db.session() as session:
+            watch = session.get(GmailWatch, email_address)
+            if watch is None:
+                watch = GmailWatch(
+                    email_address=email_address, history_id=history_id, updated_at=_utcnow()
+                )
+            watch.topic_name = topic_name
+            watch.expiration = expiration
+            watch.updated_at = _utcnow()
+            session.add(watch)
+            session.commit()
+            session.refresh(watch)
+            session.expunge(watch)
+            return watch
+
+    def advance(self, email_address: str, history_id: int) -> bool:
+        """Move the synced history id forward (never backwards).
+
+        Returns:
+            True if the position was written.
+        """
+        with self.db.session() as session:
+            try:
+                watch = session.get(GmailWatch, email_address)
+                if watch is None:
+                    return False
+                if history_id > watch.history_id:
+                    watch.history_id = history_id
+                    watch.updated_at = _utcnow()
+                    session.add(watch)
+                    session.commit()
+                return True
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error("Failed to advance Gmail history id: %s", e)
+                return False
+
+    def reset(self, email_address: str, history_id: int) -> bool:
+        """Replace the synced history id, e.g. after Gmail expired the old one.
+
+        Returns:
+            True if the position was written.
+        """
+        with self.db.session() as session:
+            try:
+                watch = session.get(GmailWatch, email_address)
+                if watch is None:
+                    return False
+                watch.history_id = history_id
+                watch.updated_at = _utcnow()
+                session.add(watch)
+                session.commit()
+                return True
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error("Failed to reset Gmail history id: %s", e)
+                return False
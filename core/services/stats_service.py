@@ -0,0 +1,128 @@
+"""Stats service serving aggregated figures from the monthly rollup table."""
+
+from typing import Optional, List, Dict, Any
+import logging
+from sqlmodel import col, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.database import Database
+from database.triggers import rebuild_monthly_rollups
+from models.bank import Bank
+from models.monthly_rollup import MonthlyRollup
+
+
+logger = logging.getLogger("expense_tracker")
+
+
+class StatsService:
+    """Service for reading pre-aggregated transaction statistics."""
+
+    def __init__(self, db: Database):
+        """Initialize with a Database instance."""
+        self.db = db
+
+    def monthly_rollups(
+        self,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+        bank_id: Optional[int] = None,
+        tx_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """List rollup rows (month, bank, type, category) within the given filters.
+
+        Months are inclusive "YYYY-MM" bounds.
+
+        Raises:
+            SQLAlchemyError: If the query fails.
+        """
+        with self.db.session() as session:
+            try:
+                stmt = select(MonthlyRollup, Bank).join(
+                    Bank, col(Bank.id) == col(MonthlyRollup.bank_id)
+                )
+                if month_from:
+                    stmt = stmt.where(col(MonthlyRollup.month) >= month_from)
+                if month_to:
+                    stmt = stmt.where(col(MonthlyRollup.month) <= month_to)
+                if bank_id is not None:
+                    stmt = stmt.where(MonthlyRollup.bank_id == bank_id)
+                if tx_type:
+                    stmt = stmt.where(MonthlyRollup.type == tx_type)
+                stmt = stmt.order_by(
+                    col(MonthlyRollup.month).desc(),
+                    col(MonthlyRollup.bank_id),
+                    col(MonthlyRollup.type),
+                    col(MonthlyRollup.category_id),
+                )
+                results = session.exec(stmt).all()
+                return [self._map_rollup(rollup, bank) for rollup, bank in results]
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error during stats: %s", e, exc_info=True)
+                raise
+
+    def monthly_totals(
+        self,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+        bank_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return income and expense totals per month, summed over the rollups.
+
+        Raises:
+            SQLAlchemyError: If the query fails.
+        """
+        with self.db.session() as session:
+            try:
+                month = col(MonthlyRollup.month)
+                tx_type = col(MonthlyRollup.type)
+                stmt = select(
+                    month,
+                    tx_type,
+                    func.sum(MonthlyRollup.total),  # pylint: disable=not-callable
+                    func.sum(MonthlyRollup.count),  # pylint: disable=not-callable
+                )
+                if month_from:
+                    stmt = stmt.where(month >= month_from)
+                if month_to:
+                    stmt = stmt.where(month <= month_to)
+                if bank_id is not None:
+                    stmt = stmt.where(MonthlyRollup.bank_id == bank_id)
+                stmt = stmt.group_by(month, tx_type).order_by(month.desc(), tx_type)
+
+                totals: Dict[str, Dict[str, Any]] = {}
+                for row_month, row_type, total, count in session.exec(stmt).all():
+                    entry = totals.setdefault(
+                        row_month,
+                        {"month": row_month, "expense": 0.0, "income": 0.0, "count": 0},
+                    )
+                    entry[row_type] = total
+                    entry["count"] += count
+                return list(totals.values())
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error during stats: %s", e, exc_info=True)
+                raise
+
+    def rebuild_monthly_rollups(self) -> int:
+        """Rebuild the rollup table from scratch. Returns the number of rollup rows."""
+        with self.db.engine.begin() as connection:
+            rebuild_monthly_rollups(connection)
+        with self.db.session() as session:
+            stmt = select(func.count()).select_from(MonthlyRollup)  # pylint: disable=not-callable
+            count = session.exec(stmt).one()
+        logger.info("Monthly rollups rebuilt: %s rows", count)
+        return count
+
+    @staticmethod
+    def _map_rollup(rollup: MonthlyRollup, bank: Bank) -> Dict[str, Any]:
+        """Map a MonthlyRollup and Bank to a serializable dictionary."""
+        return {
+            "month": rollup.month,
+            "bank_id": rollup.bank_id,
+            "bank_name": bank.name,
+            "type": rollup.type,
+            "category_id": rollup.category_id or None,
+            "total": rollup.total,
+            "count": rollup.count,
+            "min_amount": rollup.min_amount,
+            "max_amount": rollup.max_amount,
+        }
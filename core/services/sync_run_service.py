@@ -0,0 +1,251 @@
+"""Sync run service for persisting and resuming sync checkpoints."""
+
+from datetime import datetime, timezone
+from typing import List, Optional
+import logging
+from sqlmodel import col, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.sync_jobs import SyncProgress
+from database.database import Database
+from models.sync_run import SyncRun
+
+
+logger = logging.getLogger("expense_tracker")
+
+# Runs in these states stopped before reaching the last page and can be resumed.
+RESUMABLE_STATUSES = ("running", "interrupted")
+
+# Counters and stage timings copied from a sync's SyncProgress onto its run.
+REPORT_FIELDS = (
+    "listed",
+    "fetched",
+    "unparseable",
+    "duplicates",
+    "inserted",
+    "errors",
+    "list_seconds",
+    "get_seconds",
+    "mime_seconds",
+    "parse_seconds",
+    "db_seconds",
+)
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SyncRunService:
+    """Service for recording sync runs and their resume checkpoints."""
+
+    def __init__(self, db: Database):
+        """Initialize with a Database instance."""
+        self.db = db
+
+    def start(self, query: str, resume_any: bool = False) -> SyncRun:
+        """Resume the latest unfinished run for ``query``, or start a new one.
+
+        A run left "running" can only belong to a process that died, since the
+        sync lease allows one sync at a time. Unfinished runs for a different
+        query are marked "abandoned", as their page tokens are not valid for it,
+        unless ``resume_any`` is set: then the latest unfinished run is resumed
+        with its own query instead of starting one for ``query``.
+
+        Raises:
+            SQLAlchemyError: If the run cannot be recorded.
+        """
+        now = _utcnow()
+        with self.db.session() as session:
+            run = session.exec(
+                select(SyncRun)
+                .where(col(SyncRun.status).in_(RESUMABLE_STATUSES))
+                .order_by(col(SyncRun.run_id).desc())
+            ).first()
+
+            if run is not None and (resume_any or run.query == query):
+                logger.info(
+                    "Resuming sync run %s after %s messages (page token: %s)",
+                    run.run_id,
+                    run.messages_done,
+                    run.page_token,
+                )
+            else:
+                session.exec(
+                    update(SyncRun)  # type: ignore
+                    .where(col(SyncRun.status).in_(RESUMABLE_STATUSES))
+                    .values(status="abandoned", finished_at=now)
+                )
+                run = SyncRun(query=query, started_at=now, updated_at=now)
+                logger.info("Starting new sync run")
+
+            run.status = "running"
+            run.updated_at = now
+            session.add(run)
+            session.commit()
+            session.refresh(run)
+            session.expunge(run)
+            return run
+
+    def checkpoint(
+        self,
+        run: SyncRun,
+        page_token: Optional[str],
+        last_message_id: Optional[str],
+        messages_done: int,
+    ) -> bool:
+        """Persist the position a later run should resume from.
+
+        Args:
+            run: The run being checkpointed; updated in place.
+            page_token: Token of the page to resume from.
+            last_message_id: Last message fully processed on that page, or None
+                if the page has not been started.
+            messages_done: Total messages processed by the run so far.
+
+        Returns:
+            True if the checkpoint was written.
+        """
+        run.page_token = page_token
+        run.last_message_id = last_message_id
+        run.messages_done = messages_done
+        run.updated_at = _utcnow()
+        return self._save(run)
+
+    def finish(
+        self,
+        run: SyncRun,
+        status: str,
+        error: Optional[str] = None,
+        progress: Optional[SyncProgress] = None,
+    ) -> bool:
+        """Record that a run completed or was interrupted.
+
+        Interrupted runs keep their checkpoint so the next sync resumes them.
+
+        Args:
+            run: The run; updated in place.
+            status: "completed" or "interrupted".
+            error: The error that interrupted the run.
+            progress: Counters and stage timings of this attempt, added to the
+                run's totals so a resumed run reports all of its attempts.
+
+        Returns:
+            True if the status was written.
+        """
+        now = _utcnow()
+        run.status = status
+        run.error = error
+        run.updated_at = now
+        if status == "completed":
+            run.finished_at = now
+        if progress is not None:
+            _add_progress(run, progress)
+        return self._save(run)
+
+    def record(
+        self,
+        query: str,
+        started_at: datetime,
+        status: str,
+        progress: SyncProgress,
+        error: Optional[str] = None,
+    ) -> Optional[SyncRun]:
+        """Record a sync that ran without checkpoints, such as a history sync.
+
+        Args:
+            query: What the sync listed, e.g. HISTORY_QUERY.
+            started_at: When the sync started (UTC, naive).
+            status: "completed" or "failed".
+            progress: The sync's counters and stage timings.
+            error: The error the sync failed with.
+
+        Returns:
+            The stored run, or None if it could not be written.
+        """
+        now = _utcnow()
+        run = SyncRun(
+            query=query,
+            status=status,
+            error=error,
+            started_at=started_at,
+            updated_at=now,
+            finished_at=now,
+            messages_done=progress.listed,
+        )
+        _add_progress(run, progress)
+        with self.db.session() as session:
+            try:
+                session.add(run)
+                session.commit()
+                session.refresh(run)
+                session.expunge(run)
+                return run
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error("Failed to record sync run: %s", e)
+                return None
+
+    def recent(self, limit: int = 20, offset: int = 0) -> List[SyncRun]:
+        """Return the most recent runs, newest first."""
+        with self.db.session() as session:
+            try:
+                runs = session.exec(
+                    select(SyncRun).order_by(col(SyncRun.run_id).desc()).offset(offset).limit(limit)
+                ).all()
+                for run in runs:
+                    session.expunge(run)
+                return list(runs)
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error reading sync runs: %s", e)
+                return []
+
+    def unfinished(self) -> Optional[SyncRun]:
+        """Return the latest run that can be resumed, or None."""
+        with self.db.session() as session:
+            try:
+                run = session.exec(
+                    select(SyncRun)
+                    .where(col(SyncRun.status).in_(RESUMABLE_STATUSES))
+                    .order_by(col(SyncRun.run_id).desc())
+                ).first()
+                if run is not None:
+                    session.expunge(run)
+                return run
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error reading sync runs: %s", e)
+                return None
+
+    def latest(self, status: Optional[str] = None) -> Optional[SyncRun]:
+        """Return the most recent run, optionally only one with ``status``."""
+        with self.db.session() as session:
+            try:
+                stmt = select(SyncRun).order_by(col(SyncRun.run_id).desc())
+                if status is not None:
+                    stmt = stmt.where(SyncRun.status == status)
+                run = session.exec(stmt).first()
+                if run is not None:
+                    session.expunge(run)
+                return run
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error reading sync runs: %s", e)
+                return None
+
+    def _save(self, run: SyncRun) -> bool:
+        """Write a detached run's current state back to the database."""
+        with self.db.session() as session:
+            try:
+                session.merge(run)
+                session.commit()
+                return True
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error("Failed to save sync run %s: %s", run.run_id, e)
+                return False
+
+
+def _add_progress(run: SyncRun, progress: SyncProgress):
+    """Add a sync attempt's counters and stage timings to a run's totals."""
+    for name in REPORT_FIELDS:
+        setattr(run, name, getattr(run, name) + getattr(progress, name))
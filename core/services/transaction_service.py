@@ -1,17 +1,69 @@
 """Transaction service for managing transactions."""
 
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, List, Any, Iterator, NamedTuple, Tuple
 import logging
 from sqlmodel import col, desc, func, select
+from sqlalchemy import literal_column, text
 from sqlalchemy.exc import SQLAlchemyError
 
+from core.logging_config import SampledLog
 from database.database import Database
-from models.transaction import TransactionCreate, Transaction
+from models.transaction import (
+    TransactionCreate,
+    TransactionFilters,
+    Transaction,
+    TransactionRow,
+)
 from models.bank import Bank
+from models.table_counter import TableCounter
 
 
 logger = logging.getLogger("expense_tracker")
 
+# Logged once per saved email, so sampled on large syncs.
+added_log = SampledLog(logger, "Transactions added")
+duplicate_log = SampledLog(logger, "Duplicate email_id skipped")
+
+# Filtered counts stop at this many rows and are reported as inexact beyond it.
+FILTERED_COUNT_CAP = 10_000
+FILTERED_COUNT_CACHE_SIZE = 256
+
+# Columns selected by the ORM-free read paths, in TransactionRow field order.
+TRANSACTION_COLUMNS = (
+    col(Transaction.transaction_id),
+    col(Transaction.email_id),
+    col(Transaction.date),
+    col(Transaction.amount),
+    col(Transaction.description),
+    col(Transaction.type),
+    col(Transaction.bank_id),
+    col(Bank.name).label("bank_name"),
+    col(Transaction.category_id),
+    col(Transaction.subcategory_id),
+    col(Transaction.merchant),
+    col(Transaction.reference),
+)
+TRANSACTION_FIELDS = tuple(column.key for column in TRANSACTION_COLUMNS)
+
+# bm25 column weights for (description, merchant, reference) in transactions_fts.
+SEARCH_RANK = "bm25(transactions_fts, 1.0, 2.0, 4.0)"
+
+
+class TransactionCount(NamedTuple):
+    """Total number of transactions and whether the figure is exact."""
+
+    total: int
+    exact: bool
+
+
+# (database url, filters) -> (table version, count), shared by all service instances.
+_filtered_counts: OrderedDict[Tuple[str, TransactionFilters], Tuple[int, TransactionCount]] = (
+    OrderedDict()
+)
+_filtered_counts_lock = Lock()
+
 
 class TransactionService:
     """Service for managing transactions in the database."""
@@ -29,7 +81,7 @@ class TransactionService:
                     select(Transaction).where(Transaction.email_id == transaction.email_id)
                 ).first()
                 if existing:
-                    logger.info("Duplicate email_id skipped: %s", transaction.email_id)
+                    duplicate_log.log("Duplicate email_id skipped: %s", transaction.email_id)
                     return None
 
                 stmt = select(Bank).where(Bank.name == transaction.bank_name)
@@ -62,7 +114,7 @@ class TransactionService:
                 session.commit()
                 session.refresh(tx)
 
-                logger.info(
+                added_log.log(
                     "Transaction added [ID: %s] | %s | %s | %s | Category: %s | Subcategory: %s",
                     tx.transaction_id,
                     tx.amount,
@@ -84,13 +136,38 @@ class TransactionService:
                 logger.error("Value error (likely invalid data type): %s", e)
                 return None
 
-    def list_transactions(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """List transactions with their bank name."""
+    def has_email(self, email_id: str) -> bool:
+        """Return True if a transaction from this email is already stored."""
+        with self.db.session() as session:
+            try:
+                stmt = select(Transaction.transaction_id).where(Transaction.email_id == email_id)
+                return session.exec(stmt).first() is not None
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error during lookup: %s", e)
+                return False
+
+    def list_transactions(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        filters: Optional[TransactionFilters] = None,
+    ) -> List[TransactionRow]:
+        """List transactions with their bank name, newest first.
+
+        Raises:
+            SQLAlchemyError: If the query fails; an empty page would be cached
+                by the API as a valid result.
+        """
         with self.db.session() as session:
             try:
                 stmt = (
-                    select(Transaction, Bank)
+                    select(*TRANSACTION_COLUMNS)
                     .join(Bank, col(Bank.id) == col(Transaction.bank_id))
+                    .where(
+                        *self._filter_clauses(
+                            filters, self._residual_index_hint(filters, offset + limit)
+                        )
+                    )
                     .order_by(
                         desc(col(Transaction.date)),
                         desc(col(Transaction.transaction_id)),
@@ -98,54 +175,287 @@ class TransactionService:
                     .offset(offset)
                     .limit(limit)
                 )
-                results = session.exec(stmt).all()
-                return [self._map_transaction(tx, bank) for tx, bank in results]
+                return [TransactionRow(*row) for row in session.exec(stmt)]
             except SQLAlchemyError as e:
                 logger.error("SQLAlchemy database error during list: %s", e, exc_info=True)
-                return []
+                raise
+
+    def data_version(self) -> Optional[str]:
+        """Return a cheap token that changes whenever transaction data changes.
 
-    def count_transactions(self) -> int:
-        """Return the total number of transactions."""
+        Combines the trigger-maintained change version and row count with the
+        highest transaction id (an O(1) rowid lookup), so it also changes if the
+        database file is swapped for another one.
+
+        Returns:
+            The version token, or None if it could not be read.
+        """
+        try:
+            with self.db.session() as session:
+                counter = session.exec(
+                    select(TableCounter.version, TableCounter.row_count).where(
+                        TableCounter.name == "transactions"
+                    )
+                ).first()
+                max_id = session.exec(
+                    select(func.max(Transaction.transaction_id))  # pylint: disable=not-callable
+                ).one()
+        except SQLAlchemyError as e:
+            logger.error("Error reading data version: %s", e)
+            return None
+        version, row_count = counter or (0, 0)
+        return f"{version}-{row_count}-{max_id or 0}"
+
+    def iter_transactions(
+        self, filters: Optional[TransactionFilters] = None, batch_size: int = 1000
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Stream every transaction matching the filters as plain row tuples.
+
+        Rows are read from a server-side cursor ``batch_size`` at a time and never
+        hydrated into ORM objects, so memory stays flat regardless of table size.
+        Values follow the order of TRANSACTION_FIELDS. The read transaction stays
+        open until the iterator is exhausted or closed.
+        """
+        with self.db.session() as session:
+            stmt = (
+                select(*TRANSACTION_COLUMNS)
+                .join(Bank, col(Bank.id) == col(Transaction.bank_id))
+                .where(*self._filter_clauses(filters))
+                .order_by(
+                    desc(col(Transaction.date)),
+                    desc(col(Transaction.transaction_id)),
+                )
+                .execution_options(yield_per=batch_size)
+            )
+            for row in session.exec(stmt):
+                yield tuple(row)
+
+    def count_transactions(
+        self, filters: Optional[TransactionFilters] = None
+    ) -> TransactionCount:
+        """Return the number of transactions matching the filters.
+
+        Unfiltered totals come from the trigger-maintained row counter instead of
+        scanning the table. Filtered totals are counted up to FILTERED_COUNT_CAP
+        rows and cached per filter set until the table version changes.
+
+        Raises:
+            SQLAlchemyError: If the count fails.
+        """
         with self.db.session() as session:
             try:
-                stmt = select(func.count()).select_from(Transaction)  # pylint: disable=not-callable
-                return session.exec(stmt).one()
+                counter = session.get(TableCounter, "transactions")
+                if filters is None or filters.is_empty():
+                    if counter is not None:
+                        return TransactionCount(total=counter.row_count, exact=True)
+                    stmt = select(func.count()).select_from(Transaction)  # pylint: disable=not-callable
+                    return TransactionCount(total=session.exec(stmt).one(), exact=True)
+
+                key = (str(self.db.engine.url), filters)
+                version = counter.version if counter is not None else None
+                with _filtered_counts_lock:
+                    cached = _filtered_counts.get(key)
+                    if cached is not None and version is not None and cached[0] == version:
+                        _filtered_counts.move_to_end(key)
+                        return cached[1]
+
+                # Counting needs no order, so residual-only filters always use their index.
+                hint = None if self._has_ordered_predicates(filters) else True
+                capped = (
+                    select(col(Transaction.transaction_id))
+                    .where(*self._filter_clauses(filters, hint))
+                    .limit(FILTERED_COUNT_CAP + 1)
+                    .subquery()
+                )
+                total = session.exec(
+                    select(func.count()).select_from(capped)  # pylint: disable=not-callable
+                ).one()
+                count = TransactionCount(
+                    total=min(total, FILTERED_COUNT_CAP), exact=total <= FILTERED_COUNT_CAP
+                )
+
+                if version is not None:
+                    with _filtered_counts_lock:
+                        _filtered_counts[key] = (version, count)
+                        _filtered_counts.move_to_end(key)
+                        while len(_filtered_counts) > FILTERED_COUNT_CACHE_SIZE:
+                            _filtered_counts.popitem(last=False)
+                return count
             except SQLAlchemyError as e:
                 logger.error("SQLAlchemy database error during count: %s", e, exc_info=True)
-                return 0
+                raise
+
+    def search_transactions(
+        self, query: str, limit: int = 50, offset: int = 0
+    ) -> Tuple[TransactionCount, List[TransactionRow]]:
+        """Full-text search over description, merchant and reference.
+
+        Every word of ``query`` must match (as a prefix) in any of the indexed
+        columns. Results are ordered by bm25 relevance, then newest first.
+
+        Returns:
+            The number of matches and the requested page of transactions
+
+        Raises:
+            SQLAlchemyError: If the search fails.
+        """
+        match = self._fts_query(query)
+        if not match:
+            return TransactionCount(total=0, exact=True), []
 
-    def get_transaction(self, transaction_id: int) -> Optional[Dict[str, Any]]:
-        """Get a single transaction by id."""
         with self.db.session() as session:
             try:
+                matches = (
+                    select(
+                        literal_column("rowid").label("transaction_id"),
+                        literal_column(SEARCH_RANK).label("score"),
+                    )
+                    .select_from(text("transactions_fts"))
+                    .where(text("transactions_fts MATCH :match"))
+                    .subquery()
+                )
+                total = session.exec(
+                    select(func.count()).select_from(matches),  # pylint: disable=not-callable
+                    params={"match": match},
+                ).one()
+
                 stmt = (
-                    select(Transaction, Bank)
+                    select(*TRANSACTION_COLUMNS)
+                    .join(matches, matches.c.transaction_id == col(Transaction.transaction_id))
+                    .join(Bank, col(Bank.id) == col(Transaction.bank_id))
+                    .order_by(
+                        matches.c.score,
+                        desc(col(Transaction.date)),
+                        desc(col(Transaction.transaction_id)),
+                    )
+                    .offset(offset)
+                    .limit(limit)
+                )
+                results = session.exec(stmt, params={"match": match})
+                return (
+                    TransactionCount(total=total, exact=True),
+                    [TransactionRow(*row) for row in results],
+                )
+            except SQLAlchemyError as e:
+                logger.error("SQLAlchemy database error during search: %s", e, exc_info=True)
+                raise
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Turn free text into an FTS5 query of quoted prefix terms joined by AND.
+
+        Quoting every word keeps FTS5 operators and punctuation in user input
+        (e.g. "7-Eleven" or "ref:123") from being parsed as query syntax.
+        """
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"*' for term in terms if term.strip('"'))
+
+    def get_transaction(self, transaction_id: int) -> Optional[TransactionRow]:
+        """Get a single transaction by id, or None if there is none.
+
+        Raises:
+            SQLAlchemyError: If the lookup fails.
+        """
+        with self.db.session() as session:
+            try:
+                stmt = (
+                    select(*TRANSACTION_COLUMNS)
                     .join(Bank, col(Bank.id) == col(Transaction.bank_id))
                     .where(Transaction.transaction_id == transaction_id)
                 )
-                result = session.exec(stmt).first()
-                if result is None:
-                    return None
-                tx, bank = result
-                return self._map_transaction(tx, bank)
+                row = session.exec(stmt).first()
+                return TransactionRow(*row) if row is not None else None
             except SQLAlchemyError as e:
                 logger.error("SQLAlchemy database error during get: %s", e, exc_info=True)
-                return None
+                raise
+
+    def _residual_index_hint(
+        self, filters: Optional[TransactionFilters], rows_needed: int
+    ) -> Optional[bool]:
+        """Decide whether the amount/merchant indexes should drive a filtered listing.
+
+        Only filters made of amount/merchant predicates alone get a hint; when a
+        date, bank or type predicate is present SQLite's own statistics pick the
+        index. Driving the query from the amount/merchant indexes costs one lookup
+        per matching row plus a sort, while walking the (date, transaction_id)
+        order costs about rows_needed / selectivity rows. The cached filtered count
+        gives the selectivity, so the index wins when matches² <= rows_needed * rows.
+
+        Returns:
+            True to use the residual indexes, False to avoid them, None for no hint
+        """
+        if filters is None or not self._has_residual_predicates(filters):
+            return None
+        if self._has_ordered_predicates(filters):
+            return None
+
+        matches = self.count_transactions(filters)
+        if not matches.exact:
+            return False
+        table_rows = self.count_transactions().total
+        return matches.total * matches.total <= rows_needed * table_rows
 
     @staticmethod
-    def _map_transaction(tx: Transaction, bank: Bank) -> Dict[str, Any]:
-        """Map Transaction and Bank to a serializable dictionary."""
-        return {
-            "transaction_id": tx.transaction_id,
-            "email_id": tx.email_id,
-            "date": tx.date,
-            "amount": tx.amount,
-            "description": tx.description,
-            "type": tx.type,
-            "bank_id": tx.bank_id,
-            "bank_name": bank.name,
-            "category_id": tx.category_id,
-            "subcategory_id": tx.subcategory_id,
-            "merchant": tx.merchant,
-            "reference": tx.reference,
-        }
+    def _has_ordered_predicates(filters: TransactionFilters) -> bool:
+        """Return True if a filter maps onto an index that provides the listing order."""
+        return (
+            filters.date_from is not None
+            or filters.date_to is not None
+            or filters.bank_id is not None
+            or filters.type is not None
+        )
+
+    @staticmethod
+    def _has_residual_predicates(filters: TransactionFilters) -> bool:
+        """Return True if an amount or merchant filter is set."""
+        return (
+            filters.min_amount is not None
+            or filters.max_amount is not None
+            or bool(filters.merchant)
+        )
+
+    @staticmethod
+    def _filter_clauses(
+        filters: Optional[TransactionFilters], residual_hint: Optional[bool] = None
+    ) -> List[Any]:
+        """Translate filters into SQL predicates that the transaction indexes can serve.
+
+        Date, bank and type predicates map onto indexes that also provide the
+        listing order. Amount and merchant predicates have their own indexes:
+        with ``residual_hint`` True they are marked ``unlikely()`` so SQLite drives
+        the query from those indexes; with False they are wrapped (``amount + 0``,
+        ``merchant || ''``) so SQLite applies them as plain filters on the ordered
+        scan instead of sorting every match.
+        """
+        if filters is None:
+            return []
+
+        amount: Any = col(Transaction.amount)
+        merchant: Any = col(Transaction.merchant)
+        if residual_hint is False:
+            amount = amount + 0
+            merchant = merchant.concat("")
+
+        residual: List[Any] = []
+        clauses: List[Any] = []
+        if filters.date_from is not None:
+            clauses.append(col(Transaction.date) >= filters.date_from)
+        if filters.date_to is not None:
+            clauses.append(col(Transaction.date) < filters.date_to)
+        if filters.bank_id is not None:
+            clauses.append(col(Transaction.bank_id) == filters.bank_id)
+        if filters.type is not None:
+            clauses.append(col(Transaction.type) == filters.type)
+        if filters.min_amount is not None:
+            residual.append(amount >= filters.min_amount)
+        if filters.max_amount is not None:
+            residual.append(amount <= filters.max_amount)
+        if filters.merchant:
+            prefix = filters.merchant
+            for char in ("\\", "%", "_"):
+                prefix = prefix.replace(char, "\\" + char)
+            residual.append(merchant.like(f"{prefix}%", escape="\\"))
+
+        if residual_hint:
+            residual = [func.unlikely(clause) for clause in residual]  # pylint: disable=not-callable
+        return clauses + residual
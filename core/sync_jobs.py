@@ -0,0 +1,217 @@
+"""Background execution of Gmail sync runs.
+
+A sync walks the whole mailbox and can take minutes, so the API hands it to a
+single-worker executor and returns a job id immediately. Each job carries a
+SyncProgress that the sync updates as it goes; clients read it through the job
+status endpoint or its Server-Sent Events stream.
+
+Triggers never start a second sync: within the process, a new request returns
+the job that is already queued or running, and with a SyncLock the job joins a
+sync that another process (such as a cron run) is performing. A trigger that
+must not be absorbed by a sync already past the new mail (a Gmail push) asks
+for a rerun instead: one follow-up sync is queued when the running job ends.
+"""
+
+import logging
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Literal, Optional
+
+from core.sync_lock import SyncLock, run_exclusive
+
+logger = logging.getLogger("expense_tracker")
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+@dataclass
+class SyncProgress:
+    """Running counters and stage timings for a single sync.
+
+    Attributes:
+        listed: Messages returned by the Gmail search
+        fetched: Messages downloaded
+        parsed: Messages a parser turned into a transaction
+        inserted: Transactions newly stored
+        skipped: Messages with no parser or no transaction, and duplicates
+        errors: Messages that failed to fetch, parse or save
+        archive_errors: Email bodies that could not be archived
+        unparseable: Messages no parser turned into a transaction
+        duplicates: Transactions already stored by an earlier sync
+        list_seconds: Time spent listing messages (and history changes)
+        get_seconds: Time spent downloading messages
+        mime_seconds: Time spent decoding downloaded MIME messages
+        parse_seconds: Time spent in bank parsers
+        db_seconds: Time spent saving transactions
+    """
+
+    listed: int = 0
+    fetched: int = 0
+    parsed: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    errors: int = 0
+    archive_errors: int = 0
+    unparseable: int = 0
+    duplicates: int = 0
+    list_seconds: float = 0.0
+    get_seconds: float = 0.0
+    mime_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    db_seconds: float = 0.0
+
+
+@dataclass
+class SyncJob:
+    """A queued or executed sync and its progress.
+
+    ``joined`` is set to the lease owner of another process's sync when the job
+    waited for that sync instead of running its own; its counters stay at zero.
+    """
+
+    job_id: str
+    incremental: bool = False
+    status: JobStatus = "queued"
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    joined: Optional[str] = None
+    progress: SyncProgress = field(default_factory=SyncProgress)
+
+    @property
+    def finished(self) -> bool:
+        """Return True once the job has succeeded or failed."""
+        return self.status in FINISHED_STATUSES
+
+
+class SyncJobManager:
+    """Runs sync jobs one at a time on a background thread and keeps their status."""
+
+    def __init__(
+        self,
+        run: Callable[..., None],
+        max_jobs: int = 50,
+        lock_factory: Optional[Callable[[], SyncLock]] = None,
+    ):
+        """Initialize the manager.
+
+        Args:
+            run: The sync function; called with the job's SyncProgress and
+                an ``incremental`` keyword argument, plus the held SyncLock as
+                ``lease`` when jobs coordinate on one.
+            max_jobs: How many jobs to remember; the oldest finished ones are dropped.
+            lock_factory: Builds the cross-process lease each job coordinates on.
+                Without it, jobs are only serialized within this process.
+        """
+        self.run = run
+        self.max_jobs = max_jobs
+        self.lock_factory = lock_factory
+        self._jobs: OrderedDict[str, SyncJob] = OrderedDict()
+        # Set when a rerun was requested while a job ran; False if any asked for a full sync.
+        self._rerun_incremental: Optional[bool] = None
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync")
+
+    def submit(self, incremental: bool = False, rerun_if_running: bool = False) -> SyncJob:
+        """Queue a new sync and return its job.
+
+        If a job is already queued or running, return it instead of queueing
+        another one.
+
+        Args:
+            incremental: Only sync messages received since the last completed sync.
+            rerun_if_running: If the active job is already running, it may have
+                listed past mail that just arrived: queue one more sync when it
+                ends. Requests made while it runs share that follow-up.
+        """
+        with self._lock:
+            active = self._active()
+            if active is not None:
+                if rerun_if_running and active.status == "running":
+                    self._rerun_incremental = incremental and self._rerun_incremental is not False
+                    logger.info("Sync job %s running, follow-up requested", active.job_id)
+                else:
+                    logger.info("Sync job already active: %s", active.job_id)
+                return active
+            job = self._queue(incremental)
+        logger.info("Sync job queued: %s", job.job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        """Return the job with the given id, or None if it is unknown."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for the running one."""
+        self._executor.shutdown(wait=wait)
+
+    def _active(self) -> Optional[SyncJob]:
+        """Return the queued or running job, if any. Caller holds the lock."""
+        for job in self._jobs.values():
+            if not job.finished:
+                return job
+        return None
+
+    def _queue(self, incremental: bool) -> SyncJob:
+        """Create a job and hand it to the executor. Caller holds the lock."""
+        job = SyncJob(job_id=uuid.uuid4().hex, incremental=incremental)
+        self._jobs[job.job_id] = job
+        self._prune()
+        self._executor.submit(self._execute, job)
+        return job
+
+    def _queue_rerun(self):
+        """Queue the follow-up sync requested while the last job ran, if any."""
+        with self._lock:
+            incremental = self._rerun_incremental
+            self._rerun_incremental = None
+            if incremental is None or self._active() is not None:
+                return
+            try:
+                job = self._queue(incremental)
+            except RuntimeError:  # shut down
+                logger.warning("Follow-up sync dropped, job manager shut down")
+                return
+        logger.info("Follow-up sync job queued: %s", job.job_id)
+
+    def _execute(self, job: SyncJob):
+        """Run a job on the worker thread and record its outcome."""
+        job.started_at = datetime.now()
+        job.status = "running"
+        logger.info("Sync job started: %s", job.job_id)
+        try:
+            if self.lock_factory is None:
+                self.run(job.progress, incremental=job.incremental)
+            else:
+                lock = self.lock_factory()
+                try:
+                    run_exclusive(
+                        lock,
+                        lambda: self.run(job.progress, incremental=job.incremental, lease=lock),
+                        on_join=lambda owner: setattr(job, "joined", owner),
+                    )
+                finally:
+                    lock.db.close()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            job.error = str(e) or type(e).__name__
+            job.finished_at = datetime.now()
+            job.status = "failed"
+            logger.error("Sync job failed: %s: %s", job.job_id, e)
+        else:
+            job.finished_at = datetime.now()
+            job.status = "succeeded"
+            logger.info("Sync job finished: %s | %s", job.job_id, job.progress)
+        self._queue_rerun()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_jobs. Caller holds the lock."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
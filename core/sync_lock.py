@@ -0,0 +1,220 @@
+"""Cross-process single-flight coordination for Gmail syncs.
+
+The API's background jobs and cron runs of ``main.py`` may start a sync at the
+same time. Whoever holds the lease row in ``sync_leases`` runs the sync; anyone
+else joins it by waiting until the lease is released instead of crawling the
+mailbox a second time. The holder refreshes a heartbeat while it runs, so the
+lease of a crashed process goes stale and is taken over by the next trigger.
+A holder that stalls long enough to lose its lease this way learns it from its
+next heartbeat and must stop (see SyncLock.ensure_held).
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from threading import Event, Thread
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import col, delete, select, update
+
+from database.database import Database
+from models.sync_lease import SyncLease
+
+logger = logging.getLogger("expense_tracker")
+
+SYNC_LEASE_NAME = "gmail_sync"
+# A lease whose heartbeat is older than this belongs to a crashed process.
+LEASE_TTL_SECONDS = 60.0
+# Seconds between lease checks while waiting on another process's sync.
+LEASE_POLL_SECONDS = 2.0
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime, as stored in the lease."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SyncLeaseLost(RuntimeError):
+    """Raised when another owner took over the lease of a running sync."""
+
+
+def new_owner_id() -> str:
+    """Return a lease owner id that is unique to this process and call."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class SyncLock:
+    """A named lease row with heartbeats and stale-lease recovery."""
+
+    def __init__(
+        self,
+        db: Database,
+        name: str = SYNC_LEASE_NAME,
+        ttl_seconds: float = LEASE_TTL_SECONDS,
+    ):
+        """Initialize the lock.
+
+        Args:
+            db: Database holding the sync_leases table.
+            name: Name of the leased resource.
+            ttl_seconds: Heartbeat age after which a lease is considered stale.
+        """
+        self.db = db
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        # Set by the heartbeat of held() once another owner holds the lease.
+        self.lost = Event()
+
+    def acquire(self, owner: str) -> bool:
+        """Take the lease if it is free, stale or already ours.
+
+        A single upsert decides the outcome, so two processes racing for the
+        lease cannot both win.
+
+        Returns:
+            True if ``owner`` now holds the lease.
+        """
+        now = _utcnow()
+        stmt = insert(SyncLease).values(
+            name=self.name, owner=owner, acquired_at=now, heartbeat_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[col(SyncLease.name)],
+            set_={
+                "owner": stmt.excluded.owner,
+                "acquired_at": stmt.excluded.acquired_at,
+                "heartbeat_at": stmt.excluded.heartbeat_at,
+            },
+            where=(col(SyncLease.heartbeat_at) < now - self.ttl)
+            | (col(SyncLease.owner) == owner),
+        )
+        with self.db.session() as session:
+            session.exec(stmt)  # type: ignore
+            holder = session.exec(select(SyncLease.owner).where(SyncLease.name == self.name)).one()
+        return holder == owner
+
+    def heartbeat(self, owner: str) -> bool:
+        """Refresh the lease's heartbeat.
+
+        Returns:
+            False if ``owner`` no longer holds the lease.
+        """
+        stmt = (
+            update(SyncLease)
+            .where(col(SyncLease.name) == self.name, col(SyncLease.owner) == owner)
+            .values(heartbeat_at=_utcnow())
+        )
+        with self.db.session() as session:
+            result = session.exec(stmt)  # type: ignore
+            return result.rowcount == 1
+
+    def release(self, owner: str):
+        """Give the lease up if ``owner`` still holds it."""
+        stmt = delete(SyncLease).where(
+            col(SyncLease.name) == self.name, col(SyncLease.owner) == owner
+        )
+        with self.db.session() as session:
+            session.exec(stmt)  # type: ignore
+
+    def current(self) -> Optional[SyncLease]:
+        """Return the lease row, stale or not, or None if nobody holds it."""
+        with self.db.session() as session:
+            lease = session.get(SyncLease, self.name)
+            if lease is not None:
+                session.expunge(lease)
+            return lease
+
+    def is_stale(self, lease: SyncLease) -> bool:
+        """Return True if the lease's holder stopped sending heartbeats."""
+        return lease.heartbeat_at < _utcnow() - self.ttl
+
+    def ensure_held(self):
+        """Stop the caller if the heartbeat found the lease taken over.
+
+        Raises:
+            SyncLeaseLost: If another owner now holds the lease.
+        """
+        if self.lost.is_set():
+            raise SyncLeaseLost(f"Sync lease {self.name!r} was taken over by another process")
+
+    @contextmanager
+    def held(self, owner: str) -> Iterator[None]:
+        """Keep an acquired lease alive with heartbeats, and release it on exit.
+
+        If a heartbeat finds that another owner took the lease over, ``lost``
+        is set; the work done under the lease must check ensure_held().
+        """
+        stop = Event()
+        self.lost.clear()
+
+        def beat():
+            while not stop.wait(self.ttl.total_seconds() / 4):
+                if not self.heartbeat(owner):
+                    logger.warning("Sync lease lost by %s", owner)
+                    self.lost.set()
+                    return
+
+        thread = Thread(target=beat, name="sync-lease-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            self.release(owner)
+
+
+def run_exclusive(
+    lock: SyncLock,
+    run: Callable[[], None],
+    owner: Optional[str] = None,
+    on_join: Optional[Callable[[str], None]] = None,
+    poll_seconds: float = LEASE_POLL_SECONDS,
+) -> bool:
+    """Run ``run`` while holding the lease, or join the sync that holds it.
+
+    If another owner holds the lease, wait until it is released and return
+    without running: that owner's sync already covered the mailbox. If the
+    holder's lease goes stale while waiting, take it over and run.
+
+    Args:
+        lock: The lease to coordinate on.
+        run: The sync to execute.
+        owner: Lease owner id; a new one is generated if omitted.
+        on_join: Called with the holder's owner id when joining its sync.
+        poll_seconds: Seconds between lease checks while waiting.
+
+    Returns:
+        True if ``run`` was executed, False if another owner's sync was joined.
+    """
+    owner = owner or new_owner_id()
+    joined: Optional[str] = None
+    while joined is None:
+        if lock.acquire(owner):
+            with lock.held(owner):
+                run()
+            return True
+        lease = lock.current()
+        if lease is not None:
+            joined = lease.owner
+
+    logger.info("Sync already running in %s; waiting for it to finish", joined)
+    if on_join is not None:
+        on_join(joined)
+
+    while True:
+        time.sleep(poll_seconds)
+        lease = lock.current()
+        if lease is None or lease.owner != joined:
+            logger.info("Joined sync in %s finished", joined)
+            return False
+        if lock.is_stale(lease) and lock.acquire(owner):
+            logger.warning("Recovered stale sync lease from %s", joined)
+            with lock.held(owner):
+                run()
+            return True
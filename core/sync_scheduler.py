@@ -0,0 +1,126 @@
+"""Periodic incremental Gmail syncs inside the API process.
+
+When SYNC_INTERVAL_SECONDS is set, the API starts a SyncScheduler in its
+lifespan. It submits an incremental sync job every interval (with random jitter
+so several instances do not poll Gmail in lockstep) and waits for it to finish.
+Each run that inserts nothing doubles the delay up to a maximum; a run that
+finds new transactions resets it, so new notifications appear within one base
+interval while an idle mailbox costs few API calls.
+
+Environment variables:
+    SYNC_INTERVAL_SECONDS: Base delay between syncs. Unset or 0 disables the scheduler.
+    SYNC_MAX_INTERVAL_SECONDS: Longest delay after repeated empty runs
+        (default: 8 times the base interval).
+    SYNC_JITTER: Fraction of the delay to randomize by, in either direction
+        (default: 0.1).
+"""
+
+import logging
+import os
+import random
+from threading import Event, Thread
+from typing import Optional
+
+from core.sync_jobs import SyncJob, SyncJobManager
+
+logger = logging.getLogger("expense_tracker")
+
+DEFAULT_BACKOFF_FACTOR = 8
+DEFAULT_JITTER = 0.1
+# Seconds between checks on a submitted job.
+JOB_POLL_SECONDS = 1.0
+
+
+class SyncScheduler:
+    """Background thread that submits incremental syncs with jitter and backoff."""
+
+    def __init__(
+        self,
+        jobs: SyncJobManager,
+        interval_seconds: float,
+        max_interval_seconds: Optional[float] = None,
+        jitter: float = DEFAULT_JITTER,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            jobs: Manager the sync jobs are submitted to.
+            interval_seconds: Delay between syncs while new transactions keep arriving.
+            max_interval_seconds: Longest delay after empty runs.
+            jitter: Fraction of each delay to randomize by.
+        """
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.jobs = jobs
+        self.interval = interval_seconds
+        self.max_interval = max(
+            interval_seconds, max_interval_seconds or interval_seconds * DEFAULT_BACKOFF_FACTOR
+        )
+        self.jitter = jitter
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @classmethod
+    def from_env(cls, jobs: SyncJobManager) -> Optional["SyncScheduler"]:
+        """Build a scheduler from the SYNC_* environment variables, or None if disabled."""
+        interval = float(os.environ.get("SYNC_INTERVAL_SECONDS") or 0)
+        if interval <= 0:
+            return None
+        max_interval = os.environ.get("SYNC_MAX_INTERVAL_SECONDS")
+        return cls(
+            jobs,
+            interval_seconds=interval,
+            max_interval_seconds=float(max_interval) if max_interval else None,
+            jitter=float(os.environ.get("SYNC_JITTER") or DEFAULT_JITTER),
+        )
+
+    def next_delay(self, delay: float, job: SyncJob) -> float:
+        """Return the delay before the next sync, given the one that just ran.
+
+        Runs that insert nothing (or fail) back off exponentially; a run that
+        inserts transactions resets the delay to the base interval.
+        """
+        if job.status == "succeeded" and job.progress.inserted > 0:
+            return self.interval
+        return min(delay * 2, self.max_interval)
+
+    def start(self):
+        """Start the scheduler thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name="sync-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Sync scheduler started: every %ss (up to %ss when idle)",
+            self.interval,
+            self.max_interval,
+        )
+
+    def stop(self):
+        """Stop the scheduler thread. A sync already running is left to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _jittered(self, delay: float) -> float:
+        """Return ``delay`` randomized by up to ``jitter`` in either direction."""
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _loop(self):
+        """Submit a sync after each delay and wait for it to finish."""
+        delay = self.interval
+        while not self._stop.wait(self._jittered(delay)):
+            job = self.jobs.submit(incremental=True)
+            while not job.finished:
+                if self._stop.wait(JOB_POLL_SECONDS):
+                    return
+            delay = self.next_delay(delay, job)
+            logger.debug(
+                "Scheduled sync %s %s (%s inserted); next in ~%ss",
+                job.job_id,
+                job.status,
+                job.progress.inserted,
+                delay,
+            )
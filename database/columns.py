@@ -0,0 +1,37 @@
+"""Columns added to existing tables after they were first created.
+
+create_all() only creates missing tables, so a database created by an older
+version keeps its old columns. Each column listed here is added with
+ALTER TABLE when its table lacks it; the step is idempotent and runs with the
+other schema setup in Database.
+"""
+
+from sqlalchemy.engine import Connection
+
+# table -> [(column, SQL type and default)], for columns added after a table shipped.
+ADDED_COLUMNS = {
+    "sync_runs": [
+        ("listed", "INTEGER NOT NULL DEFAULT 0"),
+        ("fetched", "INTEGER NOT NULL DEFAULT 0"),
+        ("unparseable", "INTEGER NOT NULL DEFAULT 0"),
+        ("duplicates", "INTEGER NOT NULL DEFAULT 0"),
+        ("inserted", "INTEGER NOT NULL DEFAULT 0"),
+        ("errors", "INTEGER NOT NULL DEFAULT 0"),
+        ("list_seconds", "FLOAT NOT NULL DEFAULT 0"),
+        ("get_seconds", "FLOAT NOT NULL DEFAULT 0"),
+        ("mime_seconds", "FLOAT NOT NULL DEFAULT 0"),
+        ("parse_seconds", "FLOAT NOT NULL DEFAULT 0"),
+        ("db_seconds", "FLOAT NOT NULL DEFAULT 0"),
+    ],
+}
+
+
+def install_columns(connection: Connection) -> None:
+    """Add the columns of ADDED_COLUMNS that existing tables are missing."""
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {
+            row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")
+        }
+        for name, definition in columns:
+            if name not in existing:
+                connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
@@ -9,16 +9,25 @@ duplicates and errors.
 """
 
 import logging
+import os
 
 from contextlib import contextmanager
 from sqlmodel import create_engine, SQLModel, Session
 
+from database.columns import install_columns
+from database.indexes import install_indexes
+from database.triggers import install_triggers
 from models.bank import Bank
 from models.category import Category
 from models.subcategory import Subcategory
 from models.transaction import Transaction
 from models.account import Account
 from models.account_type import AccountType
+from models.table_counter import TableCounter
+from models.monthly_rollup import MonthlyRollup
+from models.sync_lease import SyncLease
+from models.sync_run import SyncRun
+from models.gmail_watch import GmailWatch
 
 # These imports ensure SQLModel discovers all table definitions
 __all__ = [
@@ -29,6 +38,11 @@ __all__ = [
     "Transaction",
     "Account",
     "AccountType",
+    "TableCounter",
+    "MonthlyRollup",
+    "SyncLease",
+    "SyncRun",
+    "GmailWatch",
 ]
 
 
@@ -46,6 +60,9 @@ class Database:
 
     engine = None
 
+    # Database files whose schema, indexes and triggers this process already set up.
+    _prepared_files: set[tuple] = set()
+
     def __init__(self, db_url="sqlite:///expenses.db"):
         """Initialize database connection and ensure schema exists.
 
@@ -61,12 +78,50 @@ class Database:
                 echo=False,
             )
 
-            SQLModel.metadata.create_all(self.engine)
-            logger.info("Database initialized: %s", db_url)
+            if self._file_identity() not in self._prepared_files:
+                SQLModel.metadata.create_all(self.engine)
+                self._enable_wal()
+                with self.engine.begin() as connection:
+                    install_columns(connection)
+                    install_indexes(connection)
+                    install_triggers(connection)
+                identity = self._file_identity()
+                if identity is not None:
+                    self._prepared_files.add(identity)
+                logger.info("Database initialized: %s", db_url)
         except Exception as e:
             logger.error("Database initialization failed: %s", e)
             raise
 
+    def _file_identity(self):
+        """Return a key identifying the SQLite file behind the engine, or None.
+
+        The key changes when the file is deleted or replaced, so a new file
+        gets its schema set up again. In-memory and non-SQLite databases have
+        no identity and are always set up.
+        """
+        url = self.engine.url
+        if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+            return None
+        try:
+            stat = os.stat(url.database)
+        except OSError:
+            return None
+        created = getattr(stat, "st_birthtime", None)
+        return (os.path.abspath(url.database), stat.st_dev, stat.st_ino, created)
+
+    def _enable_wal(self):
+        """Switch file-backed SQLite databases to write-ahead logging.
+
+        WAL lets long reads (such as streamed exports) run alongside the sync's
+        writes instead of blocking them. The mode is persistent in the file.
+        """
+        url = self.engine.url
+        if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+            return
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
     @contextmanager
     def session(self):
         """Context manager that yields a Session and handles commit/rollback."""
@@ -0,0 +1,44 @@
+"""Secondary indexes backing the filtered transaction queries.
+
+Every index ends with the listing sort key (date, transaction_id) where
+possible, so filtered pages can be read in order without a sort step. The
+amount and merchant indexes cannot provide that order; they serve counts and
+selective listings (see TransactionService._residual_index_hint).
+
+The statements are idempotent and also add the indexes to databases created
+before they existed (create_all() does not touch existing tables).
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TRANSACTION_INDEX_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_date
+    ON transactions (date, transaction_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_bank_date
+    ON transactions (bank_id, date, transaction_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_type_date
+    ON transactions (type, date, transaction_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_amount
+    ON transactions (amount)
+    """,
+    # NOCASE lets SQLite use the index for case-insensitive LIKE 'prefix%';
+    # the trailing date keeps merchant + date range counts index-only.
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_merchant
+    ON transactions (merchant COLLATE NOCASE, date)
+    """,
+]
+
+
+def install_indexes(connection: Connection) -> None:
+    """Create the secondary indexes used by filtered listings."""
+    for statement in TRANSACTION_INDEX_DDL:
+        connection.execute(text(statement))
@@ -0,0 +1,226 @@
+"""SQL triggers that keep derived tables in sync with ``transactions``.
+
+Triggers run inside the same transaction as the statement that fired them, so
+derived data is always consistent with the base table regardless of which code
+path (service, tools or a manual SQL session) wrote the rows.
+
+All statements are idempotent and safe to run on every startup.
+"""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("expense_tracker")
+
+TRANSACTION_COUNTER_DDL = [
+    # Seed the counter once, counting the rows of pre-existing databases.
+    """
+    INSERT INTO table_counters (name, row_count, version)
+    SELECT 'transactions', (SELECT count(*) FROM transactions), 0
+    WHERE NOT EXISTS (SELECT 1 FROM table_counters WHERE name = 'transactions')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_count_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        UPDATE table_counters
+        SET row_count = row_count + 1, version = version + 1
+        WHERE name = 'transactions';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_count_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        UPDATE table_counters
+        SET row_count = row_count - 1, version = version + 1
+        WHERE name = 'transactions';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_count_update
+    AFTER UPDATE ON transactions
+    BEGIN
+        UPDATE table_counters
+        SET version = version + 1
+        WHERE name = 'transactions';
+    END
+    """,
+]
+
+
+ROLLUP_MONTH = "COALESCE(strftime('%Y-%m', {row}date), 'unknown')"
+
+ROLLUP_COLUMNS = "month, bank_id, type, category_id, total, count, min_amount, max_amount"
+
+# Aggregates every transaction of the rollup group, keyed on the columns of {row}.
+ROLLUP_GROUP_SELECT = f"""
+    SELECT {ROLLUP_MONTH.format(row="")}, bank_id, type, COALESCE(category_id, 0),
+           sum(amount), count(*), min(amount), max(amount)
+    FROM transactions
+"""
+
+
+def _rollup_recompute(row: str) -> str:
+    """Return statements that recompute the rollup group of the OLD or NEW row.
+
+    Deletes and updates cannot be applied incrementally to min/max, so the
+    affected group is re-aggregated from the base rows of that bank and month.
+    """
+    month = ROLLUP_MONTH.format(row=f"{row}.")
+    return f"""
+        DELETE FROM monthly_rollups
+        WHERE month = {month}
+          AND bank_id = {row}.bank_id
+          AND type = {row}.type
+          AND category_id = COALESCE({row}.category_id, 0);
+        INSERT INTO monthly_rollups ({ROLLUP_COLUMNS})
+        {ROLLUP_GROUP_SELECT}
+        WHERE bank_id = {row}.bank_id
+          AND type = {row}.type
+          AND COALESCE(category_id, 0) = COALESCE({row}.category_id, 0)
+          AND (
+            ({row}.date IS NULL AND date IS NULL)
+            OR (
+              date >= strftime('%Y-%m-01', {row}.date)
+              AND date < date({row}.date, 'start of month', '+1 month')
+            )
+          )
+        GROUP BY 1, 2, 3, 4;
+    """
+
+
+MONTHLY_ROLLUP_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO monthly_rollups ({ROLLUP_COLUMNS})
+        VALUES (
+            {ROLLUP_MONTH.format(row="NEW.")}, NEW.bank_id, NEW.type,
+            COALESCE(NEW.category_id, 0), NEW.amount, 1, NEW.amount, NEW.amount
+        )
+        ON CONFLICT (month, bank_id, type, category_id) DO UPDATE SET
+            total = total + excluded.total,
+            count = count + 1,
+            min_amount = min(min_amount, excluded.min_amount),
+            max_amount = max(max_amount, excluded.max_amount);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        {_rollup_recompute("OLD")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+    AFTER UPDATE OF date, bank_id, type, category_id, amount ON transactions
+    BEGIN
+        {_rollup_recompute("OLD")}
+        {_rollup_recompute("NEW")}
+    END
+    """,
+]
+
+
+SEARCH_COLUMNS = "description, merchant, reference"
+
+# External-content FTS5 index: it stores only the token index and reads the
+# column values back from ``transactions`` by rowid.
+SEARCH_INDEX_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        {SEARCH_COLUMNS},
+        content='transactions',
+        content_rowid='transaction_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (rowid, {SEARCH_COLUMNS})
+        VALUES (NEW.transaction_id, NEW.description, NEW.merchant, NEW.reference);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, {SEARCH_COLUMNS})
+        VALUES ('delete', OLD.transaction_id, OLD.description, OLD.merchant, OLD.reference);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+    AFTER UPDATE OF description, merchant, reference ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, {SEARCH_COLUMNS})
+        VALUES ('delete', OLD.transaction_id, OLD.description, OLD.merchant, OLD.reference);
+        INSERT INTO transactions_fts (rowid, {SEARCH_COLUMNS})
+        VALUES (NEW.transaction_id, NEW.description, NEW.merchant, NEW.reference);
+    END
+    """,
+]
+
+
+def fts5_available(connection: Connection) -> bool:
+    """Return True if the SQLite library was built with the FTS5 extension."""
+    return bool(
+        connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+    )
+
+
+def install_triggers(connection: Connection) -> None:
+    """Create the triggers (and seed rows) that maintain derived tables."""
+    for statement in TRANSACTION_COUNTER_DDL + MONTHLY_ROLLUP_DDL:
+        connection.execute(text(statement))
+
+    # Backfill rollups once for databases that predate the table. Checked here
+    # because SQLite evaluates the GROUP BY even when a NOT EXISTS guard is false.
+    if connection.execute(text("SELECT 1 FROM monthly_rollups LIMIT 1")).first() is None:
+        rebuild_monthly_rollups(connection)
+
+    if fts5_available(connection):
+        for statement in SEARCH_INDEX_DDL:
+            connection.execute(text(statement))
+        # Index the rows of databases that predate the search index. Without it
+        # the triggers would send 'delete' commands for rows that were never
+        # indexed, which corrupts an external-content FTS5 table.
+        if _search_index_is_stale(connection):
+            rebuild_search_index(connection)
+    else:
+        logger.warning("SQLite was built without FTS5; transaction search is disabled")
+
+
+def _search_index_is_stale(connection: Connection) -> bool:
+    """Return True if ``transactions`` has rows but the search index has none.
+
+    Counting ``transactions_fts`` would read the external content table, so
+    the index's own docsize shadow table is checked instead.
+    """
+    indexed = connection.execute(text("SELECT 1 FROM transactions_fts_docsize LIMIT 1")).first()
+    if indexed is not None:
+        return False
+    return connection.execute(text("SELECT 1 FROM transactions LIMIT 1")).first() is not None
+
+
+def rebuild_monthly_rollups(connection: Connection) -> None:
+    """Discard and re-aggregate every monthly rollup from ``transactions``."""
+    connection.execute(text("DELETE FROM monthly_rollups"))
+    connection.execute(
+        text(
+            f"INSERT INTO monthly_rollups ({ROLLUP_COLUMNS}) "
+            f"{ROLLUP_GROUP_SELECT} GROUP BY 1, 2, 3, 4"
+        )
+    )
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Rebuild the full-text index from the current contents of ``transactions``."""
+    connection.execute(text("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')"))
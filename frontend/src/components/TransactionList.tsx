@@ -29,7 +29,7 @@ export default function TransactionList() {
   const totalPages = Math.max(1, Math.ceil(total / PAGE_SIZE))
 
   const syncMutation = useMutation({
-    mutationFn: syncEmails,
+    mutationFn: () => syncEmails(),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['transactions'] })
     },
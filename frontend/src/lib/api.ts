@@ -1,3 +1,4 @@
+import type { SyncJob } from '../types/sync'
 import type { PaginatedResponse } from '../types/transaction'
 
 const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:8000'
@@ -18,7 +19,7 @@ export async function getTransactions(
   return response.json()
 }
 
-export async function syncEmails(): Promise<{ status: string }> {
+export async function startSync(): Promise<SyncJob> {
   const response = await fetch(`${API_BASE}/sync`, {
     method: 'POST',
   })
@@ -26,4 +27,34 @@ export async function syncEmails(): Promise<{ status: string }> {
     throw new Error('Error al sincronizar')
   }
   return response.json()
-}
\ No newline at end of file
+}
+
+export function watchSync(
+  jobId: string,
+  onProgress?: (job: SyncJob) => void
+): Promise<SyncJob> {
+  return new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_BASE}/sync/${jobId}/events`)
+    events.onmessage = (event) => {
+      const job: SyncJob = JSON.parse(event.data)
+      onProgress?.(job)
+      if (job.status === 'succeeded' || job.status === 'failed') {
+        events.close()
+        if (job.status === 'failed') {
+          reject(new Error(job.error ?? 'Error al sincronizar'))
+        } else {
+          resolve(job)
+        }
+      }
+    }
+    events.onerror = () => {
+      events.close()
+      reject(new Error('Se perdió la conexión con la sincronización'))
+    }
+  })
+}
+
+export async function syncEmails(onProgress?: (job: SyncJob) => void): Promise<SyncJob> {
+  const job = await startSync()
+  return watchSync(job.job_id, onProgress)
+}
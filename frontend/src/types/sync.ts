@@ -0,0 +1,27 @@
+export interface SyncProgress {
+  listed: number
+  fetched: number
+  parsed: number
+  inserted: number
+  skipped: number
+  errors: number
+  archive_errors: number
+  unparseable: number
+  duplicates: number
+  list_seconds: number
+  get_seconds: number
+  mime_seconds: number
+  parse_seconds: number
+  db_seconds: number
+}
+
+export interface SyncJob {
+  job_id: string
+  status: 'queued' | 'running' | 'succeeded' | 'failed'
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+  error: string | null
+  joined: string | null
+  progress: SyncProgress
+}
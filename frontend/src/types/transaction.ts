@@ -15,6 +15,7 @@ export interface Transaction {
 
 export interface PaginatedResponse {
   total: number
+  total_exact: boolean
   transactions: Transaction[]
 }
 
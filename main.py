@@ -4,26 +4,67 @@ This script orchestrates the entire process of:
 - Authenticating with Gmail API
 - Searching for bank notification emails
 - Parsing emails using bank-specific parsers
-- Saving email bodies locally for debugging
+- Archiving email bodies locally for debugging and re-parsing
 - Storing valid transactions in the SQLite database
 
 It runs as a standalone script and is intended to be executed periodically
 (e.g., via cron or manual run) to import new transactions.
 """
 
+import argparse
 import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional, TypeVar
+
+from googleapiclient.errors import HttpError
 
 from constants.banks import SupportedBanks, bank_emails
-from core.fetch_emails import get_message, list_messages, parse_email, save_email_body
+from core.body_archive import ArchiveWriter, BodyArchive
+from core.fetch_emails import (
+    execute,
+    get_message,
+    get_message_sender,
+    list_history,
+    list_message_pages,
+    parse_email,
+    save_email_body,
+)
+from core.gmail_labels import (
+    PARSE_FAILED,
+    PARSE_FAILED_LABEL,
+    PROCESSED,
+    MessageLabeler,
+    exclude_labels,
+    search_name,
+)
 from core.gmail_service import get_gmail_service
+from core.services.gmail_watch_service import GmailWatchService
+from core.services.sync_run_service import SyncRunService
 from core.services.transaction_service import TransactionService
 from core.google_auth import get_credentials
-from core.logging_config import setup_logging
+from core.logging_config import SampledLog, log_sampled_summary, setup_logging
+from core.metrics import DB_WRITE_SECONDS, PARSE_FAILURES, PARSE_SECONDS, SYNC_MESSAGES
 from core.parsers.parser_helper import ParserHelper
+from core.sync_jobs import SyncProgress
+from core.sync_lock import SyncLeaseLost, SyncLock, run_exclusive
 from database.database import Database
+from models.sync_run import HISTORY_QUERY, SyncRun
+
+
+logger = setup_logging(level=logging.DEBUG, use_queue=True)
 
+no_parser_log = SampledLog(logger, "Emails without a parser", level=logging.WARNING)
 
-logger = setup_logging(level=logging.DEBUG)
+# Messages processed between sync checkpoints within a result page.
+CHECKPOINT_EVERY = 50
+
+# Incremental syncs re-list this much before the last completed run started, so
+# messages that arrived while it was listing are not missed.
+INCREMENTAL_OVERLAP = timedelta(hours=1)
+
+T = TypeVar("T")
 
 
 def build_global_query() -> str:
@@ -50,7 +91,177 @@ def build_query_for_bank(bank: SupportedBanks) -> str:
     return f"({or_part})"
 
 
-def run_sync():
+def build_incremental_query(query: str, last_completed: Optional[SyncRun]) -> str:
+    """
+    Restrict a query to messages received since the last completed sync.
+
+    Returns the query unchanged if no sync has completed yet.
+    """
+    if last_completed is None:
+        return query
+    since = last_completed.started_at.replace(tzinfo=timezone.utc) - INCREMENTAL_OVERLAP
+    return f"({query}) after:{int(since.timestamp())}"
+
+
+def resumable_pages(service, query: str, page_token: Optional[str]):
+    """Yield message pages starting at a stored page token.
+
+    If Gmail rejects the token (it may have expired), fall back to listing from
+    the first page. Callers can tell by comparing the first page's token with
+    the one they passed.
+    """
+    pages = list_message_pages(service, query=query, page_token=page_token)
+    try:
+        first = next(pages, None)
+    except HttpError as e:
+        if page_token is None or e.resp.status != 400:
+            raise
+        logger.warning("Stored page token rejected, restarting from the first page: %s", e)
+        pages = list_message_pages(service, query=query)
+        first = next(pages, None)
+
+    if first is not None:
+        yield first
+        yield from pages
+
+
+def process_message(
+    service,
+    transaction_service: TransactionService,
+    msg_id: str,
+    progress: SyncProgress,
+    archive: Optional[ArchiveWriter] = None,
+) -> Optional[str]:
+    """Fetch, parse and store a single message, counting the outcome in ``progress``.
+
+    A message that fails to download, parse or save is logged and counted as an
+    error rather than aborting the sync. Its body is queued on ``archive``, if
+    given, for later re-parsing.
+
+    Returns:
+        PROCESSED if the transaction is stored (now or by an earlier sync),
+        PARSE_FAILED if no parser produced a transaction, or None after a
+        download or database error, so the message is simply retried later.
+    """
+    try:
+        with timed(progress, "get"):
+            msg = get_message(service, msg_id)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        count(progress, "errors")
+        logger.error("Failed to fetch message %s: %s", msg_id, e, exc_info=True)
+        return None
+    count(progress, "fetched")
+
+    parser = None
+    try:
+        with timed(progress, "mime"):
+            email_message = parse_email(msg, msg_id)
+
+        if archive is not None:
+            save_email_body(email_message, msg_id, archive)
+
+        from_header = email_message.get("from", "")
+        parser = ParserHelper.get_parser_for_email(from_header)
+
+        if parser is None:
+            no_parser_log.log(
+                "No parser found for email from: %s (message %s)", from_header, msg_id
+            )
+            count(progress, "skipped")
+            progress.unparseable += 1
+            PARSE_FAILURES.inc("unknown", "no_parser")
+            return PARSE_FAILED
+
+        start = time.perf_counter()
+        try:
+            transaction = parser.parse(email_message, msg_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            progress.parse_seconds += elapsed
+            PARSE_SECONDS.observe(elapsed, type(parser).__name__)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        count(progress, "errors")
+        progress.unparseable += 1
+        logger.error("Failed to parse message %s: %s", msg_id, e, exc_info=True)
+        if parser is not None:
+            PARSE_FAILURES.inc(parser.bank_name, parser.template_name(email_message))
+        return PARSE_FAILED
+
+    if not transaction:
+        count(progress, "skipped")
+        progress.unparseable += 1
+        PARSE_FAILURES.inc(parser.bank_name, parser.template_name(email_message))
+        return PARSE_FAILED
+
+    count(progress, "parsed")
+    start = time.perf_counter()
+    inserted = transaction_service.save_transaction(transaction) is not None
+    duplicate = not inserted and transaction_service.has_email(msg_id)
+    elapsed = time.perf_counter() - start
+    progress.db_seconds += elapsed
+    if inserted:
+        DB_WRITE_SECONDS.observe(elapsed, "inserted")
+        count(progress, "inserted")
+        return PROCESSED
+    if duplicate:
+        DB_WRITE_SECONDS.observe(elapsed, "duplicate")
+        count(progress, "skipped")
+        progress.duplicates += 1
+        return PROCESSED
+    DB_WRITE_SECONDS.observe(elapsed, "error")
+    count(progress, "errors")
+    return None
+
+
+def count(progress: SyncProgress, outcome: str):
+    """Count a message outcome in the run's progress and in the process-wide metrics."""
+    setattr(progress, outcome, getattr(progress, outcome) + 1)
+    SYNC_MESSAGES.inc(outcome)
+
+
+@contextmanager
+def timed(progress: SyncProgress, stage: str):
+    """Add the duration of the ``with`` block to the ``<stage>_seconds`` timing of ``progress``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        name = f"{stage}_seconds"
+        setattr(progress, name, getattr(progress, name) + time.perf_counter() - start)
+
+
+def timed_iter(items: Iterable[T], progress: SyncProgress, stage: str) -> Iterator[T]:
+    """Yield the items of a lazy listing, timing the work of producing each as ``stage``."""
+    iterator = iter(items)
+    while True:
+        with timed(progress, stage):
+            item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+
+def build_sync_query(labelled: bool, retry_failed: bool = False) -> str:
+    """
+    Build the query a sync lists messages with.
+
+    Args:
+        labelled: Whether handled messages carry the sync labels; if so they
+            are excluded.
+        retry_failed: List only messages previously labelled as parse failures.
+    """
+    query = build_global_query()
+    if retry_failed:
+        return f"({query}) label:{search_name(PARSE_FAILED_LABEL)}"
+    return exclude_labels(query) if labelled else query
+
+
+def run_sync(
+    progress: Optional[SyncProgress] = None,
+    incremental: bool = False,
+    retry_failed: bool = False,
+    lease: Optional[SyncLock] = None,
+):
     """
     Run the full expense tracking workflow.
 
@@ -61,49 +272,249 @@ def run_sync():
     4. Parses each email with the appropriate bank parser
     5. Saves transactions to the database
 
-    Handles errors gracefully and ensures the database connection is closed.
+    Handled messages are labelled in Gmail (see core.gmail_labels) and left
+    out of later listings, so each sync only lists mail that still needs work.
+    Labels are applied once the listing has finished, as labelling excludes
+    messages from the very query being paged through. When a run is
+    interrupted, the labels of the messages it handled are applied and its
+    listing restarts from the first page, which no longer includes them.
+
+    Downloaded bodies are kept in the body archive (see core.body_archive),
+    written by a background thread that is drained before the run returns.
+
+    The position in the result pages is checkpointed to the sync_runs table
+    every CHECKPOINT_EVERY messages and at the end of each page. If a run is
+    interrupted, the next one resumes after the last checkpointed message
+    instead of starting over. Errors while listing messages or authenticating
+    abort the run. The database connection is always closed.
+
+    When a run completes or is interrupted, its message counts and the time
+    spent listing, downloading, decoding, parsing and saving are added to its
+    sync_runs row; history syncs get a row of their own.
+
+    Args:
+        progress: Optional counters updated as messages are processed, so a
+            caller running the sync in the background can report progress.
+        incremental: Only sync messages received since the last sync. An
+            unfinished run of any kind is resumed first; otherwise, if a Gmail
+            watch is registered, only the messages added since its stored
+            history id are fetched, else the bank query is limited with
+            ``after:`` to the last completed run.
+        retry_failed: Only list messages labelled as parse failures, e.g.
+            after a parser was fixed.
+        lease: The held sync lease, if any. The run stops at its next
+            checkpoint once another process has taken the lease over.
     """
     logger.info("Starting expense tracking process")
+    progress = progress if progress is not None else SyncProgress()
 
     db = Database()
     transaction_service = TransactionService(db)
-    creds = get_credentials()
-    service = get_gmail_service(creds)
-
-    query = build_global_query()
+    runs = SyncRunService(db)
+    archive: Optional[ArchiveWriter] = None
 
     try:
-        for msg_meta in list_messages(service, query=query):
-            msg_id = msg_meta["id"]
+        archive = ArchiveWriter(BodyArchive())
+        creds = get_credentials()
+        service = get_gmail_service(creds)
+        labeler = MessageLabeler.create(service)
 
-            msg = get_message(service, msg_id)
-            email_message = parse_email(msg, msg_id)
+        try:
+            if incremental and runs.unfinished() is None:
+                started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+                try:
+                    synced = sync_history(
+                        service,
+                        transaction_service,
+                        GmailWatchService(db),
+                        progress,
+                        labeler,
+                        archive,
+                    )
+                except Exception as e:
+                    runs.record(HISTORY_QUERY, started_at, "failed", progress, error=str(e))
+                    raise
+                if synced:
+                    runs.record(HISTORY_QUERY, started_at, "completed", progress)
+                    logger.info("Process completed: %s", progress)
+                    return
 
-            save_email_body(email_message, msg_id)
+            query = build_sync_query(labeler is not None, retry_failed)
+            if incremental:
+                query = build_incremental_query(query, runs.latest(status="completed"))
+            run = runs.start(query, resume_any=incremental)
+            try:
+                sync_pages(
+                    service, transaction_service, runs, run, progress, labeler, archive, lease
+                )
+            except SyncLeaseLost:
+                # The new holder resumes this run: leave its row and listing alone.
+                labeler = None
+                raise
+            except Exception as e:
+                if labeler is not None and labeler.pending:
+                    # Labelling shrinks the result set, so the stored page is no longer valid.
+                    flush_labels(labeler)
+                    run.page_token = run.last_message_id = None
+                runs.finish(run, "interrupted", error=str(e), progress=progress)
+                raise
+            runs.finish(run, "completed", progress=progress)
+        finally:
+            flush_labels(labeler)
 
-            from_header = email_message.get("from", "")
-            parser = ParserHelper.get_parser_for_email(from_header)
-
-            if parser is None:
-                logger.warning("No parser found for email from: %s", from_header)
-                logger.warning("message_id: %s", msg_id)
-                continue
-
-            transaction = parser.parse(email_message, msg_id)
-            if transaction:
-                transaction_service.save_transaction(transaction)
-
-        logger.info("Process completed")
+        logger.info("Process completed: %s", progress)
     except Exception as e:
         logger.error("An error occurred: %s", e, exc_info=True)
         raise
     finally:
+        if archive is not None:
+            archive.close()
+            archive.archive.close()
+            progress.archive_errors = archive.failed + archive.dropped
+        log_sampled_summary(logger)
         db.close()
 
 
+def flush_labels(labeler: Optional[MessageLabeler]):
+    """Apply queued Gmail labels; a failure is logged, as the messages are only re-listed."""
+    if labeler is None:
+        return
+    try:
+        labeler.flush()
+    except HttpError as e:
+        logger.warning("Failed to label processed messages: %s", e)
+
+
+def sync_history(
+    service,
+    transaction_service: TransactionService,
+    watches: GmailWatchService,
+    progress: SyncProgress,
+    labeler: Optional[MessageLabeler] = None,
+    archive: Optional[ArchiveWriter] = None,
+) -> bool:
+    """Process the messages added since the watch's stored history id.
+
+    Only bank senders are downloaded in full; the others are recognised from
+    their From header alone. The stored history id is advanced once every page
+    has been processed, so an interrupted history sync is simply repeated.
+
+    Returns:
+        False if no watch is registered or Gmail no longer serves the stored
+        history id (the id is then reset to the mailbox's current one and the
+        caller should fall back to a query-based sync).
+    """
+    watch = watches.get()
+    if watch is None:
+        return False
+
+    latest = watch.history_id
+    seen = set()
+    try:
+        changes = timed_iter(list_history(service, watch.history_id), progress, "list")
+        for history_id, message_ids in changes:
+            for msg_id in message_ids:
+                if msg_id in seen:
+                    continue
+                seen.add(msg_id)
+                with timed(progress, "get"):
+                    sender = get_message_sender(service, msg_id)
+                if ParserHelper.get_parser_for_email(sender) is None:
+                    continue
+                count(progress, "listed")
+                outcome = process_message(
+                    service, transaction_service, msg_id, progress, archive=archive
+                )
+                if labeler is not None:
+                    labeler.record(msg_id, outcome)
+            latest = max(latest, history_id)
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        profile = execute(service.users().getProfile(userId="me"), "getProfile")
+        logger.warning(
+            "Gmail history %s expired, falling back to a query sync: %s", watch.history_id, e
+        )
+        watches.reset(watch.email_address, int(profile["historyId"]))
+        return False
+
+    watches.advance(watch.email_address, latest)
+    logger.info("Synced Gmail history %s -> %s", watch.history_id, latest)
+    return True
+
+
+def sync_pages(
+    service,
+    transaction_service: TransactionService,
+    runs: SyncRunService,
+    run: SyncRun,
+    progress: SyncProgress,
+    labeler: Optional[MessageLabeler] = None,
+    archive: Optional[ArchiveWriter] = None,
+    lease: Optional[SyncLock] = None,
+):
+    """Process every message page of a run, checkpointing as it goes.
+
+    Resumes from the run's stored page token, skipping messages on that page up
+    to and including the last checkpointed one. Outcomes are only recorded on
+    ``labeler``; the caller applies them once the listing is over.
+
+    Raises:
+        SyncLeaseLost: If ``lease`` was taken over by another process; checked
+            before each checkpoint, so that process resumes from the last one.
+    """
+    start_token = run.page_token
+    resume_after = run.last_message_id
+    done = run.messages_done
+
+    pages = timed_iter(resumable_pages(service, run.query, start_token), progress, "list")
+    for page_token, messages, next_page_token in pages:
+        if resume_after is not None:
+            ids = [msg_meta["id"] for msg_meta in messages]
+            if page_token == start_token and resume_after in ids:
+                messages = messages[ids.index(resume_after) + 1 :]
+            resume_after = None
+
+        for msg_meta in messages:
+            msg_id = msg_meta["id"]
+            count(progress, "listed")
+            outcome = process_message(
+                service, transaction_service, msg_id, progress, archive=archive
+            )
+            if labeler is not None:
+                labeler.record(msg_id, outcome)
+
+            done += 1
+            if done % CHECKPOINT_EVERY == 0:
+                if lease is not None:
+                    lease.ensure_held()
+                runs.checkpoint(run, page_token, msg_id, done)
+
+        if lease is not None:
+            lease.ensure_held()
+        runs.checkpoint(run, next_page_token, None, done)
+
+
 def main():
-    """Script entry point."""
-    run_sync()
+    """Script entry point.
+
+    Joins a sync that is already running elsewhere (e.g. started from the API)
+    instead of crawling the mailbox a second time.
+    """
+    parser = argparse.ArgumentParser(description="Import bank transactions from Gmail.")
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only re-process messages labelled as parse failures",
+    )
+    args = parser.parse_args()
+
+    db = Database()
+    try:
+        lock = SyncLock(db)
+        run_exclusive(lock, lambda: run_sync(retry_failed=args.retry_failed, lease=lock))
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+"""Gmail watch data model."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class GmailWatch(SQLModel, table=True):
+    """Push notification subscription of a Gmail account and its sync position.
+
+    Attributes:
+        email_address: Account the watch belongs to
+        topic_name: Pub/Sub topic Gmail publishes notifications to
+        history_id: Mailbox history id up to which added messages were synced
+        expiration: When Gmail stops sending notifications unless renewed (UTC)
+        updated_at: Last time the row was written (UTC)
+    """
+
+    __tablename__ = "gmail_watch"  # type: ignore
+    email_address: str = Field(primary_key=True)
+    topic_name: Optional[str] = None
+    history_id: int
+    expiration: Optional[datetime] = None
+    updated_at: datetime
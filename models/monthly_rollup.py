@@ -0,0 +1,31 @@
+"""Monthly rollup data model."""
+
+from sqlmodel import Field, SQLModel
+
+
+class MonthlyRollup(SQLModel, table=True):
+    """Aggregated transaction amounts per month, bank, type and category.
+
+    Rows are maintained incrementally by SQL triggers on ``transactions`` and
+    can be rebuilt from scratch with StatsService.rebuild_monthly_rollups().
+
+    Attributes:
+        month: Month in "YYYY-MM" format, or "unknown" for undated transactions
+        bank_id: Bank the transactions belong to
+        type: Transaction type ("expense" or "income")
+        category_id: Category id, 0 for uncategorized transactions
+        total: Sum of amounts
+        count: Number of transactions
+        min_amount: Smallest amount
+        max_amount: Largest amount
+    """
+
+    __tablename__ = "monthly_rollups"  # type: ignore
+    month: str = Field(primary_key=True)
+    bank_id: int = Field(primary_key=True, foreign_key="bank.id")
+    type: str = Field(primary_key=True)
+    category_id: int = Field(default=0, primary_key=True)
+    total: float = Field(default=0.0)
+    count: int = Field(default=0)
+    min_amount: float = Field(default=0.0)
+    max_amount: float = Field(default=0.0)
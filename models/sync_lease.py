@@ -0,0 +1,22 @@
+"""Sync lease data model."""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class SyncLease(SQLModel, table=True):
+    """Exclusive right to run a sync, shared by every process using the database.
+
+    Attributes:
+        name: Name of the leased resource (e.g. "gmail_sync")
+        owner: Identifier of the holder (host, process id and a random suffix)
+        acquired_at: When the holder took the lease (UTC)
+        heartbeat_at: Last time the holder confirmed it is alive (UTC)
+    """
+
+    __tablename__ = "sync_leases"  # type: ignore
+    name: str = Field(primary_key=True)
+    owner: str
+    acquired_at: datetime
+    heartbeat_at: datetime
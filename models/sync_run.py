@@ -0,0 +1,64 @@
+"""Sync run data model."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+# Query recorded for runs that synced Gmail history changes instead of a search.
+HISTORY_QUERY = "history"
+
+
+class SyncRun(SQLModel, table=True):
+    """A Gmail sync run and the checkpoint it can be resumed from.
+
+    Attributes:
+        run_id: Auto-incremented identifier
+        status: "running", "interrupted", "completed", "abandoned" or "failed"
+        query: Gmail search query the run lists messages with
+        page_token: Token of the result page to resume from (None for the first page)
+        last_message_id: Last message fully processed on that page, if any
+        messages_done: Messages processed so far, across resumptions
+        started_at: When the run was first started (UTC)
+        updated_at: When the checkpoint was last written (UTC)
+        finished_at: When the run completed or was abandoned (UTC)
+        error: Error that interrupted the run most recently
+        listed: Messages listed, across resumptions (likewise the counters below)
+        fetched: Messages downloaded
+        unparseable: Messages no parser turned into a transaction
+        duplicates: Transactions that were already stored
+        inserted: Transactions newly stored
+        errors: Messages that failed to fetch, parse or save
+        list_seconds: Time spent listing messages
+        get_seconds: Time spent downloading messages
+        mime_seconds: Time spent decoding MIME messages
+        parse_seconds: Time spent in bank parsers
+        db_seconds: Time spent saving transactions
+
+    History syncs (see main.sync_history) are recorded as runs with the query
+    HISTORY_QUERY; they have no checkpoint, and a failed one gets the status
+    "failed" rather than "interrupted", as it is simply repeated.
+    """
+
+    __tablename__ = "sync_runs"  # type: ignore
+    run_id: int | None = Field(default=None, primary_key=True)
+    status: str = Field(default="running")
+    query: str
+    page_token: Optional[str] = None
+    last_message_id: Optional[str] = None
+    messages_done: int = Field(default=0)
+    started_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    listed: int = Field(default=0)
+    fetched: int = Field(default=0)
+    unparseable: int = Field(default=0)
+    duplicates: int = Field(default=0)
+    inserted: int = Field(default=0)
+    errors: int = Field(default=0)
+    list_seconds: float = Field(default=0.0)
+    get_seconds: float = Field(default=0.0)
+    mime_seconds: float = Field(default=0.0)
+    parse_seconds: float = Field(default=0.0)
+    db_seconds: float = Field(default=0.0)
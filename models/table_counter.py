@@ -0,0 +1,18 @@
+"""Table counter data model."""
+
+from sqlmodel import Field, SQLModel
+
+
+class TableCounter(SQLModel, table=True):
+    """Row count and change version of a table, maintained by SQL triggers.
+
+    Attributes:
+        name: Name of the counted table (e.g. "transactions")
+        row_count: Current number of rows in the table
+        version: Monotonic counter bumped on every insert, update or delete
+    """
+
+    __tablename__ = "table_counters"  # type: ignore
+    name: str = Field(primary_key=True)
+    row_count: int = Field(default=0)
+    version: int = Field(default=0)
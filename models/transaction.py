@@ -7,10 +7,11 @@ The model includes core fields required for storage and display, optional catego
 fields for future use, and a custom __str__ method for human-readable formatting.
 """
 
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal, Optional
 from sqlmodel import Field, SQLModel
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class TransactionCreate(BaseModel):
@@ -27,6 +28,59 @@ class TransactionCreate(BaseModel):
     status: str = "approved"
 
 
+class TransactionFilters(BaseModel):
+    """Optional predicates for listing and counting transactions.
+
+    Instances are immutable and hashable so they can be used as cache keys.
+
+    Attributes:
+        date_from: Inclusive lower bound for the transaction date
+        date_to: Exclusive upper bound for the transaction date
+        bank_id: Only transactions from this bank
+        type: Only "expense" or "income" transactions
+        min_amount: Inclusive lower bound for the amount
+        max_amount: Inclusive upper bound for the amount
+        merchant: Case-insensitive merchant name prefix
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    bank_id: Optional[int] = None
+    type: Optional[Literal["expense", "income"]] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    merchant: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        """Return True if no predicate is set."""
+        return all(value is None for value in self.model_dump().values())
+
+
+@dataclass(slots=True)
+class TransactionRow:
+    """A transaction as returned by the read endpoints, joined with its bank name.
+
+    Built directly from selected columns rather than ORM objects; field order
+    matches TRANSACTION_COLUMNS in the transaction service so rows can be
+    unpacked positionally.
+    """
+
+    transaction_id: int
+    email_id: str
+    date: Optional[datetime]
+    amount: float
+    description: str
+    type: str
+    bank_id: int
+    bank_name: str
+    category_id: Optional[int]
+    subcategory_id: Optional[int]
+    merchant: Optional[str]
+    reference: Optional[str]
+
+
 class Transaction(SQLModel, table=True):
     """
     Represents a single financial transaction extracted from a bank email notification.
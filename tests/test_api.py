@@ -0,0 +1,131 @@
+"""Tests for the API's conditional GET handling."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+import api
+from core.response_cache import ResponseCache
+from core.sync_jobs import SyncJobManager
+from core.services.transaction_service import TransactionService
+from database.database import Database
+from tests.test_transaction_service import make_transaction
+
+
+@pytest.fixture(name="client")
+def client_fixture(tmp_path):
+    """Provide a TestClient whose services use a temporary database."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    api.app.dependency_overrides[api.get_transaction_service] = lambda: TransactionService(db)
+    api.response_cache.clear()
+    with TestClient(api.app) as client:
+        client.service = TransactionService(db)
+        yield client
+    api.app.dependency_overrides.clear()
+    db.close()
+
+
+def test_transactions_revalidate_with_etag(client):
+    """Test that unchanged data answers 304 and writes change the ETag."""
+    client.service.save_transaction(make_transaction("a"))
+
+    first = client.get("/transactions")
+    assert first.status_code == 200
+    assert first.json()["total"] == 1
+    row = first.json()["transactions"][0]
+    assert (row["email_id"], row["bank_name"], row["date"]) == (
+        "a",
+        "hey_banco",
+        "2026-01-15T12:00:00",
+    )
+    assert client.get(f"/transactions/{row['transaction_id']}").json() == row
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/transactions", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+    client.service.save_transaction(make_transaction("b"))
+    changed = client.get("/transactions", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["total"] == 2
+
+    missing = client.get("/transactions/999")
+    assert missing.status_code == 404
+
+
+def test_database_errors_answer_503_and_are_not_cached(client, monkeypatch):
+    """Test that a failed read is not served as a cached, empty page."""
+    client.service.save_transaction(make_transaction("a"))
+
+    def fail(*args, **kwargs):
+        raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(TransactionService, "_filter_clauses", staticmethod(fail))
+        assert client.get("/transactions").status_code == 503
+
+    response = client.get("/transactions")
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert len(response.json()["transactions"]) == 1
+
+
+def test_missing_transaction_is_404_even_with_if_none_match_star(client):
+    """Test that If-None-Match: * does not revalidate a transaction that does not exist."""
+    response = client.get("/transactions/999", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_response_cache_coalesces_concurrent_renders():
+    """Test that concurrent misses for the same key and version render once."""
+    cache = ResponseCache()
+    release = Event()
+    calls = []
+
+    def render():
+        calls.append(1)
+        release.wait(timeout=5)
+        return b"body"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_render, "k", "v1", render) for _ in range(4)]
+        release.set()
+        assert [f.result() for f in futures] == [b"body"] * 4
+    assert len(calls) == 1
+
+    assert cache.get_or_render("k", "v1", lambda: b"stale") == b"body"
+    assert cache.get_or_render("k", "v2", lambda: b"fresh") == b"fresh"
+
+
+def test_sync_runs_in_background_and_streams_progress(client, monkeypatch):
+    """Test that POST /sync returns a job id and its progress can be followed."""
+    release = Event()
+
+    def fake_sync(progress, incremental=False):  # pylint: disable=unused-argument
+        progress.listed = 2
+        release.wait(timeout=5)
+        progress.inserted = 2
+
+    manager = SyncJobManager(fake_sync)
+    monkeypatch.setattr(api, "sync_jobs", manager)
+    monkeypatch.setattr(api, "SYNC_EVENT_INTERVAL", 0.01)
+
+    queued = client.post("/sync")
+    assert queued.status_code == 202
+    job_id = queued.json()["job_id"]
+
+    release.set()
+    events = client.get(f"/sync/{job_id}/events").text
+    final = json.loads(events.strip().split("\n\n")[-1].removeprefix("data: "))
+    assert final["status"] == "succeeded"
+    assert final["progress"]["inserted"] == 2
+
+    assert client.get(f"/sync/{job_id}").json()["progress"]["listed"] == 2
+    assert client.get("/sync/unknown").status_code == 404
+    manager.shutdown()
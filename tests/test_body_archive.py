@@ -0,0 +1,234 @@
+"""Tests for the compressed email body archive."""
+
+import os
+import sqlite3
+import threading
+
+from core import body_archive
+from core.body_archive import ArchiveWriter, BodyArchive, train_dictionary
+from core.fetch_emails import load_email, save_email_body
+from tools import migrate_bodies
+
+TEMPLATE = (
+    '<html><head><style>td {{ font-family: Arial; color: #333333; }}</style></head>'
+    '<body><table class="notification" width="600"><tr><td class="title">'
+    "Hola, realizaste una compra con tu tarjeta de crédito</td></tr>"
+    '<tr><td class="detail">Monto: <strong>${amount}</strong></td></tr>'
+    '<tr><td class="detail">Comercio: <strong>{merchant}</strong></td></tr>'
+    '<tr><td class="footer">Este correo se generó automáticamente, no respondas.</td></tr>'
+    "</table></body></html>"
+)
+
+
+def body(i: int) -> str:
+    """Render a bank-like notification body."""
+    return TEMPLATE.format(amount=f"{i * 7 % 1000}.{i % 100:02d}", merchant=f"OXXO {i}")
+
+
+def record(i: int) -> dict:
+    """Build an archive record for message ``i``."""
+    return {
+        "subject": f"Compra {i}",
+        "from": "alertas@hey.inc",
+        "date": "",
+        "body_html": body(i),
+        "body_plain": "",
+    }
+
+
+def test_records_round_trip_across_segments_and_reopen(tmp_path):
+    """Test random access by id across segment files and after reopening."""
+    with BodyArchive(tmp_path, segment_max_bytes=2048) as archive:
+        archive.put_many((f"m{i}", record(i)) for i in range(50))
+        archive.put("m7", record(700))  # replaces the earlier record
+        assert len(list(tmp_path.glob("segment-*.pack"))) > 1
+        assert archive.get("m3") == record(3)
+
+    with BodyArchive(tmp_path) as archive:
+        assert len(archive) == 50
+        assert archive.get("m49") == record(49)
+        assert archive.get("m7") == record(700)
+        assert archive.get("missing") is None
+        assert "m0" in archive and "missing" not in archive
+
+
+def test_trained_dictionary_shrinks_records_and_keeps_old_ones_readable(tmp_path):
+    """Test that a preset dictionary cuts record size and older records still decode."""
+    with BodyArchive(tmp_path) as archive:
+        archive.put("plain", record(0))
+        before = archive.size_bytes
+
+        assert archive.train(body(i) for i in range(20)) == archive.dictionary_id == 1
+        archive.put("dict", record(1))
+        assert archive.size_bytes - before < before * 0.6
+        assert archive.get("plain") == record(0)
+        assert archive.get("dict") == record(1)
+
+    assert train_dictionary(["<p>only once</p>"]) == b""
+
+
+def test_corrupt_record_is_reported_missing(tmp_path):
+    """Test that a damaged record is not returned."""
+    with BodyArchive(tmp_path) as archive:
+        archive.put("m1", record(1))
+    segment = tmp_path / "segment-00000.pack"
+    data = bytearray(segment.read_bytes())
+    data[-5] ^= 0xFF
+    segment.write_bytes(bytes(data))
+
+    with BodyArchive(tmp_path) as archive:
+        assert archive.get("m1") is None
+
+
+def test_truncated_segment_is_reported_missing(tmp_path):
+    """Test that a record cut short by a crash reads as missing instead of raising."""
+    with BodyArchive(tmp_path) as archive:
+        archive.put("m1", record(1))
+    segment = tmp_path / "segment-00000.pack"
+    segment.write_bytes(segment.read_bytes()[:5])
+
+    with BodyArchive(tmp_path) as archive:
+        assert archive.get("m1") is None
+
+
+def test_concurrent_writers_append_at_the_end_of_the_newest_segment(tmp_path):
+    """Test that two archives writing the same directory do not overwrite each other's offsets."""
+    with BodyArchive(tmp_path, segment_max_bytes=2048) as first, BodyArchive(
+        tmp_path, segment_max_bytes=2048
+    ) as second:
+        for i in range(20):
+            (first if i % 2 else second).put(f"m{i}", record(i))
+        assert all(first.get(f"m{i}") == record(i) for i in range(20))
+
+    with BodyArchive(tmp_path) as archive:
+        assert all(archive.get(f"m{i}") == record(i) for i in range(20))
+
+
+def test_fsynced_batch_syncs_every_segment_it_writes(tmp_path, monkeypatch):
+    """Test that a batch crossing segments fsyncs the full ones, not only the last."""
+    synced = set()
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        synced.add(os.fstat(fd).st_ino)
+        real_fsync(fd)
+
+    monkeypatch.setattr(body_archive.os, "fsync", fsync)
+    with BodyArchive(tmp_path, segment_max_bytes=2048) as archive:
+        archive.put_many(((f"m{i}", record(i)) for i in range(50)), fsync=True)
+
+    segments = list(tmp_path.glob("segment-*.pack"))
+    assert len(segments) > 1
+    assert {segment.stat().st_ino for segment in segments} <= synced
+
+
+def test_save_and_load_email_keep_the_parser_shape(tmp_path):
+    """Test that an archived email loads back as parse_email() returned it."""
+    email_message = {
+        "id": "m1",
+        "subject": "Compra",
+        "from": "alertas@hey.inc",
+        "to": "me@example.com",
+        "date": "Mon, 1 Jan 2024 10:00:00 -0600",
+        "body_html": body(1),
+        "body_plain": body(1),  # parse_email's HTML fallback
+    }
+    with BodyArchive(tmp_path) as archive:
+        assert save_email_body(email_message, "m1", archive)
+        assert not save_email_body({"body_html": "", "body_plain": ""}, "m2", archive)
+        assert load_email(archive, "m1") == {**email_message, "to": ""}
+        assert load_email(archive, "m2") is None
+
+
+def test_migration_archives_files_and_is_resumable(tmp_path):
+    """Test that the migration tool moves data/ files into the archive."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(5):
+        (data_dir / f"m{i}.html").write_text(body(i), encoding="utf-8")
+    (data_dir / "t1.txt").write_text("Compra aprobada", encoding="utf-8")
+
+    with BodyArchive(data_dir / "archive") as archive:
+        assert migrate_bodies.migrate(data_dir, archive, 2, 10, delete=False)[0] == 6
+        assert migrate_bodies.migrate(data_dir, archive, 2, 10, delete=True)[0] == 0
+        assert archive.dictionary_id == 1
+        assert archive.get("m3")["body_html"] == body(3)
+        assert load_email(archive, "t1")["body_plain"] == "Compra aprobada"
+
+
+class RecordingArchive:
+    """Archive stand-in recording batches, optionally failing or blocking."""
+
+    def __init__(self, fail=False, gate=None, error=None):
+        self.batches = []
+        self.fail = fail
+        self.gate = gate
+        self.error = error
+
+    def put_many(self, items, fsync=False):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        if self.fail:
+            raise sqlite3.OperationalError("disk I/O error")
+        self.batches.append((list(items), fsync))
+
+
+def test_writer_batches_fsynced_writes_and_drains_on_close():
+    """Test that queued records are written in fsynced batches before close returns."""
+    gate = threading.Event()
+    archive = RecordingArchive(gate=gate)
+    writer = ArchiveWriter(archive, batch_size=4)
+    for i in range(10):
+        writer.put(f"m{i}", record(i))
+    gate.set()
+    writer.close()
+
+    assert [msg_id for batch, _ in archive.batches for msg_id, _ in batch] == [
+        f"m{i}" for i in range(10)
+    ]
+    assert all(fsync and len(batch) <= 4 for batch, fsync in archive.batches)
+    assert (writer.written, writer.failed, writer.dropped) == (10, 0, 0)
+
+
+def test_writer_counts_failures_and_drops_without_raising():
+    """Test that archive errors and a full queue are counted, not raised."""
+    writer = ArchiveWriter(RecordingArchive(fail=True))
+    writer.put("m1", record(1))
+    writer.close()
+    assert (writer.written, writer.failed) == (0, 1)
+
+    gate = threading.Event()
+    writer = ArchiveWriter(RecordingArchive(gate=gate), max_queue=1, put_timeout=0.01)
+    for i in range(4):
+        writer.put(f"m{i}", record(i))
+    gate.set()
+    writer.close()
+    assert writer.dropped >= 2
+    assert writer.written + writer.dropped == 4
+
+
+def test_writer_survives_unexpected_errors():
+    """Test that a non-I/O error fails its batch but leaves the writer running."""
+    archive = RecordingArchive(error=ValueError("bad record"))
+    writer = ArchiveWriter(archive, batch_size=1)
+    writer.put("m1", record(1))
+    writer.put("m2", record(2))
+    writer.close()
+    assert (writer.written, writer.failed) == (1, 1)
+    assert [item[0][0][0] for item in archive.batches] == ["m2"]
+
+
+def test_close_does_not_wait_for_a_dead_writer():
+    """Test that records left behind by a stopped thread are counted as dropped."""
+    writer = ArchiveWriter(RecordingArchive(), max_queue=2)
+    writer._queue.put(None)  # pylint: disable=protected-access
+    writer._thread.join()  # pylint: disable=protected-access
+    writer._queue.put(("m1", record(1)))  # pylint: disable=protected-access
+    writer._queue.put(("m2", record(2)))  # pylint: disable=protected-access
+
+    writer.put("m3", record(3))
+    writer.close()
+    assert (writer.written, writer.dropped) == (0, 3)
@@ -0,0 +1,112 @@
+"""Tests for the offline Gmail stand-in used by the sync benchmark."""
+
+from functools import partial
+
+import pytest
+
+import main
+from benchmarks.fake_gmail import FakeGmail, Mailbox
+from constants.banks import SupportedBanks
+from core.body_archive import BodyArchive
+from core.gmail_labels import PARSE_FAILED_LABEL, PROCESSED_LABEL, exclude_labels, search_name
+from core.sync_jobs import SyncProgress
+from database.database import Database
+
+
+def test_mailbox_is_deterministic_and_honours_the_mix():
+    """Test that a seed reproduces the mailbox and that bank weights and duplicates apply."""
+    mailbox = Mailbox(300, banks={SupportedBanks.NUBANK: 1.0}, duplicate_ratio=0.1, seed=3)
+    again = Mailbox(300, banks={SupportedBanks.NUBANK: 1.0}, duplicate_ratio=0.1, seed=3)
+
+    assert mailbox.listing == again.listing
+    assert len(mailbox.message_ids()) == 300 < len(mailbox.listing)
+    assert {mailbox.template(msg_id).bank for msg_id in mailbox.message_ids()} == {
+        SupportedBanks.NUBANK
+    }
+
+
+def test_listing_applies_the_label_terms_of_the_query():
+    """Test that messages.list filters on label: and -label: like Gmail."""
+    gmail = FakeGmail(Mailbox(10, seed=2))
+    ids = gmail.mailbox.message_ids()
+    processed = gmail.labels().create(userId="me", body={"name": PROCESSED_LABEL}).execute()
+    gmail.messages().batchModify(
+        userId="me", body={"ids": ids[:4], "addLabelIds": [processed["id"]]}
+    ).execute()
+
+    def listed(query):
+        response = gmail.messages().list(userId="me", q=query, maxResults=500).execute()
+        return [message["id"] for message in response["messages"]]
+
+    assert listed(exclude_labels("from:bank")) == ids[4:]
+    assert listed(f"label:{search_name(PROCESSED_LABEL)}") == ids[:4]
+    assert listed(f"label:{search_name(PARSE_FAILED_LABEL)}") == []
+
+
+def test_run_sync_imports_the_fake_mailbox(tmp_path, monkeypatch):
+    """Test a full sync against FakeGmail: every message is handled once and labelled."""
+    monkeypatch.chdir(tmp_path)
+    mailbox = Mailbox(120, noisy_ratio=0.05, duplicate_ratio=0.2, seed=1)
+    gmail = FakeGmail(mailbox)
+    monkeypatch.setattr(main, "get_credentials", lambda: None)
+    monkeypatch.setattr(main, "get_gmail_service", lambda creds: gmail)
+
+    progress = SyncProgress()
+    main.run_sync(progress)
+
+    expected = [m for m in mailbox.message_ids() if mailbox.template(m).expected_type]
+    assert progress.listed == len(mailbox.listing)
+    assert progress.inserted == len(expected)
+    assert progress.errors == progress.archive_errors == 0
+    assert set(gmail.message_labels) == set(mailbox.message_ids())
+    assert gmail.calls["messages.get"] == len(mailbox.listing)
+
+
+@pytest.fixture(name="paged_sync")
+def paged_sync_fixture(tmp_path, monkeypatch):
+    """Return a function pointing run_sync at a FakeGmail, a temporary database and archive."""
+    monkeypatch.setattr(main, "Database", partial(Database, f"sqlite:///{tmp_path / 'test.db'}"))
+    monkeypatch.setattr(main, "BodyArchive", partial(BodyArchive, tmp_path / "archive"))
+    monkeypatch.setattr(main, "get_credentials", lambda: None)
+
+    def use(gmail: FakeGmail) -> FakeGmail:
+        monkeypatch.setattr(main, "get_gmail_service", lambda creds: gmail)
+        return gmail
+
+    return use
+
+
+def test_small_pages_do_not_skip_messages_labelled_mid_listing(paged_sync):
+    """Test that labels applied during a sync do not shift the pages of its listing."""
+    mailbox = Mailbox(60, duplicate_ratio=0.2, seed=4)
+    gmail = paged_sync(FakeGmail(mailbox, page_size=10))
+
+    progress = SyncProgress()
+    main.run_sync(progress)
+
+    assert progress.listed == len(mailbox.listing)
+    assert set(gmail.message_labels) == set(mailbox.message_ids())
+
+
+def test_interrupted_sync_resumes_without_skipping_messages(paged_sync, monkeypatch):
+    """Test that a sync failing mid-listing labels what it handled and the next one finishes."""
+    mailbox = Mailbox(60, duplicate_ratio=0, seed=5)
+    gmail = paged_sync(FakeGmail(mailbox, page_size=10))
+    request = gmail.request
+
+    def failing_request(name, body):
+        if name == "messages.list" and gmail.calls.get(name) == 3:
+            raise ConnectionError("network down")
+        return request(name, body)
+
+    monkeypatch.setattr(gmail, "request", failing_request)
+    with pytest.raises(ConnectionError):
+        main.run_sync(SyncProgress())
+    assert len(gmail.message_labels) == 30
+
+    monkeypatch.setattr(gmail, "request", request)
+    progress = SyncProgress()
+    main.run_sync(progress)
+
+    assert progress.listed == 30
+    assert set(gmail.message_labels) == set(mailbox.message_ids())
@@ -0,0 +1,130 @@
+"""Tests for labelling handled Gmail messages and excluding them from listings."""
+
+from functools import partial
+
+import pytest
+
+import main
+from core.body_archive import BodyArchive
+from core.gmail_labels import (
+    PARSE_FAILED,
+    PARSE_FAILED_LABEL,
+    PROCESSED,
+    PROCESSED_LABEL,
+    MessageLabeler,
+    ensure_labels,
+)
+from database.database import Database
+
+
+class FakeGmail:
+    """Gmail stand-in serving labels, one page of messages and batchModify."""
+
+    # Method and argument names mirror the Gmail API client.
+    # pylint: disable=invalid-name,unused-argument
+
+    def __init__(self, labels=None, message_ids=()):
+        self.label_names = dict(labels or {})
+        self.message_ids = list(message_ids)
+        self.created = []
+        self.queries = []
+        self.modified = []
+        self._resource = None
+
+    def users(self):
+        return self
+
+    def labels(self):
+        self._resource = "labels"
+        return self
+
+    def messages(self):
+        self._resource = "messages"
+        return self
+
+    def list(self, userId, q=None, maxResults=None, pageToken=None):
+        if self._resource == "labels":
+            labels = [{"id": label_id, "name": name} for name, label_id in self.label_names.items()]
+            return _Response({"labels": labels})
+        self.queries.append(q)
+        return _Response({"messages": [{"id": msg_id} for msg_id in self.message_ids]})
+
+    def create(self, userId, body):
+        label_id = f"Label_{len(self.label_names) + 1}"
+        self.label_names[body["name"]] = label_id
+        self.created.append(body["name"])
+        return _Response({"id": label_id})
+
+    def batchModify(self, userId, body):
+        self.modified.append(body)
+        return _Response({})
+
+
+class _Response:
+    def __init__(self, body):
+        self.body = body
+
+    def execute(self):
+        return self.body
+
+
+def test_ensure_labels_creates_only_missing_labels():
+    """Test that existing sync labels are reused and missing ones created."""
+    gmail = FakeGmail(labels={PROCESSED_LABEL: "Label_7", "Receipts": "Label_8"})
+    ids = ensure_labels(gmail)
+    assert gmail.created == [PARSE_FAILED_LABEL]
+    assert ids == {PROCESSED_LABEL: "Label_7", PARSE_FAILED_LABEL: "Label_3"}
+
+
+def test_labeler_applies_outcomes_in_batch_modify_chunks():
+    """Test that outcomes are labelled on flush, at most 1000 ids per batchModify call."""
+    gmail = FakeGmail()
+    labeler = MessageLabeler(gmail, {PROCESSED_LABEL: "P", PARSE_FAILED_LABEL: "F"})
+    for i in range(2500):
+        labeler.record(f"ok{i}", PROCESSED)
+    labeler.record("bad", PARSE_FAILED)
+    labeler.record("error", None)
+    assert gmail.modified == []  # nothing is applied until the listing is over
+    assert labeler.pending == 2501
+
+    labeler.flush()
+    assert [len(body["ids"]) for body in gmail.modified] == [1000, 1000, 500, 1]
+    assert gmail.modified[0]["addLabelIds"] == ["P"]
+    assert gmail.modified[0]["removeLabelIds"] == ["F"]
+    assert gmail.modified[-1] == {"ids": ["bad"], "addLabelIds": ["F"]}
+    assert labeler.labelled == 2501
+
+
+@pytest.fixture(name="labelled_sync")
+def labelled_sync_fixture(tmp_path, monkeypatch):
+    """Patch run_sync to use a temporary database and a label-aware fake Gmail."""
+    gmail = FakeGmail(message_ids=["m1", "m2", "m3"])
+    outcomes = {"m1": PROCESSED, "m2": PARSE_FAILED, "m3": None}
+    monkeypatch.setattr(main, "Database", partial(Database, f"sqlite:///{tmp_path / 'test.db'}"))
+    monkeypatch.setattr(main, "get_credentials", lambda: None)
+    monkeypatch.setattr(main, "get_gmail_service", lambda creds: gmail)
+    monkeypatch.setattr(
+        main,
+        "process_message",
+        lambda service, transactions, msg_id, progress, archive=None: outcomes[msg_id],
+    )
+    monkeypatch.setattr(main, "BodyArchive", partial(BodyArchive, tmp_path / "archive"))
+    return gmail
+
+
+def test_run_sync_excludes_and_labels_handled_messages(labelled_sync):
+    """Test that a sync skips labelled mail and labels what it handled."""
+    main.run_sync()
+
+    query = labelled_sync.queries[0]
+    assert query.endswith("-label:expense-tracker-processed -label:expense-tracker-parse-failed")
+    assert [(body["ids"], body["addLabelIds"]) for body in labelled_sync.modified] == [
+        (["m1"], [labelled_sync.label_names[PROCESSED_LABEL]]),
+        (["m2"], [labelled_sync.label_names[PARSE_FAILED_LABEL]]),
+    ]
+
+
+def test_retry_failed_lists_only_parse_failures(labelled_sync):
+    """Test that --retry-failed searches the parse-failure label instead of excluding it."""
+    main.run_sync(retry_failed=True)
+    assert labelled_sync.queries[0].endswith(" label:expense-tracker-parse-failed")
@@ -0,0 +1,224 @@
+"""Tests for Gmail push notifications and history-based syncs."""
+
+import base64
+import json
+import time
+from functools import partial
+from threading import Event
+
+import httplib2
+import pytest
+from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
+
+import api
+import main
+from core.body_archive import BodyArchive
+from core.gmail_push import GmailNotification, PushDebouncer
+from core.services.gmail_watch_service import GmailWatchService
+from core.sync_jobs import SyncJobManager, SyncProgress
+from database.database import Database
+
+
+class FakePubSub:
+    """Local stand-in for a Pub/Sub push subscription posting Gmail notifications."""
+
+    def __init__(self, client: TestClient, endpoint: str = "/gmail/push"):
+        self.client = client
+        self.endpoint = endpoint
+        self.sequence = 0
+
+    def envelope(self, email_address: str, history_id: int) -> dict:
+        """Build a push request body the way Pub/Sub delivers it."""
+        self.sequence += 1
+        data = json.dumps({"emailAddress": email_address, "historyId": history_id})
+        return {
+            "message": {
+                "data": base64.b64encode(data.encode()).decode(),
+                "messageId": str(self.sequence),
+                "publishTime": "2026-01-15T12:00:00Z",
+            },
+            "subscription": "projects/test/subscriptions/gmail-push",
+        }
+
+    def post(self, email_address: str, history_id: int, **params):
+        """Deliver one notification to the API."""
+        return self.client.post(
+            self.endpoint, json=self.envelope(email_address, history_id), params=params
+        )
+
+
+class FakeGmail:
+    """Gmail stand-in serving history, message metadata and the profile."""
+
+    # Method and argument names mirror the Gmail API client.
+    # pylint: disable=invalid-name,unused-argument,redefined-builtin
+
+    def __init__(self, history, senders, current_history_id=900):
+        self.history_pages = history
+        self.senders = senders
+        self.current_history_id = current_history_id
+
+    def users(self):
+        return self
+
+    def history(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId, startHistoryId, historyTypes, pageToken=None):
+        if startHistoryId not in self.history_pages:
+            raise HttpError(httplib2.Response({"status": 404}), b"Requested entity was not found.")
+        return _Response(self.history_pages[startHistoryId][pageToken])
+
+    def get(self, userId, id, format, metadataHeaders):
+        return _Response({"payload": {"headers": [{"name": "From", "value": self.senders[id]}]}})
+
+    def getProfile(self, userId):
+        return _Response(
+            {"emailAddress": "me@example.com", "historyId": str(self.current_history_id)}
+        )
+
+
+class _Response:
+    def __init__(self, body):
+        self.body = body
+
+    def execute(self):
+        return self.body
+
+
+@pytest.fixture(name="pubsub")
+def pubsub_fixture(monkeypatch):
+    """Provide a FakePubSub whose notifications reach a fast debouncer."""
+    triggers = []
+    monkeypatch.setattr(
+        api, "gmail_push_debouncer", PushDebouncer(lambda: triggers.append(1), delay_seconds=0.05)
+    )
+    with TestClient(api.app) as client:
+        yield FakePubSub(client), triggers
+
+
+def test_push_bursts_are_debounced_into_one_sync(pubsub):
+    """Test that several notifications in a burst trigger a single sync."""
+    fake, triggers = pubsub
+    for history_id in (101, 103, 102):
+        assert fake.post("me@example.com", history_id).status_code == 204
+
+    deadline = time.monotonic() + 5
+    while not triggers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert triggers == [1]
+    assert api.gmail_push_debouncer.latest_history_id == 103
+
+
+def test_push_during_a_running_sync_triggers_a_follow_up_sync():
+    """Test that a notification arriving mid-sync is not absorbed by that sync."""
+    started, release, follow_up = Event(), Event(), Event()
+    runs = []
+
+    def fake_sync(progress, incremental=False):  # pylint: disable=unused-argument
+        runs.append(incremental)
+        if len(runs) == 1:
+            started.set()
+            release.wait(timeout=5)
+        else:
+            follow_up.set()
+
+    jobs = SyncJobManager(fake_sync)
+    debouncer = PushDebouncer(
+        lambda: jobs.submit(incremental=True, rerun_if_running=True), delay_seconds=0.01
+    )
+    debouncer.notify(GmailNotification("me@example.com", 101))
+    assert started.wait(timeout=5)
+    debouncer.notify(GmailNotification("me@example.com", 102))
+    time.sleep(0.1)
+    assert runs == [True]
+
+    release.set()
+    assert follow_up.wait(timeout=5)
+    jobs.shutdown()
+    assert runs == [True, True]
+
+
+def test_push_requires_token_and_acknowledges_garbage(pubsub, monkeypatch):
+    """Test the shared-secret check and that malformed payloads are not retried."""
+    fake, triggers = pubsub
+    monkeypatch.setenv("GMAIL_PUSH_TOKEN", "s3cret")
+    assert fake.post("me@example.com", 1).status_code == 403
+    assert fake.post("me@example.com", 1, token="wrong").status_code == 403
+
+    garbage = {"message": {"data": base64.b64encode(b"not json").decode()}}
+    response = fake.client.post("/gmail/push", params={"token": "s3cret"}, json=garbage)
+    assert response.status_code == 204
+    time.sleep(0.1)
+    assert not triggers
+
+
+@pytest.fixture(name="watches")
+def watches_fixture(tmp_path):
+    """Provide a GmailWatchService with a registered watch at history id 100."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    service = GmailWatchService(db)
+    service.save_watch("me@example.com", "projects/test/topics/gmail", 100, None)
+    yield service
+    db.close()
+
+
+def test_history_sync_fetches_only_new_bank_messages(watches, monkeypatch):
+    """Test that a history sync processes added bank messages and advances the id."""
+    def added(*ids):
+        return [{"messagesAdded": [{"message": {"id": msg_id}} for msg_id in ids]}]
+
+    gmail = FakeGmail(
+        history={
+            100: {
+                None: {"historyId": "150", "nextPageToken": "p2", "history": added("a", "b")},
+                "p2": {"historyId": "160", "history": added("a", "c")},
+            }
+        },
+        senders={
+            "a": "Hey Banco <alertas@hey.inc>",
+            "b": "friend@example.com",
+            "c": "noreply@hey.inc",
+        },
+    )
+    processed = []
+    monkeypatch.setattr(
+        main,
+        "process_message",
+        lambda service, ts, msg_id, progress, archive=None: processed.append(msg_id),
+    )
+
+    progress = SyncProgress()
+    assert main.sync_history(gmail, None, watches, progress)
+    assert processed == ["a", "c"]
+    assert progress.listed == 2
+    assert watches.get().history_id == 160
+
+    # Renewing the watch keeps the synced position.
+    watches.save_watch("me@example.com", "projects/test/topics/gmail", 999, None)
+    assert watches.get().history_id == 160
+
+
+def test_expired_history_falls_back_to_query_sync(watches):
+    """Test that an expired history id is reset to the mailbox's current one."""
+    gmail = FakeGmail(history={}, senders={}, current_history_id=900)
+    assert not main.sync_history(gmail, None, watches, SyncProgress())
+    assert watches.get().history_id == 900
+
+
+def test_incremental_run_sync_uses_history(watches, monkeypatch, tmp_path):
+    """Test that an incremental run_sync goes through the history API when a watch exists."""
+    gmail = FakeGmail(history={100: {None: {"historyId": "120", "history": []}}}, senders={})
+    monkeypatch.setattr(main, "Database", partial(Database, f"sqlite:///{tmp_path / 'test.db'}"))
+    monkeypatch.setattr(main, "get_credentials", lambda: None)
+    monkeypatch.setattr(main, "get_gmail_service", lambda creds: gmail)
+    monkeypatch.setattr(main.MessageLabeler, "create", classmethod(lambda cls, service: None))
+    monkeypatch.setattr(main, "BodyArchive", partial(BodyArchive, tmp_path / "archive"))
+
+    main.run_sync(incremental=True)
+    assert watches.get().history_id == 120
@@ -0,0 +1,68 @@
+"""Tests for credential caching and the Gmail service cache."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from core import google_auth
+from core.gmail_service import get_gmail_service
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture(name="token_file")
+def token_file_fixture(tmp_path, monkeypatch):
+    """Point google_auth at a temporary token.json and a fake refresh."""
+    path = tmp_path / "token.json"
+    refreshes = []
+
+    def fake_refresh(creds, request):  # pylint: disable=unused-argument
+        refreshes.append(creds.token)
+        creds.token = f"token-{len(refreshes)}"
+        creds.expiry = _utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(google_auth, "TOKEN_FILE", str(path))
+    monkeypatch.setattr(google_auth, "_cache", {})
+    monkeypatch.setattr(Credentials, "refresh", fake_refresh)
+    return path, refreshes
+
+
+def _write_token(path, expiry: datetime):
+    creds = Credentials(
+        token="token-0",
+        refresh_token="refresh",
+        client_id="id",
+        client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token",
+        expiry=expiry,
+    )
+    path.write_text(creds.to_json(), encoding="utf-8")
+
+
+def test_credentials_are_cached_until_close_to_expiry(token_file):
+    """Test that credentials are read once and refreshed shortly before expiry."""
+    path, refreshes = token_file
+    _write_token(path, _utcnow() + timedelta(hours=1))
+
+    creds = google_auth.get_credentials()
+    path.unlink()  # later calls must not touch the file
+    assert google_auth.get_credentials() is creds
+    assert not refreshes
+
+    creds.expiry = _utcnow() + timedelta(minutes=2)
+    assert google_auth.get_credentials() is creds
+    assert refreshes == ["token-0"]
+    assert json.loads(path.read_text(encoding="utf-8"))["token"] == "token-1"
+    assert [p.name for p in path.parent.iterdir()] == ["token.json"]
+
+
+def test_gmail_service_is_reused_for_the_same_credentials():
+    """Test that the Gmail client is built once per thread and credentials."""
+    creds = Credentials(token="token")
+    service = get_gmail_service(creds)
+    assert get_gmail_service(creds) is service
+    assert get_gmail_service(Credentials(token="other")) is not service
@@ -0,0 +1,58 @@
+"""Tests for queue-based logging and sampled log messages."""
+
+import logging
+
+from core.logging_config import SampledLog, log_sampled_summary, setup_logging
+
+
+class ListHandler(logging.Handler):
+    """Collects formatted records in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_queue_mode_writes_from_listener_thread(tmp_path):
+    """Test that queue mode hands records to a listener that writes the log file."""
+    log_file = tmp_path / "queued.log"
+    logger = setup_logging(log_file=str(log_file), use_queue=True, name="test_queue_mode")
+    try:
+        (handler,) = logger.handlers
+        logger.info("queued %s", "message")
+        handler.listener.stop()
+    finally:
+        for handler in logger.handlers:
+            logger.removeHandler(handler)
+            for target in handler.listener.handlers:
+                target.close()
+
+    assert "queued message" in log_file.read_text(encoding="utf-8")
+
+
+def test_sampled_log_logs_first_and_every_nth_and_summarizes():
+    """Test that only sampled occurrences are logged and the summary counts them all."""
+    logger = logging.getLogger("test_sampled_log")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ListHandler()
+    logger.addHandler(handler)
+    sampled = SampledLog(logger, "Test events", first=2, every=5)
+
+    for i in range(1, 12):
+        sampled.log("event %d", i)
+    assert handler.messages == [
+        "event 1",
+        "event 2",
+        "event 5 (occurrence 5)",
+        "event 10 (occurrence 10)",
+    ]
+
+    handler.messages.clear()
+    assert log_sampled_summary(logger)["Test events"] == 11
+    assert "Test events: 11 (4 logged)" in handler.messages
+    assert sampled.take() == (0, 0)
+    logger.removeHandler(handler)
@@ -0,0 +1,85 @@
+"""Tests for the in-process metrics and the /metrics endpoint."""
+
+import threading
+
+from fastapi.testclient import TestClient
+
+import api
+from core.metrics import Counter, Histogram, Registry
+from core.parsers.hey_banco import HeyBancoParser
+from core.parsers.paypal import PayPalParser
+from core.services.transaction_service import TransactionService
+from database.database import Database
+
+
+def test_counter_sums_thread_shards():
+    """Test that increments from several threads add up in one series."""
+    counter = Counter("test_total", "Test counter.", ("outcome",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("ok")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("error", amount=2)
+
+    assert counter.value("ok") == 4000
+    assert counter.values() == {("ok",): 4000, ("error",): 2}
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus text rendering of a histogram."""
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("test_seconds", "Test latency.", ("method",), buckets=(0.1, 1.0))
+    )
+    histogram.observe(0.05, "get")
+    histogram.observe(0.5, "get")
+    histogram.observe(5.0, "get")
+
+    assert histogram.count("get") == 3
+    assert registry.render().splitlines() == [
+        "# HELP test_seconds Test latency.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{method="get",le="0.1"} 1',
+        'test_seconds_bucket{method="get",le="1.0"} 2',
+        'test_seconds_bucket{method="get",le="+Inf"} 3',
+        'test_seconds_sum{method="get"} 5.55',
+        'test_seconds_count{method="get"} 3',
+    ]
+
+
+def test_metrics_endpoint_reports_route_latency(tmp_path):
+    """Test that API requests show up in /metrics under their route template."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    api.app.dependency_overrides[api.get_transaction_service] = lambda: TransactionService(db)
+    try:
+        with TestClient(api.app) as client:
+            assert client.get("/transactions/12345").status_code == 404
+            response = client.get("/metrics")
+    finally:
+        api.app.dependency_overrides.clear()
+        db.close()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'expense_tracker_http_request_seconds_count{method="GET",'
+        'route="/transactions/{transaction_id}",status="404"}'
+    ) in response.text
+    assert "# TYPE expense_tracker_sync_messages_total counter" in response.text
+
+
+def test_parser_template_names():
+    """Test that parsers name the email template of a message."""
+    hey = HeyBancoParser()
+    assert hey.template_name({"subject": HeyBancoParser.SPEI_RECEPTION}) == "spei_reception"
+    assert hey.template_name({"subject": "Promoción especial"}) == "unknown"
+
+    paypal = PayPalParser()
+    assert paypal.template_name({"subject": "Recibo de su pago a Spotify"}) == "payment"
+    assert paypal.template_name({"subject": PayPalParser.SKIP_SUBJECTS[0]}) == "account_notice"
@@ -0,0 +1,39 @@
+"""Tests for the synthetic parser corpus and the parser benchmark's regression check."""
+
+import logging
+
+from benchmarks import bench_parsers
+from benchmarks.parser_corpus import TEMPLATES, VARIANTS, generate
+from core.parsers.parser_helper import PARSERS
+
+
+def test_every_corpus_email_parses_as_rendered(caplog):
+    """Test that each template and variant parses to the amount and type it was rendered with."""
+    caplog.set_level(logging.CRITICAL, logger="expense_tracker")
+    results = bench_parsers.run(count=2)
+
+    assert len(results) == len(TEMPLATES) * len(VARIANTS)
+    assert {case: r["wrong"] for case, r in results.items() if r["wrong"]} == {}
+    assert {template.bank for template in TEMPLATES} == set(PARSERS)
+    for template in TEMPLATES:
+        assert callable(getattr(PARSERS[template.bank], template.method))
+
+
+def test_corpus_is_deterministic_and_noisy_variant_is_large():
+    """Test that a seed reproduces the corpus and noise buries the notification."""
+    first = [email["body_plain"] for _, _, email, _ in generate(1, seed=7)]
+    assert first == [email["body_plain"] for _, _, email, _ in generate(1, seed=7)]
+    sizes = {variant: len(email["body_plain"]) for _, variant, email, _ in generate(1)}
+    assert sizes["noisy"] > 30 * 1024 > sizes["plain"]
+
+
+def test_regressions_scale_by_calibration_and_ignore_timer_noise():
+    """Test that only cases slower than the machine-scaled baseline allows are reported."""
+    baseline = {
+        "calibration_ms": 2.0,
+        "results": {"a[plain]": {"p50_ms": 1.0}, "b[plain]": {"p50_ms": 0.001}},
+    }
+    results = {"a[plain]": {"p50_ms": 5.0}, "b[plain]": {"p50_ms": 0.01}, "new": {"p50_ms": 9.0}}
+
+    assert bench_parsers.regressions(results, baseline, 2.0, 3.0) == [("a[plain]", 5.0, 3.0)]
+    assert bench_parsers.regressions(results, baseline, 4.0, 3.0) == []
@@ -0,0 +1,106 @@
+"""Tests for the parallel re-parse tool."""
+
+from datetime import datetime
+
+import pytest
+
+from constants.banks import SupportedBanks
+from core.body_archive import BodyArchive
+from core.fetch_emails import save_email_body
+from core.parsers.parser_helper import ParserRegistry
+from core.services.transaction_service import TransactionService
+from database.database import Database
+from models.transaction import TransactionCreate
+from tools import reparse as reparse_tool
+
+
+class FakeParser:
+    """Parses ``key=value;...`` bodies; "boom" raises and "none" yields nothing."""
+
+    def parse(self, email_message, email_id):
+        """Parse the fake body format."""
+        body = email_message["body_plain"]
+        if body == "boom":
+            raise ValueError("unexpected template")
+        if body == "none":
+            return None
+        fields = dict(pair.split("=") for pair in body.split(";"))
+        return TransactionCreate(
+            email_id=email_id,
+            date=datetime(2024, 5, int(fields.get("day", 1))),
+            amount=float(fields["amount"]),
+            description=email_message["subject"],
+            type="expense",
+            bank_name=SupportedBanks.PAYPAL,
+            merchant=fields.get("merchant"),
+        )
+
+
+STORED = {
+    # email_id: (stored amount, stored merchant, archived body)
+    "same": (10.0, "OXXO", "amount=10;merchant=OXXO"),
+    "fixed": (10.0, None, "amount=12.5;merchant=Uber;day=2"),
+    "boom": (5.0, None, "boom"),
+    "none": (5.0, None, "none"),
+    "lost": (7.0, None, None),
+}
+
+
+@pytest.fixture(name="env")
+def env_fixture(tmp_path, monkeypatch):
+    """Provide a database and archive holding the STORED transactions."""
+    monkeypatch.setattr(
+        reparse_tool,
+        "PARSERS",
+        ParserRegistry({SupportedBanks.PAYPAL: "tests.test_reparse:FakeParser"}),
+    )
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    archive = BodyArchive(tmp_path / "archive")
+    service = TransactionService(db)
+    ids = {}
+    for email_id, (amount, merchant, body) in STORED.items():
+        ids[email_id] = service.save_transaction(
+            TransactionCreate(
+                email_id=email_id,
+                date=datetime(2024, 5, 1),
+                amount=amount,
+                description="Pago",
+                type="expense",
+                bank_name=SupportedBanks.PAYPAL,
+                merchant=merchant,
+            )
+        )
+        if body is not None:
+            save_email_body({"subject": "Pago", "body_plain": body}, email_id, archive)
+    yield db, archive, service, ids
+    archive.close()
+    db.close()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reparse_updates_only_changed_rows_and_reports_fields(env, workers):
+    """Test that only differing transactions are updated, with a per-field report."""
+    db, archive, service, ids = env
+    reports = reparse_tool.reparse(db, archive, workers=workers, batch_size=2)
+
+    report = reports["FakeParser"]
+    assert (report.examined, report.changed, report.unchanged) == (5, 1, 1)
+    assert (report.errors, report.no_result, report.missing_body) == (1, 1, 1)
+    assert report.fields == {"amount": 1, "merchant": 1, "date": 1}
+
+    fixed = service.get_transaction(ids["fixed"])
+    assert (fixed.amount, fixed.merchant, fixed.date) == (12.5, "Uber", datetime(2024, 5, 2))
+    assert service.get_transaction(ids["boom"]).amount == 5.0
+
+
+def test_reparse_dry_run_and_filters(env):
+    """Test that a dry run writes nothing and that filters narrow the candidates."""
+    db, archive, service, ids = env
+    reports = reparse_tool.reparse(db, archive, workers=1, dry_run=True)
+    assert reports["FakeParser"].changed == 1
+    assert service.get_transaction(ids["fixed"]).amount == 10.0
+
+    assert reparse_tool.reparse(db, archive, workers=1, null_dates=True)["FakeParser"].examined == 0
+    assert reparse_tool.reparse(db, archive, workers=1, parsers=["HeyBancoParser"]) == {}
+    since = reparse_tool.reparse(db, archive, workers=1, since=datetime(2024, 6, 1))
+    assert since["FakeParser"].examined == 0
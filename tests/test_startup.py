@@ -0,0 +1,66 @@
+"""Regression tests for the API's import-time cost."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import core.parsers.parser_helper as ph
+from constants.banks import SupportedBanks
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only the Gmail sync path needs; a read-only API worker must not load them.
+SYNC_ONLY_MODULES = (
+    "main",
+    "googleapiclient",
+    "google.oauth2",
+    "google_auth_oauthlib",
+    "dateutil",
+    "unidecode",
+    "core.fetch_emails",
+    "core.parsers.hey_banco",
+)
+
+# Generous cap on the cumulative import time of ``api``, in seconds.
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def import_times(module: str, cwd: Path) -> dict:
+    """Import a module in a fresh interpreter and return cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_api_import_skips_sync_dependencies(tmp_path):
+    """Test that importing the API loads neither the Gmail stack nor the parsers."""
+    times = import_times("api", tmp_path)
+    loaded = [name for name in times if name.startswith(SYNC_ONLY_MODULES)]
+    assert not loaded
+    assert times["api"] / 1e6 < IMPORT_BUDGET_SECONDS
+    assert not (tmp_path / "data").exists()
+
+
+def test_parser_registry_loads_parsers_on_first_use():
+    """Test that the registry instantiates a parser once, when first requested."""
+    registry = ph.ParserRegistry({SupportedBanks.NUBANK: "core.parsers.nubank:NubankParser"})
+    assert len(registry) == 1 and not registry._parsers  # pylint: disable=protected-access
+
+    parser = registry.get(SupportedBanks.NUBANK)
+    assert type(parser).__name__ == "NubankParser"
+    assert registry[SupportedBanks.NUBANK] is parser
+    assert registry.get(SupportedBanks.PAYPAL) is None
@@ -0,0 +1,79 @@
+"""Unit tests for StatsService and the monthly rollup triggers."""
+
+from datetime import datetime
+
+import pytest
+from sqlmodel import delete, select
+
+from core.services.stats_service import StatsService
+from core.services.transaction_service import TransactionService
+from database.database import Database
+from models.transaction import Transaction, TransactionCreate
+
+
+@pytest.fixture(name="db")
+def db_fixture(tmp_path):
+    """Provide a Database backed by a temporary SQLite file."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    yield db
+    db.close()
+
+
+def save(db: Database, email_id: str, amount: float, date: datetime | None, **extra):
+    """Save a transaction through the service write path."""
+    TransactionService(db).save_transaction(
+        TransactionCreate(
+            email_id=email_id,
+            date=date,
+            amount=amount,
+            type=extra.get("type", "expense"),
+            bank_name=extra.get("bank_name", "hey_banco"),
+        )
+    )
+
+
+def test_rollups_follow_inserts(db):
+    """Test that inserts are aggregated per month, bank and type."""
+    save(db, "a", 10.0, datetime(2026, 1, 5))
+    save(db, "b", 30.0, datetime(2026, 1, 20))
+    save(db, "c", 5.0, datetime(2026, 2, 1))
+    save(db, "d", 7.0, None)
+    save(db, "e", 100.0, datetime(2026, 1, 3), type="income")
+
+    rows = {
+        (r["month"], r["type"]): r for r in StatsService(db).monthly_rollups()
+    }
+    january = rows[("2026-01", "expense")]
+    assert (january["total"], january["count"]) == (40.0, 2)
+    assert (january["min_amount"], january["max_amount"]) == (10.0, 30.0)
+    assert january["bank_name"] == "hey_banco"
+    assert january["category_id"] is None
+    assert rows[("2026-02", "expense")]["count"] == 1
+    assert rows[("unknown", "expense")]["total"] == 7.0
+
+    totals = StatsService(db).monthly_totals(month_from="2026-01", month_to="2026-01")
+    assert totals == [{"month": "2026-01", "expense": 40.0, "income": 100.0, "count": 3}]
+
+
+def test_rollups_follow_updates_and_deletes(db):
+    """Test that updates and deletes keep rollups equal to a full rebuild."""
+    save(db, "a", 10.0, datetime(2026, 1, 5))
+    save(db, "b", 30.0, datetime(2026, 1, 20))
+    save(db, "c", 5.0, datetime(2026, 2, 1))
+
+    with db.session() as session:
+        tx = session.exec(select(Transaction).where(Transaction.email_id == "b")).one()
+        tx.date = datetime(2026, 2, 10)
+        tx.amount = 50.0
+        session.add(tx)
+    with db.session() as session:
+        session.exec(delete(Transaction).where(Transaction.email_id == "a"))  # type: ignore
+
+    service = StatsService(db)
+    incremental = service.monthly_rollups()
+    assert [(r["month"], r["count"], r["max_amount"]) for r in incremental] == [
+        ("2026-02", 2, 50.0)
+    ]
+
+    service.rebuild_monthly_rollups()
+    assert service.monthly_rollups() == incremental
@@ -0,0 +1,95 @@
+"""Unit tests for the background sync job manager."""
+
+from threading import Event
+
+import pytest
+
+from core.sync_jobs import SyncJobManager
+
+
+@pytest.fixture(name="release")
+def release_fixture():
+    """Provide an event that lets a fake sync finish."""
+    return Event()
+
+
+def test_job_reports_progress_and_success(release):
+    """Test that a job moves from running to succeeded and exposes its counters."""
+    started = Event()
+
+    def fake_sync(progress, incremental=False):  # pylint: disable=unused-argument
+        progress.listed = 3
+        progress.inserted = 2
+        started.set()
+        release.wait(timeout=5)
+        progress.skipped = 1
+
+    manager = SyncJobManager(fake_sync)
+    job = manager.submit()
+    assert started.wait(timeout=5)
+    assert manager.get(job.job_id).status == "running"
+    assert (job.progress.listed, job.progress.inserted) == (3, 2)
+
+    release.set()
+    manager.shutdown()
+    assert job.status == "succeeded"
+    assert job.progress.skipped == 1
+    assert job.finished_at is not None and job.error is None
+
+
+def test_failed_job_keeps_error_and_queue_continues():
+    """Test that a failing sync is recorded and later jobs still run."""
+    calls = []
+
+    def flaky_sync(progress, incremental=False):  # pylint: disable=unused-argument
+        calls.append(progress)
+        if len(calls) == 1:
+            raise RuntimeError("token expired")
+
+    manager = SyncJobManager(flaky_sync, max_jobs=1)
+    failed = manager.submit()
+    succeeded = manager.submit()
+    manager.shutdown()
+
+    assert (failed.status, failed.error) == ("failed", "token expired")
+    assert succeeded.status == "succeeded"
+    assert manager.get(failed.job_id) is None  # pruned beyond max_jobs
+    assert manager.get("missing") is None
+
+
+def test_concurrent_triggers_share_the_active_job(release):
+    """Test that submitting while a job is active returns that job."""
+    manager = SyncJobManager(lambda progress, incremental: release.wait(timeout=5))
+    first = manager.submit()
+    assert manager.submit() is first
+
+    release.set()
+    manager.shutdown()
+    assert first.status == "succeeded"
+
+
+def test_rerun_request_during_a_running_job_queues_one_follow_up(release):
+    """Test that triggers hitting a running job get a single follow-up sync."""
+    started = Event()
+    follow_up_done = Event()
+    calls = []
+
+    def fake_sync(progress, incremental=False):  # pylint: disable=unused-argument
+        calls.append(incremental)
+        if len(calls) == 1:
+            started.set()
+            release.wait(timeout=5)
+        else:
+            follow_up_done.set()
+
+    manager = SyncJobManager(fake_sync)
+    first = manager.submit()
+    assert started.wait(timeout=5)
+    assert manager.submit(incremental=True, rerun_if_running=True) is first
+    assert manager.submit(incremental=True, rerun_if_running=True) is first
+    assert manager.submit() is first  # plain triggers still just share the job
+
+    release.set()
+    assert follow_up_done.wait(timeout=5)
+    manager.shutdown()
+    assert calls == [False, True]
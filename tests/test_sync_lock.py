@@ -0,0 +1,83 @@
+"""Unit tests for the cross-process sync lease."""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+
+from core.sync_lock import SyncLeaseLost, SyncLock, run_exclusive
+from database.database import Database
+
+
+@pytest.fixture(name="db")
+def db_fixture(tmp_path):
+    """Provide a Database backed by a temporary SQLite file."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    yield db
+    db.close()
+
+
+def test_lease_is_exclusive_until_released(db):
+    """Test that only one owner holds the lease at a time."""
+    lock = SyncLock(db)
+    assert lock.acquire("a")
+    assert lock.acquire("a")  # re-entrant for the same owner
+    assert not lock.acquire("b")
+    assert lock.heartbeat("a") and not lock.heartbeat("b")
+
+    lock.release("b")  # not the holder, no effect
+    assert lock.current().owner == "a"
+    lock.release("a")
+    assert lock.current() is None
+    assert lock.acquire("b")
+
+
+def test_stale_lease_is_taken_over(db):
+    """Test that a lease without heartbeats can be acquired by another owner."""
+    assert SyncLock(db, ttl_seconds=60).acquire("crashed")
+    assert not SyncLock(db, ttl_seconds=60).acquire("next")
+    assert SyncLock(db, ttl_seconds=0).acquire("next")
+
+
+def test_heartbeat_flags_a_lease_taken_over(db):
+    """Test that a holder whose lease was taken over is told to stop."""
+    lock = SyncLock(db, ttl_seconds=0.2)
+    assert lock.acquire("stalled")
+    with lock.held("stalled"):
+        lock.ensure_held()
+        assert SyncLock(db, ttl_seconds=0).acquire("next")
+        assert lock.lost.wait(timeout=5)
+        with pytest.raises(SyncLeaseLost):
+            lock.ensure_held()
+    assert lock.current().owner == "next"
+
+
+def test_run_exclusive_joins_running_sync(db):
+    """Test that a second trigger waits for the holder instead of running."""
+    lock = SyncLock(db)
+    assert lock.acquire("cron")
+    joined = Event()
+    runs = []
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(
+            run_exclusive,
+            lock,
+            lambda: runs.append("api"),
+            on_join=lambda owner: joined.set(),
+            poll_seconds=0.01,
+        )
+        assert joined.wait(timeout=5)
+        lock.release("cron")
+        assert future.result(timeout=5) is False
+    assert not runs
+
+
+def test_run_exclusive_recovers_stale_lease(db):
+    """Test that a joined sync whose holder stops heartbeating is taken over."""
+    SyncLock(db).acquire("crashed")
+    runs = []
+
+    ran = run_exclusive(SyncLock(db, ttl_seconds=0.05), lambda: runs.append(1), poll_seconds=0.01)
+    assert ran and runs == [1]
+    assert SyncLock(db).current() is None
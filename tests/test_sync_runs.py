@@ -0,0 +1,256 @@
+"""Tests for resumable, checkpointed sync runs."""
+
+import sqlite3
+from datetime import datetime, timezone
+from functools import partial
+
+import httplib2
+import pytest
+from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
+
+import api
+import main
+from core.body_archive import BodyArchive
+from core.services.sync_run_service import SyncRunService
+from core.sync_jobs import SyncProgress
+from core.sync_lock import SyncLeaseLost, SyncLock
+from database.database import Database
+from models.sync_run import HISTORY_QUERY
+
+PAGES = {
+    None: (["m1", "m2", "m3"], "p2"),
+    "p2": (["m4", "m5", "m6"], "p3"),
+    "p3": (["m7"], None),
+}
+
+
+class FakeGmail:
+    """Minimal stand-in for the Gmail service's messages().list() pagination."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.listed_tokens = []
+        self.queries = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId, q, maxResults, pageToken=None):  # pylint: disable=invalid-name,unused-argument
+        self.listed_tokens.append(pageToken)
+        self.queries.append(q)
+        return _Request(self, pageToken)
+
+
+class _Request:
+    def __init__(self, gmail, token):
+        self.gmail = gmail
+        self.token = token
+
+    def execute(self):
+        if self.gmail.fail_on is not None and self.token == self.gmail.fail_on:
+            self.gmail.fail_on = None
+            raise ConnectionError("network down")
+        if self.token not in PAGES:
+            raise HttpError(httplib2.Response({"status": 400}), b"Invalid pageToken")
+        ids, next_token = PAGES[self.token]
+        response = {"messages": [{"id": msg_id} for msg_id in ids]}
+        if next_token:
+            response["nextPageToken"] = next_token
+        return response
+
+
+@pytest.fixture(name="sync")
+def sync_fixture(tmp_path, monkeypatch):
+    """Patch run_sync to use a temporary database, a fake Gmail and a recorder."""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    processed = []
+    gmail = FakeGmail()
+
+    def fake_process(service, transaction_service, msg_id, progress, archive=None):  # pylint: disable=unused-argument
+        if msg_id == gmail.fail_on:
+            gmail.fail_on = None
+            raise RuntimeError("token expired")
+        processed.append(msg_id)
+
+    monkeypatch.setattr(main, "Database", partial(Database, url))
+    monkeypatch.setattr(main, "get_credentials", lambda: None)
+    monkeypatch.setattr(main, "get_gmail_service", lambda creds: gmail)
+    monkeypatch.setattr(main, "process_message", fake_process)
+    monkeypatch.setattr(main.MessageLabeler, "create", classmethod(lambda cls, service: None))
+    monkeypatch.setattr(main, "BodyArchive", partial(BodyArchive, tmp_path / "archive"))
+    monkeypatch.setattr(main, "CHECKPOINT_EVERY", 1)
+
+    db = Database(url)
+    yield gmail, processed, SyncRunService(db)
+    db.close()
+
+
+def test_interrupted_run_resumes_after_last_checkpoint(sync):
+    """Test that a failed run resumes mid-page instead of starting over."""
+    gmail, processed, runs = sync
+    gmail.fail_on = "m5"
+    with pytest.raises(RuntimeError):
+        main.run_sync()
+
+    interrupted = runs.latest()
+    assert (interrupted.status, interrupted.page_token) == ("interrupted", "p2")
+    assert (interrupted.last_message_id, interrupted.error) == ("m4", "token expired")
+
+    main.run_sync()
+    assert processed == ["m1", "m2", "m3", "m4", "m5", "m6", "m7"]
+    completed = runs.latest()
+    assert completed.run_id == interrupted.run_id
+    assert (completed.status, completed.messages_done) == ("completed", 7)
+
+    main.run_sync()  # the next sync is a new run from the first page
+    assert runs.latest().run_id == interrupted.run_id + 1
+
+
+def test_listing_failure_resumes_at_failed_page(sync):
+    """Test that a run interrupted between pages re-lists only the remaining pages."""
+    gmail, processed, _ = sync
+    gmail.fail_on = "p3"
+    with pytest.raises(ConnectionError):
+        main.run_sync()
+
+    gmail.listed_tokens.clear()
+    main.run_sync()
+    assert gmail.listed_tokens == ["p3"]
+    assert processed == ["m1", "m2", "m3", "m4", "m5", "m6", "m7"]
+
+
+def test_rejected_page_token_restarts_from_first_page(sync):
+    """Test that an expired page token falls back to a full listing."""
+    _, processed, runs = sync
+    run = runs.start(main.build_global_query())
+    runs.checkpoint(run, "expired", "m2", 2)
+    runs.finish(run, "interrupted", error="crash")
+
+    main.run_sync()
+    assert processed == ["m1", "m2", "m3", "m4", "m5", "m6", "m7"]
+    assert runs.latest().status == "completed"
+
+
+def test_archive_open_failure_still_closes_the_database(sync, monkeypatch):
+    """Test that a body archive that cannot be opened does not leak the database."""
+    closed = []
+    database = main.Database
+
+    def opened_database():
+        db = database()
+        close = db.close
+        monkeypatch.setattr(db, "close", lambda: closed.append(close()))
+        return db
+
+    def broken_archive():
+        raise PermissionError("archive is read-only")
+
+    monkeypatch.setattr(main, "Database", opened_database)
+    monkeypatch.setattr(main, "BodyArchive", broken_archive)
+    with pytest.raises(PermissionError):
+        main.run_sync()
+    assert len(closed) == 1
+
+
+def test_lost_lease_stops_the_sync_and_leaves_the_run_to_the_new_holder(sync):
+    """Test that a sync whose lease was taken over stops at its next checkpoint."""
+    _, processed, runs = sync
+    lease = SyncLock(runs.db)
+    lease.lost.set()
+    with pytest.raises(SyncLeaseLost):
+        main.run_sync(lease=lease)
+
+    assert processed == ["m1"]
+    run = runs.latest()
+    assert (run.status, run.page_token, run.messages_done) == ("running", None, 0)
+
+
+def test_incremental_sync_lists_since_last_completed_run(sync):
+    """Test that incremental syncs resume unfinished runs, then list only new mail."""
+    gmail, processed, runs = sync
+    gmail.fail_on = "m5"
+    with pytest.raises(RuntimeError):
+        main.run_sync()
+
+    main.run_sync(incremental=True)  # finishes the interrupted full run first
+    assert processed == ["m1", "m2", "m3", "m4", "m5", "m6", "m7"]
+    assert all("after:" not in q for q in gmail.queries)
+    completed = runs.latest()
+
+    gmail.queries.clear()
+    main.run_sync(incremental=True)
+    since = completed.started_at - main.INCREMENTAL_OVERLAP
+    expected = int(since.replace(tzinfo=timezone.utc).timestamp())
+    assert gmail.queries[0].endswith(f") after:{expected}")
+
+
+def test_finished_run_reports_counts_and_stage_timings(sync):
+    """Test that a run's counters and stage timings are stored with it."""
+    _, _, runs = sync
+    main.run_sync()
+
+    run = runs.latest()
+    assert (run.status, run.listed, run.inserted) == ("completed", 7, 0)
+    assert run.list_seconds > 0
+    assert run.finished_at is not None
+
+
+def test_history_sync_is_recorded_as_a_run(tmp_path):
+    """Test that SyncRunService.record stores a run that is never resumed."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    runs = SyncRunService(db)
+    progress = SyncProgress(listed=3, inserted=2, duplicates=1, get_seconds=0.5)
+    started_at = datetime(2025, 1, 1, 12, 0)
+
+    runs.record(HISTORY_QUERY, started_at, "completed", progress)
+    runs.record(HISTORY_QUERY, started_at, "failed", SyncProgress(), error="boom")
+
+    latest, first = runs.recent()
+    assert (latest.status, latest.error) == ("failed", "boom")
+    assert (first.listed, first.inserted, first.duplicates) == (3, 2, 1)
+    assert (first.get_seconds, first.messages_done) == (0.5, 3)
+    assert runs.unfinished() is None
+    db.close()
+
+
+def test_report_columns_are_added_to_existing_tables(tmp_path):
+    """Test that a sync_runs table created before the report columns is migrated."""
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE sync_runs (run_id INTEGER PRIMARY KEY, status VARCHAR NOT NULL, "
+            "query VARCHAR NOT NULL, page_token VARCHAR, last_message_id VARCHAR, "
+            "messages_done INTEGER NOT NULL, started_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL, finished_at DATETIME, error VARCHAR)"
+        )
+        connection.execute(
+            "INSERT INTO sync_runs VALUES (1, 'completed', 'q', NULL, NULL, 4, "
+            "'2025-01-01 00:00:00', '2025-01-01 00:00:00', NULL, NULL)"
+        )
+    connection.close()
+
+    db = Database(f"sqlite:///{path}")
+    run = SyncRunService(db).latest()
+    assert (run.messages_done, run.inserted, run.db_seconds) == (4, 0, 0.0)
+    db.close()
+
+
+def test_sync_runs_endpoint_lists_recent_runs(tmp_path):
+    """Test that GET /sync/runs returns runs newest first."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    runs = SyncRunService(db)
+    for query in ("first", "second"):
+        runs.finish(runs.start(query), "completed", progress=SyncProgress(listed=2))
+    api.app.dependency_overrides[api.get_sync_run_service] = lambda: SyncRunService(db)
+    try:
+        with TestClient(api.app) as client:
+            body = client.get("/sync/runs?limit=1").json()
+    finally:
+        api.app.dependency_overrides.clear()
+        db.close()
+
+    assert [(run["query"], run["listed"]) for run in body] == [("second", 2)]
@@ -0,0 +1,68 @@
+"""Unit tests for the periodic sync scheduler."""
+
+from threading import Event
+
+import pytest
+
+from core.sync_jobs import SyncJob
+from core.sync_scheduler import SyncScheduler
+
+
+class FakeJobs:
+    """Job manager that finishes every job immediately with scripted results."""
+
+    def __init__(self, inserted, done: Event):
+        self.inserted = list(inserted)
+        self.done = done
+        self.submitted = []
+
+    def submit(self, incremental=False):
+        job = SyncJob(job_id=str(len(self.submitted)), incremental=incremental)
+        job.progress.inserted = self.inserted.pop(0) if self.inserted else 0
+        job.status = "succeeded"
+        self.submitted.append(job)
+        if not self.inserted:
+            self.done.set()
+        return job
+
+
+def test_delay_backs_off_on_empty_runs_and_resets_on_new_data():
+    """Test the exponential backoff, its cap and the reset."""
+    scheduler = SyncScheduler(None, interval_seconds=60, max_interval_seconds=300)
+    empty = SyncJob("a", status="succeeded")
+    found = SyncJob("b", status="succeeded")
+    failed = SyncJob("c", status="failed")
+    found.progress.inserted = 3
+    failed.progress.inserted = 3
+
+    assert scheduler.next_delay(60, empty) == 120
+    assert scheduler.next_delay(240, empty) == 300
+    assert scheduler.next_delay(300, failed) == 300
+    assert scheduler.next_delay(300, found) == 60
+
+
+def test_scheduler_submits_incremental_syncs_until_stopped():
+    """Test that the loop keeps submitting incremental jobs."""
+    done = Event()
+    jobs = FakeJobs([0, 2, 0], done)
+    scheduler = SyncScheduler(jobs, interval_seconds=0.001, jitter=0)
+    scheduler.start()
+    assert done.wait(timeout=5)
+    scheduler.stop()
+
+    assert len(jobs.submitted) >= 3
+    assert all(job.incremental for job in jobs.submitted)
+
+
+def test_scheduler_is_configured_from_environment(monkeypatch):
+    """Test that the scheduler is disabled unless an interval is set."""
+    monkeypatch.delenv("SYNC_INTERVAL_SECONDS", raising=False)
+    assert SyncScheduler.from_env(None) is None
+
+    monkeypatch.setenv("SYNC_INTERVAL_SECONDS", "120")
+    monkeypatch.setenv("SYNC_JITTER", "0.2")
+    scheduler = SyncScheduler.from_env(None)
+    assert (scheduler.interval, scheduler.max_interval, scheduler.jitter) == (120, 960, 0.2)
+
+    with pytest.raises(ValueError):
+        SyncScheduler(None, interval_seconds=-1)
@@ -0,0 +1,200 @@
+"""Unit tests for TransactionService."""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlmodel import delete, select
+
+from core.export import iter_csv, iter_ndjson
+from core.services import transaction_service
+from core.services.transaction_service import TRANSACTION_FIELDS, TransactionService
+from database.database import Database
+from models.table_counter import TableCounter
+from models.transaction import Transaction, TransactionCreate, TransactionFilters
+
+
+@pytest.fixture(name="service")
+def service_fixture(tmp_path):
+    """Provide a TransactionService backed by a temporary SQLite database."""
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    yield TransactionService(db)
+    db.close()
+
+
+def make_transaction(email_id: str, **overrides) -> TransactionCreate:
+    """Build a TransactionCreate with sensible defaults."""
+    data = {
+        "email_id": email_id,
+        "date": datetime(2026, 1, 15, 12, 0),
+        "amount": 100.0,
+        "description": "Compra",
+        "type": "expense",
+        "bank_name": "hey_banco",
+    }
+    data.update(overrides)
+    return TransactionCreate(**data)
+
+
+def test_count_follows_inserts_and_deletes(service):
+    """Test that the maintained counter tracks inserts, duplicates and deletes."""
+    assert service.count_transactions() == (0, True)
+
+    service.save_transaction(make_transaction("a"))
+    service.save_transaction(make_transaction("b"))
+    service.save_transaction(make_transaction("a"))  # duplicate, skipped
+    assert service.count_transactions() == (2, True)
+
+    with service.db.session() as session:
+        session.exec(delete(Transaction).where(Transaction.email_id == "a"))  # type: ignore
+    assert service.count_transactions() == (1, True)
+
+
+def test_counter_is_seeded_for_existing_rows(tmp_path, monkeypatch):
+    """Test that opening a database with existing rows seeds the counter."""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    db = Database(url)
+    TransactionService(db).save_transaction(make_transaction("a"))
+    with db.session() as session:
+        session.exec(delete(TableCounter))  # type: ignore
+    db.close()
+
+    monkeypatch.setattr(Database, "_prepared_files", set())  # simulate a new process
+    db = Database(url)
+    assert TransactionService(db).count_transactions() == (1, True)
+    db.close()
+
+
+def test_every_in_memory_database_gets_a_schema():
+    """Test that a second in-memory database is set up like the first one."""
+    for _ in range(2):
+        db = Database("sqlite://")
+        assert TransactionService(db).count_transactions() == (0, True)
+        db.close()
+
+
+def test_replaced_database_file_gets_a_schema(tmp_path):
+    """Test that a database file deleted while the process runs is set up again."""
+    path = tmp_path / "replaced.db"
+    db = Database(f"sqlite:///{path}")
+    TransactionService(db).save_transaction(make_transaction("a"))
+    db.close()
+    path.unlink()
+
+    db = Database(f"sqlite:///{path}")
+    assert TransactionService(db).count_transactions() == (0, True)
+    db.close()
+
+
+def test_filters_are_applied(service):
+    """Test that each filter narrows the listing and its count."""
+    service.save_transaction(make_transaction("a", merchant="OXXO Centro", amount=50.0))
+    service.save_transaction(make_transaction("b", merchant="Oxford 100%", amount=500.0))
+    service.save_transaction(
+        make_transaction("c", type="income", bank_name="nubank", date=datetime(2026, 3, 1))
+    )
+
+    def ids(**filters):
+        found = service.list_transactions(filters=TransactionFilters(**filters))
+        assert service.count_transactions(TransactionFilters(**filters)) == (len(found), True)
+        return sorted(tx.email_id for tx in found)
+
+    assert ids() == ["a", "b", "c"]
+    assert ids(type="income") == ["c"]
+    assert ids(date_from=datetime(2026, 2, 1)) == ["c"]
+    assert ids(date_to=datetime(2026, 3, 1)) == ["a", "b"]
+    assert ids(min_amount=60, max_amount=500) == ["b", "c"]
+    assert ids(merchant="ox") == ["a", "b"]
+    assert ids(merchant="oxford 100%") == ["b"]
+    assert ids(merchant="oxford 1000") == []
+
+    nubank_id = service.list_transactions(filters=TransactionFilters(type="income"))[0].bank_id
+    assert ids(bank_id=nubank_id) == ["c"]
+
+
+def test_filtered_count_is_capped_and_invalidated(service, monkeypatch):
+    """Test that filtered counts are capped and refreshed after writes."""
+    monkeypatch.setattr(transaction_service, "FILTERED_COUNT_CAP", 2)
+    income = TransactionFilters(type="income")
+
+    service.save_transaction(make_transaction("a", type="income"))
+    assert service.count_transactions(income) == (1, True)
+
+    service.save_transaction(make_transaction("b", type="income"))
+    service.save_transaction(make_transaction("c", type="income"))
+    assert service.count_transactions(income) == (2, False)
+
+
+def test_search_ranks_and_tracks_changes(service):
+    """Test that search matches prefixes, ranks results and follows updates."""
+    service.save_transaction(make_transaction("a", description="Compra OXXO Centro"))
+    service.save_transaction(make_transaction("b", merchant="OXXO", reference="REF123"))
+    service.save_transaction(make_transaction("c", description="Pago Cinépolis"))
+
+    count, found = service.search_transactions("oxxo")
+    assert count == (2, True)
+    assert [tx.email_id for tx in found] == ["b", "a"]  # merchant outweighs description
+
+    assert [tx.email_id for tx in service.search_transactions("cinepo")[1]] == ["c"]
+    assert [tx.email_id for tx in service.search_transactions("ref12")[1]] == ["b"]
+    assert service.search_transactions('oxxo "centro" ref:1')[0] == (0, True)
+
+    with service.db.session() as session:
+        tx = session.exec(select(Transaction).where(Transaction.email_id == "a")).one()
+        tx.description = "Compra Walmart"
+        session.add(tx)
+    assert [tx.email_id for tx in service.search_transactions("oxxo")[1]] == ["b"]
+    assert [tx.email_id for tx in service.search_transactions("walmart")[1]] == ["a"]
+
+
+def test_search_index_is_built_for_existing_rows(tmp_path, monkeypatch):
+    """Test that opening a database that predates search indexes its rows."""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    db = Database(url)
+    TransactionService(db).save_transaction(make_transaction("a", merchant="OXXO"))
+    TransactionService(db).save_transaction(make_transaction("b", merchant="Walmart"))
+    with db.engine.begin() as connection:
+        for trigger in ("insert", "delete", "update"):
+            connection.exec_driver_sql(f"DROP TRIGGER trg_transactions_fts_{trigger}")
+        connection.exec_driver_sql("DROP TABLE transactions_fts")
+    db.close()
+
+    monkeypatch.setattr(Database, "_prepared_files", set())  # simulate a new process
+    db = Database(url)
+    service = TransactionService(db)
+    assert [tx.email_id for tx in service.search_transactions("oxxo")[1]] == ["a"]
+
+    with db.session() as session:
+        session.exec(delete(Transaction).where(Transaction.email_id == "b"))  # type: ignore
+    with db.engine.connect() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO transactions_fts (transactions_fts) VALUES ('integrity-check')"
+        )
+    assert [tx.email_id for tx in service.search_transactions("oxxo")[1]] == ["a"]
+    db.close()
+
+
+def test_export_streams_filtered_rows(service):
+    """Test that exports stream every matching row in CSV and NDJSON."""
+    service.save_transaction(make_transaction("a", merchant="OXXO"))
+    service.save_transaction(make_transaction("b", type="income", date=datetime(2026, 2, 1)))
+    expenses = TransactionFilters(type="expense")
+
+    csv_rows = list(
+        csv.DictReader(
+            io.StringIO(
+                b"".join(iter_csv(service.iter_transactions(), TRANSACTION_FIELDS)).decode()
+            )
+        )
+    )
+    assert [row["email_id"] for row in csv_rows] == ["b", "a"]
+    assert csv_rows[1]["merchant"] == "OXXO"
+    assert csv_rows[1]["bank_name"] == "hey_banco"
+
+    lines = b"".join(
+        iter_ndjson(service.iter_transactions(expenses), TRANSACTION_FIELDS, rows_per_chunk=1)
+    ).splitlines()
+    assert [json.loads(line)["email_id"] for line in lines] == ["a"]
+    assert json.loads(lines[0])["date"] == "2026-01-15T12:00:00"
@@ -0,0 +1,41 @@
+"""Build (or rebuild) the full-text search index for existing transactions.
+
+Existing rows are indexed automatically when a database without an index is
+first opened, and new and updated rows are indexed by triggers, so this is
+only needed to repair an index (e.g. after restoring a backup).
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Ensure project root is importable when run as a script (python tools/build_search_index.py)
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from sqlalchemy import text
+
+from database.database import Database
+from database.triggers import fts5_available, rebuild_search_index
+
+
+def build():
+    """Rebuild transactions_fts from the transactions table."""
+    db = Database()
+    try:
+        with db.engine.begin() as connection:
+            if not fts5_available(connection):
+                print("SQLite was built without FTS5; nothing to do")
+                return
+            rebuild_search_index(connection)
+            indexed = connection.execute(text("SELECT count(*) FROM transactions")).scalar_one()
+    finally:
+        db.close()
+    print(f"Indexed {indexed} transactions")
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,82 @@
+"""Register, renew or stop the Gmail push notification watch.
+
+Gmail watches expire after seven days, so run ``register`` daily (e.g. from
+cron) to keep push-triggered syncs flowing. The Pub/Sub topic must grant
+gmail-api-push@system.gserviceaccount.com the Publisher role, and its push
+subscription should point at the API's /gmail/push endpoint.
+
+Usage:
+    python tools/gmail_watch.py register --topic projects/<project>/topics/<topic>
+    python tools/gmail_watch.py stop
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ensure project root is importable when run as a script (python tools/gmail_watch.py)
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from core.gmail_service import get_gmail_service
+from core.google_auth import get_credentials
+from core.services.gmail_watch_service import GmailWatchService
+from database.database import Database
+
+
+def register(service, db: Database, topic: str, label_ids: list[str]):
+    """Create or renew the watch and record it."""
+    body = {"topicName": topic, "labelIds": label_ids, "labelFilterBehavior": "INCLUDE"}
+    response = service.users().watch(userId="me", body=body).execute()
+    email_address = service.users().getProfile(userId="me").execute()["emailAddress"]
+
+    expiration = datetime.fromtimestamp(int(response["expiration"]) / 1000, tz=timezone.utc)
+    watch = GmailWatchService(db).save_watch(
+        email_address,
+        topic_name=topic,
+        history_id=int(response["historyId"]),
+        expiration=expiration.replace(tzinfo=None),
+    )
+    print(
+        f"Watching {email_address} on {topic} until {expiration:%Y-%m-%d %H:%M} UTC "
+        f"(synced up to history id {watch.history_id})"
+    )
+
+
+def stop(service):
+    """Stop push notifications for the account."""
+    service.users().stop(userId="me").execute()
+    print("Gmail watch stopped")
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    register_parser = commands.add_parser("register", help="Create or renew the watch")
+    register_parser.add_argument("--topic", required=True, help="Full Pub/Sub topic name")
+    register_parser.add_argument(
+        "--label", action="append", dest="labels", help="Label to watch (default: INBOX)"
+    )
+    commands.add_parser("stop", help="Stop push notifications")
+    args = parser.parse_args()
+
+    service = get_gmail_service(get_credentials())
+    if args.command == "stop":
+        stop(service)
+        return
+
+    db = Database()
+    try:
+        register(service, db, args.topic, args.labels or ["INBOX"])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
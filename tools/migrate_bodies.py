@@ -0,0 +1,101 @@
+"""Move email bodies saved as one file per message in data/ into the body archive.
+
+The archive's compression dictionary is trained from a sample of the existing
+files first, so migrated records already benefit from it. Messages that are
+already archived are skipped, so the migration can be re-run after an
+interruption.
+
+Usage:
+    python tools/migrate_bodies.py [--delete]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+# Ensure project root is importable when run as a script (python tools/migrate_bodies.py)
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from core.body_archive import BodyArchive
+
+DATA_DIR = _ROOT / "data"
+
+
+def find_bodies(data_dir: Path) -> dict[str, Path]:
+    """Return the saved body file of each message id, preferring HTML over text."""
+    bodies: dict[str, Path] = {}
+    for ext in (".txt", ".html"):
+        for path in data_dir.glob(f"*{ext}"):
+            bodies[path.stem] = path
+    return bodies
+
+
+def read_record(path: Path) -> dict:
+    """Build an archive record from a saved body file; headers were never saved."""
+    body = path.read_text(encoding="utf-8", errors="replace")
+    html = path.suffix == ".html"
+    return {
+        "subject": "",
+        "from": "",
+        "date": "",
+        "body_html": body if html else "",
+        "body_plain": "" if html else body,
+    }
+
+
+def migrate(
+    data_dir: Path, archive: BodyArchive, batch_size: int, samples: int, delete: bool
+) -> tuple[int, int]:
+    """Archive every body file not archived yet.
+
+    Returns:
+        The number of migrated messages and their total size on disk before.
+    """
+    pending = {
+        msg_id: path for msg_id, path in find_bodies(data_dir).items() if msg_id not in archive
+    }
+    if archive.dictionary_id == 0 and pending:
+        sample = random.sample(sorted(pending.values()), min(samples, len(pending)))
+        archive.train(path.read_text(encoding="utf-8", errors="replace") for path in sample)
+
+    migrated = 0
+    size = 0
+    items = sorted(pending.items())
+    for start in range(0, len(items), batch_size):
+        batch = items[start : start + batch_size]
+        archive.put_many(((msg_id, read_record(path)) for msg_id, path in batch), fsync=True)
+        for msg_id, path in batch:
+            size += path.stat().st_size
+            if delete and archive.get(msg_id) is not None:
+                path.unlink()
+        migrated += len(batch)
+        print(f"Migrated {migrated}/{len(items)}")
+    return migrated, size
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--archive", type=Path, default=None, help="Default: <data-dir>/archive")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=500, help="Files to train the dictionary on")
+    parser.add_argument("--delete", action="store_true", help="Delete files once archived")
+    args = parser.parse_args()
+
+    with BodyArchive(args.archive or args.data_dir / "archive") as archive:
+        migrated, size = migrate(args.data_dir, archive, args.batch_size, args.samples, args.delete)
+        print(
+            f"Archived {migrated} bodies ({size:,} bytes as files); "
+            f"archive holds {len(archive)} in {archive.size_bytes:,} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
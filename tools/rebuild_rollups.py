@@ -0,0 +1,29 @@
+"""Rebuild the monthly rollup table from the transactions table."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Ensure project root is importable when run as a script (python tools/rebuild_rollups.py)
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from core.services.stats_service import StatsService
+from database.database import Database
+
+
+def rebuild():
+    """Discard and re-aggregate all monthly rollups."""
+    db = Database()
+    try:
+        rows = StatsService(db).rebuild_monthly_rollups()
+    finally:
+        db.close()
+    print(f"Rebuilt {rows} monthly rollup rows")
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,345 @@
+"""Re-parse stored transactions from their archived emails.
+
+Candidate transactions are streamed from the database, their emails are read
+from the body archive and re-parsed by a pool of worker processes, and only the
+transactions whose parsed fields differ from the stored ones are updated, in
+bulk. The run ends with a report of what changed, per parser.
+
+Usage:
+    python tools/reparse.py --bank paypal --null-dates
+    python tools/reparse.py --parser HeyBancoParser --since 2024-01-01 --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+# Ensure project root is importable when run as a script (python tools/reparse.py)
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+# pylint: disable=wrong-import-position
+from sqlmodel import col, select, update
+
+from constants.banks import SupportedBanks
+from core.body_archive import BodyArchive
+from core.fetch_emails import load_email
+from core.parsers.parser_helper import PARSERS
+from database.database import Database
+from models.bank import Bank
+from models.transaction import Transaction
+
+ARCHIVE_DIR = _ROOT / "data" / "archive"
+
+# Transaction columns a parser produces and a re-parse may change.
+FIELDS = ("date", "amount", "description", "type", "merchant", "reference")
+
+# Batches handed to each worker at a time, and how many may be in flight per worker.
+BATCH_SIZE = 200
+IN_FLIGHT_PER_WORKER = 2
+
+MISSING_BODY = "email not archived"
+
+
+@dataclass
+class ParserReport:
+    """Outcome counts of one parser's re-parse.
+
+    Attributes:
+        examined: Candidate transactions
+        missing_body: Transactions whose email is not in the archive
+        no_result: Emails the parser no longer turns into a transaction
+        errors: Emails the parser raised on
+        unchanged: Transactions whose parsed fields match the stored ones
+        changed: Transactions updated (or that would be, in a dry run)
+        fields: How many transactions each field changed in
+    """
+
+    examined: int = 0
+    missing_body: int = 0
+    no_result: int = 0
+    errors: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    fields: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class Candidate:
+    """A stored transaction and its archived email."""
+
+    transaction_id: int
+    bank: SupportedBanks
+    stored: dict
+    email_message: Optional[dict]
+
+
+def parse_batch(batch: list[tuple[SupportedBanks, dict]]) -> list[tuple[Optional[dict], str]]:
+    """Parse emails in a worker process.
+
+    Returns:
+        For each email, the parsed fields (None if the parser found no
+        transaction) and an error message (empty unless the parser raised).
+    """
+    results: list[tuple[Optional[dict], str]] = []
+    for bank, email_message in batch:
+        try:
+            transaction = PARSERS[bank].parse(email_message, email_message["id"])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            results.append((None, f"{type(e).__name__}: {e}"))
+            continue
+        if transaction is None:
+            results.append((None, ""))
+            continue
+        parsed = {name: getattr(transaction, name) for name in FIELDS}
+        if parsed["date"] is not None:
+            # Dates are stored without their offset.
+            parsed["date"] = parsed["date"].replace(tzinfo=None)
+        results.append((parsed, ""))
+    return results
+
+
+def diff(stored: dict, parsed: dict) -> dict:
+    """Return the parsed fields whose value differs from the stored one."""
+    return {name: value for name, value in parsed.items() if stored[name] != value}
+
+
+def select_banks(
+    banks: Optional[Iterable[SupportedBanks]], parsers: Optional[Iterable[str]]
+) -> list[SupportedBanks]:
+    """Return the banks to re-parse: those given, narrowed to the named parser classes."""
+    selected = [bank for bank in (banks or PARSERS) if bank in PARSERS]
+    if parsers:
+        names = set(parsers)
+        selected = [bank for bank in selected if PARSERS.class_name(bank) in names]
+    return selected
+
+
+def candidate_rows(
+    db: Database,
+    banks: list[SupportedBanks],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    null_dates: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[tuple]:
+    """Stream the matching transactions as (id, email_id, bank name, *FIELDS) rows."""
+    stmt = (
+        select(
+            col(Transaction.transaction_id),
+            col(Transaction.email_id),
+            col(Bank.name),
+            *(col(getattr(Transaction, name)) for name in FIELDS),
+        )
+        .join(Bank, col(Bank.id) == col(Transaction.bank_id))
+        .where(col(Bank.name).in_([str(bank) for bank in banks]))
+        .order_by(col(Transaction.transaction_id))
+        .execution_options(yield_per=batch_size)
+    )
+    if since is not None:
+        stmt = stmt.where(col(Transaction.date) >= since)
+    if until is not None:
+        stmt = stmt.where(col(Transaction.date) < until)
+    if null_dates:
+        stmt = stmt.where(col(Transaction.date).is_(None))
+    with db.session() as session:
+        yield from session.exec(stmt)
+
+
+def candidates(rows: Iterable[tuple], archive: BodyArchive) -> Iterator[Candidate]:
+    """Attach each row's archived email."""
+    for transaction_id, email_id, bank_name, *values in rows:
+        stored = dict(zip(FIELDS, values))
+        email_message = load_email(archive, email_id)
+        if email_message is not None:
+            # Bodies migrated from data/ files were archived without headers
+            email_message["subject"] = email_message["subject"] or stored["description"] or ""
+        yield Candidate(transaction_id, SupportedBanks(bank_name), stored, email_message)
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list]:
+    """Group items into lists of at most ``size``."""
+    batch: list = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_all(
+    batches: Iterable[list[Candidate]], executor: Optional[Executor], in_flight: int
+) -> Iterator[tuple[Candidate, Optional[dict], str]]:
+    """Parse candidate batches, on ``executor`` if given, yielding results in order.
+
+    Yields ``(candidate, parsed fields, error)``; candidates without an archived
+    email get the MISSING_BODY error. At most ``in_flight`` batches are queued
+    at a time, so memory stays bounded however many transactions match.
+    """
+    pending: deque = deque()
+    for batch in batches:
+        for candidate in batch:
+            if candidate.email_message is None:
+                yield candidate, None, MISSING_BODY
+        with_body = [c for c in batch if c.email_message is not None]
+        jobs = [(c.bank, c.email_message) for c in with_body]
+        if executor is None:
+            yield from zip_results(with_body, parse_batch(jobs))
+            continue
+        pending.append((with_body, executor.submit(parse_batch, jobs)))
+        if len(pending) >= in_flight:
+            done, future = pending.popleft()
+            yield from zip_results(done, future.result())
+    while pending:
+        done, future = pending.popleft()
+        yield from zip_results(done, future.result())
+
+
+def zip_results(
+    batch: list[Candidate], results: list[tuple[Optional[dict], str]]
+) -> Iterator[tuple[Candidate, Optional[dict], str]]:
+    """Pair a batch's candidates with their parse results."""
+    for candidate, (parsed, error) in zip(batch, results):
+        yield candidate, parsed, error
+
+
+def apply_updates(db: Database, updates: list[dict], batch_size: int = BATCH_SIZE):
+    """Bulk-update changed transactions by primary key, in one transaction."""
+    with db.session() as session:
+        for batch in batched(updates, batch_size):
+            session.exec(update(Transaction), params=batch)  # type: ignore
+
+
+def reparse(
+    db: Database,
+    archive: BodyArchive,
+    banks: Optional[Iterable[SupportedBanks]] = None,
+    parsers: Optional[Iterable[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    null_dates: bool = False,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict[str, ParserReport]:
+    """Re-parse matching transactions and update the ones that changed.
+
+    Args:
+        db: Database holding the transactions.
+        archive: Archive holding their emails.
+        banks: Only these banks (default: every bank with a parser).
+        parsers: Only banks handled by these parser classes, e.g. "PayPalParser".
+        since: Inclusive lower bound for the stored transaction date.
+        until: Exclusive upper bound for the stored transaction date.
+        null_dates: Only transactions stored without a date.
+        workers: Worker processes; 1 parses in this process (default: CPU count).
+        batch_size: Emails per worker batch and transactions per bulk update.
+        dry_run: Report the changes without writing them.
+
+    Returns:
+        A report per parser class name.
+    """
+    selected = select_banks(banks, parsers)
+    reports = {PARSERS.class_name(bank): ParserReport() for bank in selected}
+    if not selected:
+        return reports
+
+    workers = workers or os.cpu_count() or 1
+    rows = candidate_rows(db, selected, since, until, null_dates, batch_size)
+    batches = batched(candidates(rows, archive), batch_size)
+    updates: list[dict] = []
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        results = parse_all(batches, executor, workers * IN_FLIGHT_PER_WORKER)
+        for candidate, parsed, error in results:
+            report = reports[PARSERS.class_name(candidate.bank)]
+            report.examined += 1
+            if error == MISSING_BODY:
+                report.missing_body += 1
+            elif error:
+                report.errors += 1
+            elif parsed is None:
+                report.no_result += 1
+            elif changed := diff(candidate.stored, parsed):
+                report.changed += 1
+                report.fields.update(changed.keys())
+                updates.append({"transaction_id": candidate.transaction_id, **changed})
+            else:
+                report.unchanged += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if updates and not dry_run:
+        apply_updates(db, updates, batch_size)
+    return reports
+
+
+def print_report(reports: dict[str, ParserReport], dry_run: bool = False):
+    """Print the per-parser outcome and changed-field counts."""
+    print(
+        f"{'parser':<20} {'examined':>9} {'changed':>8} {'unchanged':>10} "
+        f"{'no body':>8} {'no result':>10} {'errors':>7}  changed fields"
+    )
+    for name, r in reports.items():
+        fields = ", ".join(f"{f}={n}" for f, n in r.fields.most_common()) or "-"
+        print(
+            f"{name:<20} {r.examined:>9} {r.changed:>8} {r.unchanged:>10} "
+            f"{r.missing_body:>8} {r.no_result:>10} {r.errors:>7}  {fields}"
+        )
+    if dry_run:
+        print("Dry run: no transactions were updated")
+
+
+def main():
+    """Script entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--bank", action="append", type=SupportedBanks, choices=list(SupportedBanks)
+    )
+    parser.add_argument("--parser", action="append", help="Parser class name, e.g. PayPalParser")
+    parser.add_argument("--since", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--until", type=date.fromisoformat, help="YYYY-MM-DD, exclusive")
+    parser.add_argument(
+        "--null-dates", action="store_true", help="Only transactions without a date"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--archive", type=Path, default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    db = Database()
+    try:
+        with BodyArchive(args.archive) as archive:
+            reports = reparse(
+                db,
+                archive,
+                banks=args.bank,
+                parsers=args.parser,
+                since=datetime.combine(args.since, datetime.min.time()) if args.since else None,
+                until=datetime.combine(args.until, datetime.min.time()) if args.until else None,
+                null_dates=args.null_dates,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+            )
+    finally:
+        db.close()
+    print_report(reports, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()